@@ -1,52 +1,85 @@
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from config import config
 from agents.agent_interface import ITradeAgent
 from charts.chart_interface import IChart
 from exchanges.exchange_interface import IExchange
 from strategies.strategy_interface import IStrategy
-from structs.position import Position
+from structs.position import Position, position_key
+from structs.metrics import metrics
 from structs.signal import Signal
 
 
 class TradeAgent(ITradeAgent):
-    def __init__(self, charts: list[IChart], strategies: list[IStrategy], exchange: IExchange):
+    def __init__(self, charts: list[IChart], strategies: list[IStrategy], exchange: IExchange, workers: int = 1):
         self.charts = charts
         self.strategies = strategies
         self.exchange = exchange
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analyze") if self.workers > 1 else None
+        self.last_analyze_seconds = 0.0
+        self.last_chart_seconds: dict[str, float] = {}
 
-    def analyze(self):
+    def analyze(self, charts: list[IChart] | None = None):
+        """Analyzes the given charts (all charts by default) and opens positions for their signals."""
         if not config.enabled("agent.analyze"):
             return
-        
-        for chart in self.charts:
-            try:
-                if not chart.have_new_data():
-                    continue
-                
-                for strategy in self.strategies: 
+
+        started = time.perf_counter()
+        charts = self.charts if charts is None else charts
+
+        # Fetching and strategy evaluation run in parallel when workers > 1...
+        if self._executor is not None:
+            evaluations = list(self._executor.map(self._evaluate_chart, charts))
+        else:
+            evaluations = [self._evaluate_chart(chart) for chart in charts]
+
+        # ...while positions are opened one chart at a time, in chart order
+        for chart, signals, _ in evaluations:
+            for strategy, signal in signals:
+                try:
+                    self._handle_signal(chart, strategy, signal)
+                except Exception as e:
+                    logging.info("[%s %s] Error: %s", chart.symbol, chart.timeframe, e)
+
+        self.last_chart_seconds = {
+            f"{chart.symbol} {chart.timeframe}": seconds
+            for chart, _, seconds in evaluations if seconds is not None
+        }
+        self.last_analyze_seconds = time.perf_counter() - started
+        if self.last_chart_seconds and logging.getLogger().isEnabledFor(logging.INFO):
+            per_chart = ", ".join(f"{name}: {seconds:.3f}s" for name, seconds in self.last_chart_seconds.items())
+            logging.info("[TradeAgent] Analyzed %d charts in %.3fs (%s)", len(self.last_chart_seconds), self.last_analyze_seconds, per_chart)
+
+    def _evaluate_chart(self, chart: IChart) -> tuple[IChart, list[tuple[IStrategy, Signal]], float | None]:
+        """Runs every strategy on chart; the elapsed time is None when the chart had no new data."""
+        started = time.perf_counter()
+        signals = []
+        try:
+            if not chart.have_new_data():
+                return chart, signals, None
+
+            for strategy in self.strategies:
+                with metrics.time("strategy_signal_seconds", strategy=strategy.STRATEGY_NAME):
                     signal: Signal | None = strategy.generate_signal(chart)
-                    if (
-                        signal and 
-                        (
-                            (signal.type == "Long" and config.enabled("agent.long")) or 
-                            (signal.type == "Short" and config.enabled("agent.short"))
-                        )
-                    ):
-                        new_position = Position.generate_position(chart, strategy, signal)
-
-                        duplicate_found = False
-                        for open_pos in self.exchange.open_positions:
-                            if (new_position.chart.symbol == open_pos.chart.symbol and 
-                                new_position.chart.timeframe == open_pos.chart.timeframe and 
-                                new_position.type == open_pos.type and
-                                new_position.strategy.STRATEGY_NAME == open_pos.strategy.STRATEGY_NAME
-                            ):
-                                open_pos.sl = new_position.sl
-                                open_pos.tp = new_position.tp
-                                duplicate_found = True
-                                break
-
-                        if not duplicate_found:
-                            self.exchange.open_position(new_position)
-            except Exception as e:
-                logging.info(f"[{chart.symbol} {chart.timeframe}] Error: {e}")
+                if signal:
+                    signals.append((strategy, signal))
+        except Exception as e:
+            logging.info("[%s %s] Error: %s", chart.symbol, chart.timeframe, e)
+        return chart, signals, time.perf_counter() - started
+
+    def _handle_signal(self, chart: IChart, strategy: IStrategy, signal: Signal):
+        if not (
+            (signal.type == "Long" and config.enabled("agent.long")) or
+            (signal.type == "Short" and config.enabled("agent.short"))
+        ):
+            return
+
+        new_position = Position.generate_position(chart, strategy, signal)
+
+        open_pos = self.exchange.find_open_position(position_key(new_position))
+        if open_pos is not None:
+            self.exchange.update_levels(open_pos, new_position.sl, new_position.tp)
+        else:
+            self.exchange.open_position(new_position)
@@ -1,32 +1,153 @@
+import logging
 import os
+import time
 
 from config import config
 from strategies.strategy_htf_macd import StrategyHTF_MCD
 from persistence.csv_persistence import CSVPersistence
+from persistence.csv_snapshot_persistence import CSVSnapshotPersistence
+from persistence.position_journal import PositionJournal
+from persistence.sqlite_persistence import SQLitePersistence
 from structs.utils import get_git_commit_hash
 from notifiers.telegram_notifier import TelegramNotifier
+from notifiers.queued_notifier import QueuedNotifier
+from structs.token_bucket import TokenBucket
 from agents.trade_agent import TradeAgent
 from exchanges.virtual_exchange import VirtualExchange
 from charts.binance_chart import BinanceChart, Timeframe
+from charts.chart_registry import chart_registry
+from apps.metrics_server import MetricsServer
+from apps.scheduler import CandleScheduler
+from structs.metrics import metrics
 
 class App1:    
     def __init__(self):
         symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "ADAUSDT", "AVAXUSDT", "XRPUSDT", "TRXUSDT", "DOGEUSDT", "LINKUSDT", "SUIUSDT"]
         timeframes = [Timeframe.MINUTE_15, Timeframe.MINUTE_30]
         telegram_notifier = TelegramNotifier(os.getenv("TELEGRAM_BOT_TOKEN"), os.getenv("TELEGRAM_CHANNEL_ID"))
+        if config.enabled("notifier.queued"):
+            per_second = config.get_float("notifier.max_per_second", 1.0)
+            per_minute = config.get_float("notifier.max_per_minute", 20.0)
+            telegram_notifier = QueuedNotifier(
+                telegram_notifier,
+                buckets=[TokenBucket(per_second, 1), TokenBucket(per_minute / 60, per_minute)],
+                max_queue=config.get_int("notifier.max_queue", 100),
+                policy=config.get_value("notifier.queue_policy", "coalesce"),
+                max_retries=config.get_int("notifier.max_retries", 3)
+            )
 
-        positions_history_logger = CSVPersistence("/HDD/positions_history.csv", True)
-        current_positions_logger = CSVPersistence("/HDD/current_positions.csv", False)
+        if config.get_value("persistence.backend", "csv") == "sqlite":
+            database = config.get_text("persistence.sqlite_path", "/HDD/positions.db")
+            positions_history_logger = SQLitePersistence(database, "positions_history", indexes=("strategy", "symbol", "close_time"))
+            current_positions_logger = SQLitePersistence(
+                database, "current_positions", key="id",
+                volatile_fields=("pnl", "current_price"),
+                refresh_interval=config.get_float("persistence.current_positions_refresh_interval", 60.0)
+            )
+        else:
+            positions_history_logger = CSVPersistence(
+                "/HDD/positions_history.csv", True,
+                buffered=config.enabled("persistence.buffered"),
+                flush_rows=config.get_int("persistence.flush_rows", 100),
+                flush_interval=config.get_float("persistence.flush_interval", 5.0)
+            )
+            current_positions_logger = CSVSnapshotPersistence(
+                "/HDD/current_positions.csv",
+                refresh_interval=config.get_float("persistence.current_positions_refresh_interval", 60.0)
+            )
         strategies = [StrategyHTF_MCD()]
-        charts = [BinanceChart(symbol, tf) for symbol in symbols for tf in timeframes]
-        self.virtual_exchange = VirtualExchange(telegram_notifier, positions_history_logger, current_positions_logger)
-        self.agent = TradeAgent(charts, strategies, self.virtual_exchange)
+        charts = [chart_registry.get(BinanceChart, symbol, tf) for symbol in symbols for tf in timeframes]
+
+        # Keep the extra timeframes the strategies read warm in the registry
+        for chart in charts:
+            for strategy in strategies:
+                for tf in strategy.required_timeframes(chart.timeframe):
+                    chart_registry.get(BinanceChart, chart.symbol, tf)
+
+        if config.enabled("charts.streaming_indicators"):
+            for chart in chart_registry.charts():
+                chart.enable_streaming_indicators()
+        self.notifier = telegram_notifier
+        self.positions_history_logger = positions_history_logger
+        self.current_positions_logger = current_positions_logger
+        self.virtual_exchange = VirtualExchange(
+            telegram_notifier, positions_history_logger, current_positions_logger,
+            keep_closed=config.get_int("exchange.closed_positions_in_memory", 100),
+            digest_window=config.get_float("notifier.digest_window", 0.0)
+        )
+        if config.enabled("journal.enabled"):
+            self._restore_positions(strategies)
+        self.agent = TradeAgent(charts, strategies, self.virtual_exchange, workers=config.get_int("agent.workers", 1))
+        self.scheduler = CandleScheduler(
+            charts,
+            on_charts_due=self.agent.analyze,
+            on_tick=self._tick,
+            settle_delay=config.get_float("scheduler.settle_delay", 2.0),
+            tick_interval=config.get_float("scheduler.price_tick_interval", 1.0)
+        )
+        config.subscribe(self._apply_config)
+
+        self.summary_interval = config.get_float("metrics.summary_interval", 300.0)
+        self._next_summary = time.monotonic() + self.summary_interval
+        self._register_metrics(telegram_notifier)
+        if config.enabled("metrics.enabled"):
+            self.metrics_server = MetricsServer(
+                metrics,
+                host=config.get_value("metrics.host", "127.0.0.1"),
+                port=config.get_int("metrics.port", 9108)
+            ).start()
 
         hello_message = (
             f"Started Version On Server: {get_git_commit_hash()}"
         )
         telegram_notifier.send_message(hello_message)
 
-    def tick(self):
-        self.agent.analyze()
+    def close(self):
+        """Flushes and closes the persistence writers and the notifier; call once the scheduler loop has stopped."""
+        self.positions_history_logger.close()
+        self.current_positions_logger.close()
+        if self.virtual_exchange.journal is not None:
+            self.virtual_exchange.compact_journal()
+            self.virtual_exchange.journal.close()
+        self.virtual_exchange.flush_notifications()
+        self.notifier.close()
+
+    def _tick(self):
         self.virtual_exchange.tick()
+        if self.summary_interval > 0 and time.monotonic() >= self._next_summary:
+            self._next_summary = time.monotonic() + self.summary_interval
+            logging.info("[Metrics] %s", metrics.summary())
+
+    def _register_metrics(self, notifier):
+        """Exposes the counters and gauges other components keep themselves."""
+        metrics.register_callback("open_positions", lambda: self.virtual_exchange.n_active_positions)
+        metrics.register_callback("indicator_cache_hits_total", lambda: sum(chart.indicator_cache.hits for chart in chart_registry.charts()), kind="counter")
+        metrics.register_callback("indicator_cache_misses_total", lambda: sum(chart.indicator_cache.misses for chart in chart_registry.charts()), kind="counter")
+        if isinstance(notifier, QueuedNotifier):
+            metrics.register_histogram("notifier_delivery_seconds", notifier.latency)
+            metrics.register_callback("notifier_queue_depth", lambda: notifier.queue_depth)
+            for outcome in ("sent", "coalesced", "dropped", "failed"):
+                metrics.register_callback("notifier_messages_total", lambda outcome=outcome: getattr(notifier, outcome), kind="counter", outcome=outcome)
+
+    def _apply_config(self, config):
+        """Settings that take effect without a restart when config.ini changes."""
+        self.virtual_exchange.digest_window = config.get_float("notifier.digest_window", 0.0)
+        self.scheduler.settle_delay = config.get_float("scheduler.settle_delay", 2.0)
+        self.scheduler.tick_interval = config.get_float("scheduler.price_tick_interval", 1.0)
+        self.summary_interval = config.get_float("metrics.summary_interval", 300.0)
+
+    def _restore_positions(self, strategies):
+        """Reopens the positions journaled before the last restart, then journals new events."""
+        started = time.perf_counter()
+        journal = PositionJournal(
+            config.get_text("journal.directory", "/HDD/journal"),
+            compact_every=config.get_int("journal.compact_every", 1000),
+            fsync=config.enabled("journal.fsync")
+        )
+        restored = self.virtual_exchange.restore(
+            journal.load(),
+            lambda symbol, timeframe: chart_registry.get(BinanceChart, symbol, Timeframe(timeframe)),
+            strategies
+        )
+        self.virtual_exchange.journal = journal
+        logging.info("[App1] Restored %d open positions in %.1fms", restored, (time.perf_counter() - started) * 1000)
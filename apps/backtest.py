@@ -0,0 +1,97 @@
+import time
+import numpy as np
+from typing import Iterable, List
+from agents.trade_agent import TradeAgent
+from charts.chart_registry import chart_registry
+from charts.historical_chart import HistoricalChart, SimulatedClock
+from exchanges.virtual_exchange import VirtualExchange
+from strategies.strategy_interface import IStrategy
+
+
+class Backtester:
+    """
+    Fast-forwards TradeAgent and VirtualExchange through HistoricalCharts.
+
+    Simulated time jumps from one candle open to the next. At each step the
+    open positions are first resolved against the high/low traded since the
+    previous step (on the finest chart of their symbol), then the charts whose
+    candle just closed are analyzed, exactly as the live app does at a close.
+
+    context_charts are charts the strategies read but do not trade (e.g. the 4h
+    charts of StrategyHTF_MCD); they are put in the chart registry for the run,
+    which is restored to its previous content afterwards. Every timeframe a
+    strategy requires must be supplied, either as a chart or a context chart.
+    """
+
+    def __init__(
+        self,
+        charts: List[HistoricalChart],
+        strategies: List[IStrategy],
+        context_charts: Iterable[HistoricalChart] = (),
+        exchange: VirtualExchange = None,
+        streaming_indicators: bool = True
+    ):
+        self.clock = SimulatedClock()
+        self.charts = list(charts)
+        self.context_charts = list(context_charts)
+        for chart in self.charts + self.context_charts:
+            chart.clock = self.clock
+            if streaming_indicators:
+                chart.enable_streaming_indicators()
+
+        supplied = {(chart.symbol, chart.timeframe) for chart in self.charts + self.context_charts}
+        for chart in self.charts:
+            for strategy in strategies:
+                for timeframe in strategy.required_timeframes(chart.timeframe):
+                    if (chart.symbol, timeframe) not in supplied:
+                        raise ValueError(f"{strategy.STRATEGY_NAME} needs {chart.symbol} {timeframe.value} candles for its {chart.timeframe.value} chart (pass them in context_charts)")
+
+        self.exchange = exchange if exchange is not None else VirtualExchange(None, None, clock=self.clock.timestamp, keep_closed=None)
+        self.exchange.clock = self.clock.timestamp
+        self.agent = TradeAgent(self.charts, strategies, self.exchange)
+        self.steps = 0
+        self.elapsed_seconds = 0.0
+
+    def run(self, start_ms: int = None, end_ms: int = None) -> VirtualExchange:
+        """Replays [start_ms, end_ms] (the whole data set by default) and returns the exchange."""
+        timeline = np.unique(np.concatenate([chart.candles.timestamp for chart in self.charts]))
+        if start_ms is not None:
+            timeline = timeline[timeline >= start_ms]
+        if end_ms is not None:
+            timeline = timeline[timeline <= end_ms]
+
+        # SL/TP are resolved on the most detailed chart of each symbol
+        finest = {}
+        for chart in self.charts:
+            current = finest.get(chart.symbol)
+            if current is None or len(chart.candles) > len(current.candles):
+                finest[chart.symbol] = chart
+
+        saved = chart_registry.snapshot()
+        for chart in self.charts + self.context_charts:
+            chart_registry.register(chart)
+        started = time.perf_counter()
+        try:
+            previous = None
+            for now_ms in timeline.tolist():
+                self.clock.set(now_ms)
+
+                if previous is not None and self.exchange.n_active_positions:
+                    ranges = {}
+                    for symbol, chart in finest.items():
+                        price_range = chart.price_range(previous, now_ms)
+                        if price_range is not None:
+                            ranges[(HistoricalChart, symbol)] = price_range
+                    self.exchange.tick_ranges(ranges)
+
+                due = [chart for chart in self.charts if chart.have_new_data()]
+                if due:
+                    self.agent.analyze(due)
+
+                previous = now_ms
+                self.steps += 1
+        finally:
+            chart_registry.restore(saved)
+            self.elapsed_seconds += time.perf_counter() - started
+
+        return self.exchange
@@ -0,0 +1,83 @@
+import heapq
+import itertools
+import time
+from typing import Callable, Iterable, List
+from charts.chart_interface import IChart
+
+
+class CandleScheduler:
+    """
+    Wakes charts only when their next candle closes. Charts sit in a min-heap
+    keyed on get_next_candle_time() + settle_delay, so finding the due ones
+    costs O(log n) per chart instead of a have_new_data() scan every second.
+    The price tick runs on its own fixed cadence.
+
+    Charts that cannot tell their next candle time, or that did not advance
+    after being woken (e.g. the exchange had not rolled the candle yet), are
+    polled again after poll_interval seconds.
+    """
+
+    def __init__(
+        self,
+        charts: Iterable[IChart],
+        on_charts_due: Callable[[List[IChart]], None],
+        on_tick: Callable[[], None],
+        settle_delay: float = 2.0,
+        tick_interval: float = 1.0,
+        poll_interval: float = 1.0,
+        clock: Callable[[], float] = time.time
+    ):
+        self.on_charts_due = on_charts_due
+        self.on_tick = on_tick
+        self.settle_delay = settle_delay
+        self.tick_interval = tick_interval
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._heap = []
+        self._seq = itertools.count()  # tie-breaker, charts are not comparable
+        self._next_tick = clock()
+
+        now = clock()
+        for chart in charts:
+            self._push(chart, self._due_time(chart, now))
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def next_wakeup(self) -> float:
+        if not self._heap:
+            return self._next_tick
+        return min(self._heap[0][0], self._next_tick)
+
+    def run_pending(self) -> float:
+        """Runs whatever is due and returns the seconds to sleep until the next wake-up."""
+        now = self._clock()
+
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+
+        if due:
+            try:
+                self.on_charts_due(due)
+            finally:
+                after = self._clock()
+                for chart in due:
+                    self._push(chart, max(self._due_time(chart, after), after + self.poll_interval))
+
+        if now >= self._next_tick:
+            # After an analyze pass that overran the cadence, count from when the tick actually ran
+            started = self._clock()
+            self.on_tick()
+            self._next_tick = max(self._next_tick + self.tick_interval, started + self.tick_interval)
+
+        return max(0.0, self.next_wakeup() - self._clock())
+
+    def _due_time(self, chart: IChart, now: float) -> float:
+        next_candle_time = chart.get_next_candle_time()
+        if next_candle_time is None:
+            return now + self.poll_interval
+        return next_candle_time.timestamp() + self.settle_delay
+
+    def _push(self, chart: IChart, due: float) -> None:
+        heapq.heappush(self._heap, (due, next(self._seq), chart))
@@ -0,0 +1,232 @@
+import itertools
+import logging
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Tuple, Type
+from apps.backtest import Backtester
+from charts.binance_chart import BINANCE_INTERVAL_MAP, BinanceAPI
+from charts.candle_store import CANDLE_COLUMNS, CandleArrays
+from charts.chart_interface import Timeframe
+from charts.historical_chart import HistoricalChart
+from strategies.strategy_interface import IStrategy
+
+DatasetKey = Tuple[str, Timeframe]
+
+
+@dataclass
+class SweepJob:
+    symbol: str
+    timeframe: Timeframe
+    strategy_cls: Type[IStrategy]
+    params: dict = field(default_factory=dict)
+    start_ms: int | None = None
+    end_ms: int | None = None
+
+    @classmethod
+    def grid(
+        cls,
+        symbols: Iterable[str],
+        timeframes: Iterable[Timeframe],
+        strategy_cls: Type[IStrategy],
+        param_grid: Dict[str, list],
+        start_ms: int = None,
+        end_ms: int = None
+    ) -> List["SweepJob"]:
+        """One job per symbol x timeframe x combination of the param_grid values."""
+        names = list(param_grid)
+        return [
+            cls(symbol, timeframe, strategy_cls, dict(zip(names, values)), start_ms, end_ms)
+            for symbol, timeframe in itertools.product(symbols, timeframes)
+            for values in itertools.product(*(param_grid[name] for name in names))
+        ]
+
+
+def load_history(symbols: Iterable[str], timeframes: Iterable[Timeframe], start_ms: int, end_ms: int) -> Dict[DatasetKey, CandleArrays]:
+    """Downloads the klines of every symbol x timeframe once, for SharedCandles.publish."""
+    api = BinanceAPI()
+    return {
+        (symbol, timeframe): CandleArrays.from_raw(api.get_candles_range(symbol, BINANCE_INTERVAL_MAP[timeframe], start_ms, end_ms))
+        for symbol, timeframe in itertools.product(symbols, timeframes)
+    }
+
+
+class SharedCandles:
+    """
+    Candle data sets copied once into shared memory. Every column is 8 bytes
+    wide, so a data set of n candles is one block holding its columns back to
+    back; workers map the block and get CandleArrays views without copying.
+    """
+
+    def __init__(self, datasets: Dict[DatasetKey, CandleArrays]):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.manifest: Dict[Tuple[str, str], Tuple[str, int]] = {}
+
+        try:
+            for (symbol, timeframe), candles in datasets.items():
+                n = len(candles)
+                block = shared_memory.SharedMemory(create=True, size=max(1, n * 8 * len(CANDLE_COLUMNS)))
+                self._blocks.append(block)
+                for name, column in self._columns(block, n).items():
+                    column[:] = getattr(candles, name)
+                self.manifest[(symbol, timeframe.value)] = (block.name, n)
+        except Exception:
+            self.close()
+            raise
+
+    @staticmethod
+    def _columns(block: shared_memory.SharedMemory, n: int) -> Dict[str, np.ndarray]:
+        return {
+            name: np.ndarray((n,), dtype=dtype, buffer=block.buf, offset=i * n * 8)
+            for i, (name, dtype) in enumerate(CANDLE_COLUMNS.items())
+        }
+
+    @classmethod
+    def attach(cls, manifest: Dict[Tuple[str, str], Tuple[str, int]]) -> Tuple[Dict[DatasetKey, CandleArrays], list]:
+        """Maps the published data sets; keep the returned blocks alive while the arrays are used."""
+        datasets, blocks = {}, []
+        for (symbol, timeframe), (name, n) in manifest.items():
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            columns = cls._columns(block, n)
+            for column in columns.values():
+                column.flags.writeable = False
+            datasets[(symbol, Timeframe(timeframe))] = CandleArrays(**columns)
+        return datasets, blocks
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self) -> "SharedCandles":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Per worker process: the shared data sets, mapped once by _init_worker
+_worker_datasets: Dict[DatasetKey, CandleArrays] = {}
+_worker_blocks: list = []
+
+def _init_worker(manifest) -> None:
+    global _worker_datasets, _worker_blocks
+    _worker_datasets, _worker_blocks = SharedCandles.attach(manifest)
+
+def _missing_datasets(job: SweepJob, strategy: IStrategy, datasets: Dict[DatasetKey, CandleArrays]) -> List[str]:
+    """The data sets the job's chart and its strategy's context charts need but datasets lacks, as "(symbol, tf)"."""
+    timeframes = [job.timeframe] + strategy.required_timeframes(job.timeframe)
+    return [f"({job.symbol}, {timeframe.value})" for timeframe in timeframes if (job.symbol, timeframe) not in datasets]
+
+def run_job(job: SweepJob, datasets: Dict[DatasetKey, CandleArrays]) -> dict:
+    """Backtests one job and summarizes its closed positions (profits in R)."""
+    started = time.perf_counter()
+    strategy = job.strategy_cls(**job.params)
+    missing = _missing_datasets(job, strategy, datasets)
+    if missing:
+        raise ValueError(f"{job.strategy_cls.STRATEGY_NAME} needs the {', '.join(missing)} data set for {job.timeframe.value} jobs")
+    chart = HistoricalChart(job.symbol, job.timeframe, datasets[(job.symbol, job.timeframe)])
+    context_charts = [
+        HistoricalChart(job.symbol, timeframe, datasets[(job.symbol, timeframe)])
+        for timeframe in strategy.required_timeframes(job.timeframe)
+    ]
+    exchange = Backtester([chart], [strategy], context_charts).run(job.start_ms, job.end_ms)
+
+    profits = np.array([pos.profit for pos in exchange.closed_positions], dtype=np.float64)
+    equity = np.cumsum(profits)
+    drawdown = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity if len(equity) else np.zeros(0)
+    return {
+        "trades": len(profits),
+        "wins": int((profits > 0).sum()),
+        "losses": int((profits < 0).sum()),
+        "profit_sum": float(profits.sum()),
+        "max_drawdown": float(drawdown.max()) if len(drawdown) else 0.0,
+        "open_positions": exchange.n_active_positions,
+        "seconds": time.perf_counter() - started,
+    }
+
+def _run_worker_job(job: SweepJob) -> dict:
+    # A failing job must not take the results of the whole sweep down with it
+    try:
+        return run_job(job, _worker_datasets)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+class ParameterSweep:
+    """
+    Fans SweepJobs out over a process pool. The candle data sets are published
+    to shared memory once; each worker maps them when it starts and reuses
+    them for every job it runs.
+
+    Missing data sets are reported before any job starts. A job that fails
+    while running gets its message in the "error" column (empty for the
+    others) and zeroed results.
+    """
+
+    def __init__(self, datasets: Dict[DatasetKey, CandleArrays], workers: int = None):
+        self.datasets = datasets
+        self.workers = workers or os.cpu_count() or 1
+
+    def run(self, jobs: List[SweepJob], results_path: str = None) -> Dict[str, np.ndarray]:
+        """Runs every job and returns (and optionally saves) the results as columns."""
+        started = time.perf_counter()
+        self._check_datasets(jobs)
+        with SharedCandles(self.datasets) as shared:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(shared.manifest,)) as executor:
+                chunksize = max(1, len(jobs) // (self.workers * 4))
+                rows = list(executor.map(_run_worker_job, jobs, chunksize=chunksize))
+
+        results = self._to_columns(jobs, rows)
+        if results_path is not None:
+            save_results(results_path, results)
+        logging.info("[ParameterSweep] %d jobs on %d workers in %.1fs", len(jobs), self.workers, time.perf_counter() - started)
+        return results
+
+    def _check_datasets(self, jobs: List[SweepJob]) -> None:
+        missing = set()
+        for job in jobs:
+            try:
+                strategy = job.strategy_cls(**job.params)
+            except Exception:
+                continue  # Reported in the job's error column
+            missing.update(_missing_datasets(job, strategy, self.datasets))
+        if missing:
+            raise ValueError(f"Missing data sets: {', '.join(sorted(missing))}")
+
+    @staticmethod
+    def _to_columns(jobs: List[SweepJob], rows: List[dict]) -> Dict[str, np.ndarray]:
+        columns = {
+            "symbol": np.array([job.symbol for job in jobs], dtype=str),
+            "timeframe": np.array([job.timeframe.value for job in jobs], dtype=str),
+            "strategy": np.array([job.strategy_cls.STRATEGY_NAME for job in jobs], dtype=str),
+            "params": np.array([repr(job.params) for job in jobs], dtype=str),
+        }
+
+        # Numeric parameters also get a column each, for filtering and sorting
+        names = sorted({name for job in jobs for name in job.params})
+        for name in names:
+            values = [job.params.get(name) for job in jobs]
+            if all(value is None or (isinstance(value, (int, float)) and not isinstance(value, bool)) for value in values):
+                columns[f"param_{name}"] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+        for name in ("trades", "wins", "losses", "open_positions"):
+            columns[name] = np.array([row.get(name, 0) for row in rows], dtype=np.int64)
+        for name in ("profit_sum", "max_drawdown", "seconds"):
+            columns[name] = np.array([row.get(name, 0.0) for row in rows], dtype=np.float64)
+        columns["error"] = np.array([row.get("error", "") for row in rows], dtype=str)
+        return columns
+
+
+def save_results(path: str, results: Dict[str, np.ndarray]) -> None:
+    """Writes the result columns to a compressed .npz file."""
+    np.savez_compressed(path, **results)
+
+def load_results(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
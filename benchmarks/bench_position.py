@@ -0,0 +1,49 @@
+"""
+Per-position cost of the per-tick price update (one position at a time and
+through TriggerBook.mark) and of creating a Position.
+
+    python -m benchmarks.bench_position
+"""
+import sys
+import timeit
+from unittest.mock import MagicMock
+from exchanges.trigger_index import TriggerBook
+from structs.position import Position
+from structs.signal import Signal
+
+def main(n: int = 1000, repeat: int = 5, number: int = 200):
+    chart, strategy = MagicMock(), MagicMock()
+    positions = [
+        Position.generate_position(chart, strategy, Signal(entry=100.0, sl=95.0, tp=110.0, type="Long" if i % 2 else "Short"))
+        for i in range(n)
+    ]
+    prices = [100.0 + (i % 21 - 10) * 0.5 for i in range(number)]
+
+    def update():
+        for price in prices:
+            for pos in positions:
+                pos.current_price = price
+
+    best = min(timeit.repeat(update, repeat=repeat, number=1))
+    print(f"current_price update: {best / (n * number) * 1e9:.0f} ns/position")
+
+    book = TriggerBook()
+    for pos in positions:
+        book.add(pos)
+
+    def mark():
+        for price in prices:
+            book.mark(price)
+
+    best = min(timeit.repeat(mark, repeat=repeat, number=1))
+    print(f"TriggerBook.mark:     {best / (n * number) * 1e9:.0f} ns/position")
+
+    signal = Signal(entry=100.0, sl=95.0, tp=110.0, type="Long")
+    best = min(timeit.repeat(lambda: Position.generate_position(chart, strategy, signal), repeat=repeat, number=100000))
+    print(f"generate_position:    {best / 100000 * 1e9:.0f} ns")
+    instance_dict = getattr(positions[0], "__dict__", None)
+    size = sys.getsizeof(positions[0]) + (sys.getsizeof(instance_dict) if instance_dict is not None else 0)
+    print(f"Position size:        {size} bytes")
+
+if __name__ == "__main__":
+    main()
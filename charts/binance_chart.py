@@ -1,8 +1,18 @@
+import json
 import logging
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from collections import deque
 from datetime import datetime, timedelta, timezone
+from itertools import islice
 from typing import List
+from charts.candle_store import CandleArrays, CandleStore
 from charts.chart_interface import IChart, Timeframe
+from config import config
+from structs.latency_histogram import LatencyHistogram
+from structs.metrics import metrics
 
 
 BINANCE_INTERVAL_MAP = {
@@ -27,24 +37,136 @@ BINANCE_INTERVAL_MAP = {
 class BinanceAPI:
     BASE_URL = "https://api.binance.com/api/v3"
 
+    # One keep-alive connection pool for every BinanceAPI instance in the process
+    _session: requests.Session | None = None
+    _timeout: tuple = (3.05, 10.0)
+    latency: dict = {}  # key: endpoint, value: LatencyHistogram
+
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        if cls._session is None:
+            cls._timeout = (
+                config.get_float("binance.connect_timeout", 3.05),
+                config.get_float("binance.read_timeout", 10.0)
+            )
+            pool_size = config.get_int("binance.max_connections", 10)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            cls._session = session
+        return cls._session
+
+    def _get(self, endpoint: str, params: dict):
+        session = self._get_session()
+        started = time.perf_counter()
+        try:
+            response = session.get(f"{self.BASE_URL}/{endpoint}", params=params, timeout=self._timeout)
+            response.raise_for_status()
+            return response.json()
+        finally:
+            histogram = BinanceAPI.latency.get(endpoint)
+            if histogram is None:
+                histogram = BinanceAPI.latency.setdefault(endpoint, LatencyHistogram())
+            histogram.observe(time.perf_counter() - started)
+
     def get_candles(self, symbol, interval, limit=2):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        logging.info(f"[{timestamp}] API Called -> Symbol: {symbol} | Interval: {interval} | Limit: {limit}")
-        response = requests.get(f"{self.BASE_URL}/klines", params={
+        logging.info("[BinanceAPI] API Called -> Symbol: %s | Interval: %s | Limit: %s", symbol, interval, limit)
+        return self._get("klines", {
             "symbol": symbol,
             "interval": interval,
             "limit": limit
         })
-        response.raise_for_status()
-        return response.json()
+
+    def get_candles_range(self, symbol, interval, start_ms: int, end_ms: int, page_size: int = 1000) -> List[list]:
+        """Every kline opened in [start_ms, end_ms], fetched page by page."""
+        rows = []
+        while start_ms <= end_ms:
+            page = self._get("klines", {
+                "symbol": symbol,
+                "interval": interval,
+                "startTime": start_ms,
+                "endTime": end_ms,
+                "limit": page_size
+            })
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+            start_ms = int(page[-1][0]) + 1
+        return rows
 
     def get_current_price(self, symbol):
-        response = requests.get(f"{self.BASE_URL}/ticker/price", params={"symbol": symbol})
-        response.raise_for_status()
-        return float(response.json()["price"])
+        return float(self._get("ticker/price", {"symbol": symbol})["price"])
+
+    def get_current_prices(self, symbols: List[str]) -> dict:
+        """Prices of several symbols in one request (multi-symbol form of /ticker/price)."""
+        tickers = self._get("ticker/price", {"symbols": json.dumps(list(symbols), separators=(",", ":"))})
+        return {ticker["symbol"]: float(ticker["price"]) for ticker in tickers}
+
+
+# The count of each endpoint's histogram is its number of API calls
+metrics.register_histograms("binance_request_seconds", "endpoint", BinanceAPI.latency)
+
+
+class KlineRingBuffer:
+    """
+    Growing ring buffer of raw klines for a single (symbol, timeframe).
+
+    Rows are kept in open-time order. The capacity only grows: it is the deepest
+    window any chart has asked for, so the whole window is downloaded once and
+    afterwards only the candles that closed since the last fetch are requested.
+    New rows are also parsed once into a columnar CandleStore.
+    """
+
+    def __init__(self):
+        self._rows: deque = deque(maxlen=0)
+        self.store = CandleStore()
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def capacity(self) -> int:
+        return self._rows.maxlen
+
+    @property
+    def last_open_dt(self) -> datetime | None:
+        if not self._rows:
+            return None
+        return datetime.fromtimestamp(self._rows[-1][0] / 1000, tz=timezone.utc)
+
+    def grow(self, capacity: int) -> None:
+        if capacity > self.capacity:
+            self._rows = deque(self._rows, maxlen=capacity)
+            self.store.grow(capacity)
+
+    def merge(self, rows: List[list]) -> None:
+        """
+        Appends freshly fetched rows. The fetch is authoritative for the range it
+        covers, so buffered rows opening at or after its first candle (typically
+        the candle that was still forming during the previous fetch) are replaced.
+        """
+        if not rows:
+            return
+
+        first_open = rows[0][0]
+        while self._rows and self._rows[-1][0] >= first_open:
+            self._rows.pop()
+        self._rows.extend(rows)
+
+        self.store.truncate_from(first_open)
+        self.store.append(CandleArrays.from_raw(rows))
+
+    def latest(self, n: int) -> List[list]:
+        if n <= 0:
+            return []
+        size = len(self._rows)
+        return list(islice(self._rows, max(size - n, 0), size))
+
 
 class BinanceChart(IChart):
-    _shared_ohlcv_cache = {}  # key: (symbol, timeframe, n), value: (last_ts, data)
+    _shared_klines = {}  # key: (symbol, timeframe), value: KlineRingBuffer
+    _shared_klines_lock = threading.Lock()
 
     def __init__(self, symbol: str, timeframe: Timeframe):
         if not BINANCE_INTERVAL_MAP.get(timeframe):
@@ -59,30 +181,79 @@ class BinanceChart(IChart):
     def get_current_price(self) -> float:
         return self._binance_api.get_current_price(self.symbol)
 
-    def get_recent_raw_ohlcv(self, n: int) -> List[list]:        
+    @classmethod
+    def get_current_prices(cls, charts: List[IChart]) -> dict:
+        symbols = sorted({chart.symbol for chart in charts})
+        if not symbols:
+            return {}
+        return charts[0]._binance_api.get_current_prices(symbols)
+
+    def get_recent_raw_ohlcv(self, n: int) -> List[list]:
+        return self._refreshed_buffer(n).latest(n)
+
+    def get_recent_arrays(self, n: int) -> CandleArrays:
+        return self._refreshed_buffer(n).store.tail(n)
+
+    def _refreshed_buffer(self, n: int) -> KlineRingBuffer:
         interval_str = BINANCE_INTERVAL_MAP.get(self.timeframe)
         if not interval_str:
             raise ValueError(f"Unsupported timeframe: {self.timeframe}")
 
-        cache_key = (self.symbol, self.timeframe, n)
-        cached = BinanceChart._shared_ohlcv_cache.get(cache_key)
+        buffer = self._shared_buffer()
+
+        # Charts of the same (symbol, timeframe) may be refreshed from several analyze workers
+        with buffer.lock:
+            # Another instance may already have advanced the shared buffer
+            buffer_last_dt = buffer.last_open_dt
+            if buffer_last_dt is not None and buffer_last_dt > self.last_seen_candle_dt:
+                self.last_seen_candle_dt = buffer_last_dt
 
-        if cached and not self.have_new_data():
-            _, data = cached
-            return data
+            if buffer.capacity >= n and not self.have_new_data():
+                return buffer
 
-        # Fetch fresh data
-        data = self._binance_api.get_candles(
-            symbol=self.symbol,
-            interval=interval_str,
-            limit=n
-        )
+            # Fetch only what is missing (or the whole window on first use)
+            data = self._binance_api.get_candles(
+                symbol=self.symbol,
+                interval=interval_str,
+                limit=self._fetch_limit(buffer, n)
+            )
 
-        if data:
-            self.last_seen_candle_dt = datetime.fromtimestamp(data[-1][0] / 1000, tz=timezone.utc)
-            BinanceChart._shared_ohlcv_cache[cache_key] = (self.last_seen_candle_dt, data)
+            if data:
+                buffer.grow(n)
+                buffer.merge(data)
+                self.last_seen_candle_dt = datetime.fromtimestamp(data[-1][0] / 1000, tz=timezone.utc)
 
-        return data
+            return buffer
+
+    def _shared_buffer(self) -> KlineRingBuffer:
+        key = (self.symbol, self.timeframe)
+        buffer = BinanceChart._shared_klines.get(key)
+        if buffer is None:
+            # Created once, under the lock, so two workers never end up with different buffers
+            with BinanceChart._shared_klines_lock:
+                buffer = BinanceChart._shared_klines.get(key)
+                if buffer is None:
+                    buffer = BinanceChart._shared_klines[key] = KlineRingBuffer()
+        return buffer
+
+    def _fetch_limit(self, buffer: KlineRingBuffer, n: int) -> int:
+        if buffer.capacity < n or len(buffer) == 0:
+            return n
+
+        # Candles opened since the last seen one, plus the last seen one itself
+        # because it was still forming when it was fetched.
+        elapsed = datetime.now(timezone.utc) - self.last_seen_candle_dt
+        missing = int(elapsed.total_seconds() // self._interval_seconds())
+        return min(missing + 1, buffer.capacity)
+
+    def _interval_seconds(self) -> int:
+        interval = self.timeframe.value
+        unit = interval[-1]
+        value = int(interval[:-1])
+        seconds_per_unit = {"m": 60, "h": 3600, "d": 86400, "w": 604800}.get(unit)
+        if seconds_per_unit is None:
+            raise ValueError(f"Unsupported interval format: {interval}")
+        return value * seconds_per_unit
     
     def get_next_candle_time(self) -> datetime:
         interval = self.timeframe.value
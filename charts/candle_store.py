@@ -0,0 +1,158 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Iterator, List
+
+@dataclass
+class Candle:
+    timestamp: int                     # Open time (Unix ms)
+    open: float                        # Open price
+    high: float                        # High price
+    low: float                         # Low price
+    close: float                       # Close price
+    volume: float                      # Base asset volume
+    close_time: int                    # Close time (Unix ms)
+    quote_volume: float                # Quote asset volume
+    trade_count: int                   # Number of trades
+    taker_buy_base_volume: float       # Taker buy base asset volume
+    taker_buy_quote_volume: float      # Taker buy quote asset volume
+
+    def __eq__(self, other):
+        # Used for comparison in tests
+        return isinstance(other, Candle) and all(
+            getattr(self, attr) == getattr(other, attr)
+            for attr in ['timestamp', 'open', 'close'] # Compare key attributes
+        )
+
+# Binance kline field order (the trailing "ignore" field is dropped)
+CANDLE_COLUMNS = {
+    "timestamp": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "close_time": np.int64,
+    "quote_volume": np.float64,
+    "trade_count": np.int64,
+    "taker_buy_base_volume": np.float64,
+    "taker_buy_quote_volume": np.float64,
+}
+
+class CandleArrays:
+    """
+    Columnar candles: one int64/float64 array per Candle field, parsed once.
+    Slicing and tail() return views, never copies. Indexing a single row builds
+    a Candle on demand, so it can be passed wherever a List[Candle] was expected.
+    """
+    __slots__ = tuple(CANDLE_COLUMNS)
+
+    def __init__(self, **columns: np.ndarray):
+        for name in CANDLE_COLUMNS:
+            setattr(self, name, columns[name])
+
+    @classmethod
+    def empty(cls, size: int = 0) -> "CandleArrays":
+        return cls(**{name: np.empty(size, dtype=dtype) for name, dtype in CANDLE_COLUMNS.items()})
+
+    @classmethod
+    def from_raw(cls, raw_candles: List[list]) -> "CandleArrays":
+        if not raw_candles:
+            return cls.empty()
+
+        width = len(CANDLE_COLUMNS)
+        table = np.array([row[:width] for row in raw_candles], dtype=object)
+        return cls(**{
+            name: table[:, i].astype(dtype)
+            for i, (name, dtype) in enumerate(CANDLE_COLUMNS.items())
+        })
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CandleArrays(**{name: getattr(self, name)[index] for name in CANDLE_COLUMNS})
+
+        return Candle(
+            timestamp=int(self.timestamp[index]),
+            open=float(self.open[index]),
+            high=float(self.high[index]),
+            low=float(self.low[index]),
+            close=float(self.close[index]),
+            volume=float(self.volume[index]),
+            close_time=int(self.close_time[index]),
+            quote_volume=float(self.quote_volume[index]),
+            trade_count=int(self.trade_count[index]),
+            taker_buy_base_volume=float(self.taker_buy_base_volume[index]),
+            taker_buy_quote_volume=float(self.taker_buy_quote_volume[index])
+        )
+
+    def __iter__(self) -> Iterator[Candle]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def tail(self, n: int) -> "CandleArrays":
+        size = len(self)
+        return self[max(size - n, 0) if n > 0 else size:]
+
+class CandleStore:
+    """
+    Bounded columnar window of the most recent candles with amortised O(1)
+    appends. Rows that were handed out through tail() are never written again:
+    replacing them (e.g. the candle that was still forming) or running out of
+    room moves the window into fresh arrays instead, so views stay stable.
+    """
+
+    def __init__(self):
+        self._capacity = 0
+        self._data = CandleArrays.empty()
+        self._start = 0
+        self._end = 0
+        self._exposed_end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._data.timestamp[self._start:self._end]
+
+    def grow(self, capacity: int) -> None:
+        self._capacity = max(self._capacity, capacity)
+
+    def truncate_from(self, open_time: int) -> None:
+        """Drops every candle opened at or after open_time."""
+        self._end = self._start + int(np.searchsorted(self.timestamps, open_time, side="left"))
+
+    def append(self, candles: CandleArrays) -> None:
+        candles = candles.tail(self._capacity)
+        n = len(candles)
+        if n == 0:
+            return
+
+        if self._end < self._exposed_end or self._end + n > len(self._data):
+            self._start = max(self._start, self._end + n - self._capacity)
+            self._reallocate(n)
+
+        for name in CANDLE_COLUMNS:
+            getattr(self._data, name)[self._end:self._end + n] = getattr(candles, name)
+        self._end += n
+        self._start = max(self._start, self._end - self._capacity)
+
+    def tail(self, n: int) -> CandleArrays:
+        self._exposed_end = max(self._exposed_end, self._end)
+        start = max(self._end - n, self._start) if n > 0 else self._end
+        return self._data[start:self._end]
+
+    def _reallocate(self, extra: int) -> None:
+        retained = self._data[self._start:self._end]
+        size = len(retained)
+        data = CandleArrays.empty(max(2 * self._capacity, size + extra))
+        for name in CANDLE_COLUMNS:
+            getattr(data, name)[:size] = getattr(retained, name)
+        self._data = data
+        self._start, self._end, self._exposed_end = 0, size, 0
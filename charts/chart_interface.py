@@ -1,11 +1,16 @@
 from datetime import datetime
 import statistics
+import threading
 import pandas as pd
 import pandas_ta as ta
 from dataclasses import dataclass
 from enum import Enum
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Callable, List
+from charts.candle_store import Candle, CandleArrays
+from charts.indicator_cache import IndicatorCache
+from charts.streaming_indicators import IndicatorEngine
+from structs.metrics import metrics
 
 @dataclass
 class TrendMetrics:
@@ -14,27 +19,6 @@ class TrendMetrics:
     plus_di: float
     minus_di: float
 
-@dataclass
-class Candle:
-    timestamp: int                     # Open time (Unix ms)
-    open: float                        # Open price
-    high: float                        # High price
-    low: float                         # Low price
-    close: float                       # Close price
-    volume: float                      # Base asset volume
-    close_time: int                    # Close time (Unix ms)
-    quote_volume: float                # Quote asset volume
-    trade_count: int                   # Number of trades
-    taker_buy_base_volume: float       # Taker buy base asset volume
-    taker_buy_quote_volume: float      # Taker buy quote asset volume
-
-    def __eq__(self, other):
-        # Used for comparison in tests
-        return isinstance(other, Candle) and all(
-            getattr(self, attr) == getattr(other, attr) 
-            for attr in ['timestamp', 'open', 'close'] # Compare key attributes
-        )
-
 class Timeframe(Enum):
     MINUTE_1    = "1m"
     MINUTE_3    = "3m"
@@ -62,6 +46,9 @@ class IChart(ABC):
     def __init__(self, symbol: str, timeframe: Timeframe):
         self._symbol = symbol
         self._timeframe = timeframe
+        self.indicator_engine: IndicatorEngine | None = None
+        self.indicator_cache = IndicatorCache()
+        self._lock = threading.RLock()  # indicator state is shared by concurrent analyze workers
     
     @property
     def symbol(self) -> str:
@@ -71,6 +58,13 @@ class IChart(ABC):
     def timeframe(self) -> Timeframe:
         return self._timeframe
     
+    def enable_streaming_indicators(self) -> None:
+        """
+        Answers MACD, RSI, ATR and ADX from an incremental IndicatorEngine
+        instead of re-running pandas_ta over the whole window on every call.
+        """
+        self.indicator_engine = IndicatorEngine()
+
     @abstractmethod
     def get_current_candle_time(self) -> datetime:
         pass
@@ -79,69 +73,101 @@ class IChart(ABC):
     def have_new_data(self, now: datetime = None) -> bool:
         pass
 
+    def get_next_candle_time(self) -> datetime | None:
+        """Open time of the next candle, or None if unknown (schedulers then poll the chart)."""
+        return None
+
     @abstractmethod
     def get_current_price(self) -> float:
         pass
 
+    @classmethod
+    def get_current_prices(cls, charts: List["IChart"]) -> dict:
+        """
+        Price snapshot keyed by symbol for several charts of this class. Charts
+        whose API can quote many symbols at once should override this; the
+        default asks each distinct symbol once.
+        """
+        prices = {}
+        for chart in charts:
+            if chart.symbol not in prices:
+                prices[chart.symbol] = chart.get_current_price()
+        return prices
+
     @abstractmethod
     def get_recent_raw_ohlcv(self, n: int) -> List[list]:
         pass
 
-    def get_recent_candles(self, n: int) -> List[Candle]:
-            raw_candles = self.get_recent_raw_ohlcv(n)
-            return [
-                Candle(
-                    timestamp=int(ts),
-                    open=float(o),
-                    high=float(h),
-                    low=float(l),
-                    close=float(c),
-                    volume=float(v),
-                    close_time=int(ct),
-                    quote_volume=float(qv),
-                    trade_count=int(tc),
-                    taker_buy_base_volume=float(tbv),
-                    taker_buy_quote_volume=float(tbqv)
-                )
-                for ts, o, h, l, c, v, ct, qv, tc, tbv, tbqv, _ in raw_candles
-            ]
+    def get_recent_arrays(self, n: int) -> CandleArrays:
+        """
+        Columnar view of the last n candles. Charts that keep their klines parsed
+        should override this; the default parses the raw rows on every call.
+        """
+        return CandleArrays.from_raw(self.get_recent_raw_ohlcv(n))
+
+    def get_recent_candles(self, n: int) -> CandleArrays:
+        # CandleArrays behaves like a List[Candle]: rows become Candle objects only when indexed
+        return self.get_recent_arrays(n)
 
     def get_recent_dataframes(self, period: int) -> pd.DataFrame:
         """
-        Helper to convert raw OHLCV data directly into a Pandas DataFrame,
+        Helper to convert the columnar candles directly into a Pandas DataFrame,
         bypassing object instantiation for maximum efficiency.
         
         Fetches one extra candle (period + 1) for accurate indicator calculations
         which often require the prior close or delta.
         """
-        # Fetch raw data list of lists
-        raw_candles = self.get_recent_raw_ohlcv(period + 1) 
-        
-        if not raw_candles:
+        return self._to_dataframe(self.get_recent_arrays(period + 1))
+
+    @staticmethod
+    def _to_dataframe(candles: CandleArrays) -> pd.DataFrame:
+        if not len(candles):
             return pd.DataFrame()
 
-        df = pd.DataFrame(raw_candles, columns=[
-            'timestamp', 'Open', 'High', 'Low', 'Close', 'Volume', 
-            'close_time', 'quote_volume', 'trade_count', 
-            'taker_buy_base_volume', 'taker_buy_quote_volume', 'ignore' # Binance API returns 12 fields
-        ])
-        
-        # Convert necessary columns from string (Binance API output) to float/numeric
-        # Only Open, High, Low, Close are needed for OHLCV indicators
-        numeric_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-        df[numeric_cols] = df[numeric_cols].astype(float)
-        
-        # Clean up and set index
-        df.drop(columns=['ignore'], inplace=True)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        
-        # The DataFrame already contains the (period + 1) rows required, so no need 
-        # for df.iloc[-(period + 1):] if we assume the API returns the exact limit amount.
-        return df
+        with metrics.time("dataframe_build_seconds"):
+            return IChart._build_dataframe(candles)
+
+    @staticmethod
+    def _build_dataframe(candles: CandleArrays) -> pd.DataFrame:
+        index = pd.to_datetime(candles.timestamp, unit='ms')
+        index.name = 'timestamp'
+        return pd.DataFrame({
+            'Open': candles.open,
+            'High': candles.high,
+            'Low': candles.low,
+            'Close': candles.close,
+            'Volume': candles.volume,
+            'close_time': candles.close_time,
+            'quote_volume': candles.quote_volume,
+            'trade_count': candles.trade_count,
+            'taker_buy_base_volume': candles.taker_buy_base_volume,
+            'taker_buy_quote_volume': candles.taker_buy_quote_volume,
+        }, index=index)
+
+    def _memoized(self, name: str, params: tuple, n: int, compute: Callable[[CandleArrays], Any]) -> Any:
+        """
+        Runs compute over the last n candles at most once per candle. Results are
+        cached under the open time and close of the latest candle, so a forming
+        candle that ticked since the last call is computed again.
+        """
+        with self._lock:
+            candles = self.get_recent_arrays(n)
+            if not len(candles):
+                return compute(candles)
+
+            key = (int(candles.timestamp[-1]), float(candles.close[-1]), name, params)
+            return self.indicator_cache.get_or_compute(key, lambda: self._timed(name, compute, candles))
+
+    @staticmethod
+    def _timed(name: str, compute: Callable[[CandleArrays], Any], candles: CandleArrays) -> Any:
+        with metrics.time("indicator_seconds", indicator=name):
+            return compute(candles)
 
     def get_sma(self, period: int) -> float:
-        df = self.get_recent_dataframes(period)
+        return self._memoized("sma", (period,), period + 1, lambda candles: self._compute_sma(candles, period))
+
+    def _compute_sma(self, candles: CandleArrays, period: int) -> float:
+        df = self._to_dataframe(candles)
         if df.empty: return 0.0
         
         # ta.sma returns a Series of SMA values
@@ -150,7 +176,10 @@ class IChart(ABC):
         return sma_series.iloc[-1]
 
     def get_ema(self, period: int) -> float:
-        df = self.get_recent_dataframes(period)
+        return self._memoized("ema", (period,), period + 1, lambda candles: self._compute_ema(candles, period))
+
+    def _compute_ema(self, candles: CandleArrays, period: int) -> float:
+        df = self._to_dataframe(candles)
         if df.empty: return 0.0
         
         # ta.ema returns a Series of EMA values
@@ -158,12 +187,17 @@ class IChart(ABC):
         return ema_series.iloc[-1]
     
     def get_rsi(self, period: int) -> float:
-        df = self.get_recent_dataframes(period + 100)  # Ensure enough data for smoothing
-        
-        if df.empty or len(df) < period + 20:
+        # Ensure enough data for smoothing
+        return self._memoized("rsi", (period,), period + 101, lambda candles: self._compute_rsi(candles, period))
+
+    def _compute_rsi(self, candles: CandleArrays, period: int) -> float:
+        if len(candles) < period + 20:
             return 50.0  # Fallback
 
-        close = df['Close']
+        if self.indicator_engine is not None:
+            return self.indicator_engine.rsi(candles, period)
+
+        close = self._to_dataframe(candles)['Close']
         delta = close.diff()
         gain = delta.clip(lower=0)
         loss = -delta.clip(upper=0)
@@ -181,13 +215,25 @@ class IChart(ABC):
         return rsi_clean.iloc[-1] if not rsi_clean.empty else 50.0
 
     def get_volatility(self, period: int) -> float:
-        closes = [c.close for c in self.get_recent_candles(period)]
+        return self._memoized("volatility", (period,), period, self._compute_volatility)
+
+    def _compute_volatility(self, candles: CandleArrays) -> float:
+        closes = candles.close.tolist()
         return statistics.stdev(closes) if len(closes) > 1 else 0.0
 
     def get_macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> dict:
-        df = self.get_recent_dataframes(slow + signal + 100)
-        if df.empty: return {"macd": 0.0, "signal": 0.0, "histogram": 0.0}
+        return self._memoized(
+            "macd", (fast, slow, signal), slow + signal + 101,
+            lambda candles: self._compute_macd(candles, fast, slow, signal)
+        )
 
+    def _compute_macd(self, candles: CandleArrays, fast: int, slow: int, signal: int) -> dict:
+        if not len(candles): return {"macd": 0.0, "signal": 0.0, "histogram": 0.0}
+
+        if self.indicator_engine is not None:
+            return self.indicator_engine.macd(candles, fast, slow, signal)
+
+        df = self._to_dataframe(candles)
         macd_df = ta.macd(df['Close'], fast=fast, slow=slow, signal=signal)
         
         # The column names are dynamically generated, so we find the last value of each
@@ -214,7 +260,13 @@ class IChart(ABC):
             return TrendDirection.NEUTRAL
 
     def get_bollinger_bands(self, period: int = 20, multiplier: float = 2.0) -> dict:
-        df = self.get_recent_dataframes(period)
+        return self._memoized(
+            "bbands", (period, multiplier), period + 1,
+            lambda candles: self._compute_bollinger_bands(candles, period, multiplier)
+        )
+
+    def _compute_bollinger_bands(self, candles: CandleArrays, period: int, multiplier: float) -> dict:
+        df = self._to_dataframe(candles)
         if df.empty: return {"upper": 0.0, "middle": 0.0, "lower": 0.0}
 
         # ta.bbands returns a DataFrame with upper, middle, and lower bands
@@ -236,11 +288,18 @@ class IChart(ABC):
         Uses pandas_ta ADX function which reliably returns ADX, +DI, and -DI.
         We also include ATR as it is a core component.
         """
-        # ADX requires OHLC data
-        df = self.get_recent_dataframes(period+100)
-        if df.empty:
+        return self._memoized("trend", (period,), period + 101, lambda candles: self._trend_components(candles, period))
+
+    def _trend_components(self, candles: CandleArrays, period: int) -> dict:
+        if not len(candles):
             return {"atr": 0.0, "adx": 0.0, "plus_di": 0.0, "minus_di": 0.0}
 
+        if self.indicator_engine is not None:
+            return self.indicator_engine.trend_components(candles, period)
+
+        # ADX requires OHLC data
+        df = self._to_dataframe(candles)
+
         # ta.adx returns a DataFrame with ADX, +DI, and -DI
         adx_df = ta.adx(df['High'], df['Low'], df['Close'], length=period)
         
@@ -0,0 +1,59 @@
+import threading
+from typing import Dict, List, Tuple, Type
+from charts.chart_interface import IChart, Timeframe
+
+
+class ChartRegistry:
+    """
+    Process-wide pool holding one canonical chart per (chart class, symbol, timeframe).
+    Reusing the same instance keeps its last seen candle and memoized indicators,
+    so a chart that is only consulted (e.g. a higher timeframe) is not refetched
+    from scratch on every signal evaluation.
+    """
+
+    def __init__(self):
+        self._charts: Dict[Tuple[type, str, Timeframe], IChart] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._charts)
+
+    def register(self, chart: IChart) -> IChart:
+        """Registers chart unless an equivalent one exists; returns the canonical instance."""
+        with self._lock:
+            return self._charts.setdefault((type(chart), chart.symbol, chart.timeframe), chart)
+
+    def get(self, chart_cls: Type[IChart], symbol: str, timeframe: Timeframe) -> IChart:
+        key = (chart_cls, symbol, timeframe)
+        with self._lock:
+            chart = self._charts.get(key)
+            if chart is None:
+                chart = self._charts[key] = chart_cls(symbol, timeframe)
+            return chart
+
+    def unregister(self, chart: IChart) -> None:
+        """Removes chart if it is the canonical instance for its key."""
+        key = (type(chart), chart.symbol, chart.timeframe)
+        with self._lock:
+            if self._charts.get(key) is chart:
+                del self._charts[key]
+
+    def charts(self) -> List[IChart]:
+        with self._lock:
+            return list(self._charts.values())
+
+    def snapshot(self) -> Dict[Tuple[type, str, Timeframe], IChart]:
+        """Copy of the current pool, to hand back to restore() later."""
+        with self._lock:
+            return dict(self._charts)
+
+    def restore(self, snapshot: Dict[Tuple[type, str, Timeframe], IChart]) -> None:
+        """Resets the pool to a snapshot, dropping every chart created since."""
+        with self._lock:
+            self._charts = dict(snapshot)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._charts.clear()
+
+chart_registry = ChartRegistry()
@@ -0,0 +1,101 @@
+import numpy as np
+from datetime import datetime, timezone
+from typing import List
+from charts.candle_store import CANDLE_COLUMNS, CandleArrays
+from charts.chart_interface import IChart, Timeframe
+
+
+class SimulatedClock:
+    """Backtest time in Unix ms, moved forward explicitly by the driver."""
+
+    def __init__(self, now_ms: int = 0):
+        self.now_ms = now_ms
+
+    def set(self, now_ms: int) -> None:
+        self.now_ms = int(now_ms)
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.now_ms / 1000, tz=timezone.utc)
+
+    def timestamp(self) -> int:
+        """Unix seconds, the unit VirtualExchange stamps positions with."""
+        return self.now_ms // 1000
+
+
+class HistoricalChart(IChart):
+    """
+    Replays stored klines as if they were live. At simulated time t the chart
+    shows every candle opened at or before t; the last one has only just opened,
+    so it is presented flat at its open price (no look-ahead into its high, low
+    or close).
+    """
+
+    def __init__(self, symbol: str, timeframe: Timeframe, klines: List[list] | CandleArrays = None, clock: SimulatedClock = None):
+        super().__init__(symbol, timeframe)
+        if klines is None:
+            klines = CandleArrays.empty()
+        self._candles = klines if isinstance(klines, CandleArrays) else CandleArrays.from_raw(klines)
+        self.clock = clock if clock is not None else SimulatedClock()
+        self._seen_index = -1
+
+    @property
+    def candles(self) -> CandleArrays:
+        """Every stored candle, including the ones still in the simulated future."""
+        return self._candles
+
+    def _index_at(self, now_ms: int) -> int:
+        # Index of the candle forming at now_ms (-1 before the first candle)
+        return int(np.searchsorted(self._candles.timestamp, now_ms, side="right")) - 1
+
+    def get_current_candle_time(self) -> datetime:
+        i = self._index_at(self.clock.now_ms)
+        if i < 0:
+            return datetime(1970, 1, 1, tzinfo=timezone.utc)
+        return datetime.fromtimestamp(int(self._candles.timestamp[i]) / 1000, tz=timezone.utc)
+
+    def get_next_candle_time(self) -> datetime | None:
+        i = self._index_at(self.clock.now_ms) + 1
+        if i >= len(self._candles):
+            return None
+        return datetime.fromtimestamp(int(self._candles.timestamp[i]) / 1000, tz=timezone.utc)
+
+    def have_new_data(self, now: datetime = None) -> bool:
+        now_ms = self.clock.now_ms if now is None else int(now.timestamp() * 1000)
+        return self._index_at(now_ms) > self._seen_index
+
+    def get_current_price(self) -> float:
+        i = self._index_at(self.clock.now_ms)
+        if i < 0:
+            raise ValueError(f"No {self.symbol} {self.timeframe.value} candle at {self.clock.now()}")
+        return float(self._candles.open[i])
+
+    def get_recent_arrays(self, n: int) -> CandleArrays:
+        i = self._index_at(self.clock.now_ms)
+        self._seen_index = max(self._seen_index, i)
+        if i < 0 or n <= 0:
+            return CandleArrays.empty()
+
+        start = max(i + 1 - n, 0)
+        window = CandleArrays(**{name: getattr(self._candles, name)[start:i + 1].copy() for name in CANDLE_COLUMNS})
+
+        # The forming candle has only just opened
+        price = window.open[-1]
+        window.high[-1] = window.low[-1] = window.close[-1] = price
+        window.volume[-1] = window.quote_volume[-1] = 0.0
+        window.taker_buy_base_volume[-1] = window.taker_buy_quote_volume[-1] = 0.0
+        window.trade_count[-1] = 0
+        return window
+
+    def get_recent_raw_ohlcv(self, n: int) -> List[list]:
+        window = self.get_recent_arrays(n)
+        columns = [getattr(window, name).tolist() for name in CANDLE_COLUMNS]
+        return [[*row, "0"] for row in zip(*columns)]
+
+    def price_range(self, start_ms: int, end_ms: int) -> tuple[float, float, float] | None:
+        """(low, high, close) over the candles opened in [start_ms, end_ms), or None if there are none."""
+        timestamps = self._candles.timestamp
+        lo = int(np.searchsorted(timestamps, start_ms, side="left"))
+        hi = int(np.searchsorted(timestamps, end_ms, side="left"))
+        if lo >= hi:
+            return None
+        return float(self._candles.low[lo:hi].min()), float(self._candles.high[lo:hi].max()), float(self._candles.close[hi - 1])
@@ -0,0 +1,288 @@
+import math
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Callable, List
+from charts.candle_store import CandleArrays
+
+NaN = float("nan")
+
+
+def _shallow_copy(obj):
+    # copy.copy without the __reduce_ex__ round trip; these classes only hold plain attributes
+    twin = object.__new__(type(obj))
+    twin.__dict__.update(obj.__dict__)
+    return twin
+
+
+def _div(a: float, b: float) -> float:
+    # Same semantics as pandas/numpy float division (no ZeroDivisionError)
+    if b == 0:
+        return NaN if a == 0 or a != a else math.copysign(math.inf, a)
+    return a / b
+
+
+class _Ewm:
+    """
+    Incremental exponentially weighted mean. Reproduces
+    pandas.Series.ewm(alpha=..., adjust=..., min_periods=...).mean()
+    one observation at a time, including its NaN handling.
+    """
+
+    def __init__(self, alpha: float, adjust: bool, min_periods: int = 0):
+        self._factor = 1.0 - alpha
+        self._new_wt = 1.0 if adjust else alpha
+        self._adjust = adjust
+        self._min_periods = max(min_periods, 1)
+        self._weighted = NaN
+        self._old_wt = 1.0
+        self._nobs = 0
+
+    @property
+    def value(self) -> float:
+        return self._weighted if self._nobs >= self._min_periods else NaN
+
+    def clone(self) -> "_Ewm":
+        return _shallow_copy(self)
+
+    def update(self, x: float) -> float:
+        is_observation = x == x
+        self._nobs += is_observation
+        if self._weighted == self._weighted:
+            self._old_wt *= self._factor
+            if is_observation:
+                if self._weighted != x:
+                    self._weighted = (self._old_wt * self._weighted + self._new_wt * x) / (self._old_wt + self._new_wt)
+                self._old_wt = self._old_wt + self._new_wt if self._adjust else 1.0
+        elif is_observation:
+            self._weighted = x
+        return self.value
+
+
+class _Ema:
+    """pandas_ta.ema: seeded with the SMA of the first `length` values, then ewm(span=length, adjust=False)."""
+
+    def __init__(self, length: int):
+        self._length = length
+        self._seed: List[float] | None = []
+        self._ewm = _Ewm(alpha=2.0 / (length + 1), adjust=False)
+
+    @property
+    def value(self) -> float:
+        return NaN if self._seed is not None else self._ewm.value
+
+    def clone(self) -> "_Ema":
+        twin = _shallow_copy(self)
+        twin._seed = None if self._seed is None else list(self._seed)
+        twin._ewm = self._ewm.clone()
+        return twin
+
+    def update(self, x: float) -> float:
+        if self._seed is not None:
+            self._seed.append(x)
+            if len(self._seed) < self._length:
+                return NaN
+            x = sum(self._seed) / self._length
+            self._seed = None
+        return self._ewm.update(x)
+
+
+class _Rma(_Ema):
+    """pandas_ta.rma (Wilder's smoothing): same SMA seed, then ewm(alpha=1/length, adjust=False)."""
+
+    def __init__(self, length: int):
+        super().__init__(length)
+        self._ewm = _Ewm(alpha=1.0 / length, adjust=False)
+
+
+class _StreamingIndicator(ABC):
+    """
+    Base class for an indicator fed one candle at a time. It remembers the last
+    consumed candle so a later window can be resumed right after it.
+    """
+
+    def __init__(self):
+        self._last_open_time = None
+        self._last_close = None
+
+    def clone(self) -> "_StreamingIndicator":
+        """Independent copy of the state; much cheaper than copy.deepcopy as it only holds floats and smoothers."""
+        twin = _shallow_copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, (_Ewm, _Ema)):
+                setattr(twin, name, value.clone())
+        return twin
+
+    def consume(self, open_time: int, high: float, low: float, close: float) -> None:
+        self.update(high, low, close)
+        self._last_open_time = open_time
+        self._last_close = close
+
+    def resume_index(self, candles: CandleArrays, end: int) -> int | None:
+        """
+        Index of the first candle in candles[:end] not consumed yet, or None if
+        the window does not continue the consumed history (gap or changed data).
+        """
+        if self._last_open_time is None:
+            return 0
+
+        i = int(np.searchsorted(candles.timestamp[:end], self._last_open_time))
+        if i < end and candles.timestamp[i] == self._last_open_time and candles.close[i] == self._last_close:
+            return i + 1
+        return None
+
+    @abstractmethod
+    def update(self, high: float, low: float, close: float) -> None:
+        pass
+
+    @abstractmethod
+    def value(self):
+        pass
+
+
+class StreamingMacd(_StreamingIndicator):
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        super().__init__()
+        self._fast = _Ema(fast)
+        self._slow = _Ema(slow)
+        self._signal = _Ema(signal)
+        self._macd = NaN
+        self._signal_line = NaN
+
+    def update(self, high: float, low: float, close: float) -> None:
+        self._macd = self._fast.update(close) - self._slow.update(close)
+        if self._macd == self._macd:
+            self._signal_line = self._signal.update(self._macd)
+
+    def value(self) -> dict:
+        return {
+            "macd": self._macd,
+            "signal": self._signal_line,
+            "histogram": self._macd - self._signal_line
+        }
+
+
+class StreamingRsi(_StreamingIndicator):
+    """Wilder RSI matching IChart.get_rsi (ewm(alpha=1/period, adjust=False) of gains and losses)."""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self._prev_close = None
+        self._avg_gain = _Ewm(alpha=1.0 / period, adjust=False)
+        self._avg_loss = _Ewm(alpha=1.0 / period, adjust=False)
+
+    def update(self, high: float, low: float, close: float) -> None:
+        if self._prev_close is None:
+            gain = loss = NaN
+        else:
+            delta = close - self._prev_close
+            gain = max(delta, 0.0)
+            loss = -min(delta, 0.0)
+        self._avg_gain.update(gain)
+        self._avg_loss.update(loss)
+        self._prev_close = close
+
+    def value(self) -> float:
+        avg_gain, avg_loss = self._avg_gain.value, self._avg_loss.value
+        if avg_gain != avg_gain or avg_loss != avg_loss:
+            return 50.0  # Fallback
+
+        rsi = 100.0 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+        return 0.0 if avg_gain == 0 else rsi
+
+
+class StreamingTrendComponents(_StreamingIndicator):
+    """
+    ATR, ADX, +DI and -DI as computed by pandas_ta.atr / pandas_ta.adx. The ATR
+    takes high - low as the first true range, while the DI scaling only starts
+    at the second candle; DX is smoothed from the period-th candle onwards.
+    """
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self._period = period
+        self._count = 0
+        self._prev = None  # (high, low, close) of the previous candle
+        self._atr = _Rma(period)
+        self._di_atr = _Rma(period)
+        self._pos_dm = _Ewm(alpha=1.0 / period, adjust=False)
+        self._neg_dm = _Ewm(alpha=1.0 / period, adjust=False)
+        self._adx = _Ewm(alpha=1.0 / period, adjust=False, min_periods=period)
+        self._plus_di = NaN
+        self._minus_di = NaN
+
+    def update(self, high: float, low: float, close: float) -> None:
+        self._count += 1
+        if self._prev is None:
+            self._atr.update(high - low)
+            self._prev = (high, low, close)
+            return
+
+        prev_high, prev_low, prev_close = self._prev
+        true_range = max(abs(high - low), abs(high - prev_close), abs(prev_close - low))
+        up = high - prev_high
+        dn = prev_low - low
+        pos = self._pos_dm.update(up if up > dn and up > 0 else 0.0)
+        neg = self._neg_dm.update(dn if dn > up and dn > 0 else 0.0)
+        self._prev = (high, low, close)
+
+        self._atr.update(true_range)
+        k = _div(100, self._di_atr.update(true_range))
+        self._plus_di = k * pos
+        self._minus_di = k * neg
+        dx = _div(100 * abs(pos - neg), pos + neg) if self._count >= self._period else NaN
+        self._adx.update(dx)
+
+    def value(self) -> dict:
+        return {
+            "atr": self._atr.value,
+            "adx": self._adx.value,
+            "plus_di": self._plus_di,
+            "minus_di": self._minus_di,
+        }
+
+
+class IndicatorEngine:
+    """
+    Stateful indicators attached to one chart. Every closed candle is consumed
+    exactly once; the still-forming last candle of the window is applied to a
+    throwaway copy, so each answer costs O(1) instead of a pandas_ta pass over
+    the whole window.
+
+    If the window handed in does not continue the consumed history (e.g. after a
+    long pause), the indicator is rebuilt from that window.
+    """
+
+    def __init__(self):
+        self._indicators = {}
+
+    def macd(self, candles: CandleArrays, fast: int = 12, slow: int = 26, signal: int = 9) -> dict:
+        return self._evaluate(("macd", fast, slow, signal), lambda: StreamingMacd(fast, slow, signal), candles)
+
+    def rsi(self, candles: CandleArrays, period: int = 14) -> float:
+        return self._evaluate(("rsi", period), lambda: StreamingRsi(period), candles)
+
+    def trend_components(self, candles: CandleArrays, period: int = 14) -> dict:
+        return self._evaluate(("trend", period), lambda: StreamingTrendComponents(period), candles)
+
+    def _evaluate(self, key: tuple, factory: Callable[[], _StreamingIndicator], candles: CandleArrays):
+        last = len(candles) - 1
+        indicator = self._indicators.get(key)
+        start = indicator.resume_index(candles, last) if indicator else None
+        if start is None:
+            indicator = self._indicators[key] = factory()
+            start = 0
+
+        rows = zip(
+            candles.timestamp[start:].tolist(),
+            candles.high[start:].tolist(),
+            candles.low[start:].tolist(),
+            candles.close[start:].tolist()
+        )
+        forming = None
+        for i, row in enumerate(rows, start):
+            if i == last:
+                forming = indicator.clone()
+                forming.consume(*row)
+            else:
+                indicator.consume(*row)
+        return forming.value()
@@ -1,9 +1,13 @@
 import configparser
+import os
 from pathlib import Path
+from typing import Callable
 import logging
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 class Config:
     _instance = None
     _config_file = Path(__file__).parent / "config.ini"
@@ -11,37 +15,119 @@ class Config:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance._values = {}
+            cls._instance._subscribers = []
             cls._instance.reload()
         return cls._instance
 
     def reload(self):
+        """Re-reads the config file and notifies the subscribers if any value changed."""
+        first_load = "_parser" not in self.__dict__
+        self._file_state = self._stat()
         self._parser = configparser.ConfigParser()
         self._parser.read(self._config_file)
 
+        # Lowercased values keyed by "section.key", served by get_value()/enabled() and their typed cache
+        values = {
+            f"{section}.{key}": value.lower()
+            for section in self._parser.sections()
+            for key, value in self._parser[section].items()
+        }
+        old_values, self._values = self._values, values
+        self._typed = {}
+
+        changed = sorted(path for path in values.keys() | old_values.keys() if values.get(path) != old_values.get(path))
+        if not changed or first_load:
+            return
+        for path in changed:
+            logger.info("[Config] %s: '%s' -> '%s'", path, old_values.get(path), values.get(path))
+        for callback in list(self._subscribers):
+            try:
+                callback(self)
+            except Exception as e:
+                logger.info("[Config] Subscriber failed to apply the new config: %s", e)
+
+    def reload_if_changed(self) -> bool:
+        """Reloads only if the file's mtime or size changed since the last load; True if it did."""
+        if self._stat() == self._file_state:
+            return False
+        self.reload()
+        return True
+
+    def _stat(self):
+        try:
+            stat = os.stat(self._config_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def subscribe(self, callback: Callable[["Config"], None]) -> None:
+        """Calls callback(config) after every reload that changed a value."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[["Config"], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
     def __getattr__(self, section):
         if section in self._parser:
             return ConfigSection(self._parser[section])
         return None
-    
+
     def get(self, section, key=None, default=None):
         if section in self._parser:
             if key is None:
                 return ConfigSection(self._parser[section])
             value = self._parser[section].get(key, default)
-            result = value.lower() if isinstance(value, str) else value
-            logger.info(f"Reading config: {section}.{key}, result: '{result}'")
-            return result
+            return value.lower() if isinstance(value, str) else value
         return default.lower() if isinstance(default, str) else default
-    
+
     def get_value(self, path: str, default : str) -> str:
+        section, key = self._split(path)
+        value = self._values.get(f"{section}.{key.lower()}", _MISSING)
+        if value is _MISSING:
+            return default.lower() if isinstance(default, str) else default
+        return value
+
+    def get_text(self, path: str, default: str) -> str:
+        """Like get_value(), but keeps the value's case, e.g. for file paths."""
+        section, key = self._split(path)
+        if section in self._parser:
+            return self._parser[section].get(key, default)
+        return default
+
+    def enabled(self, path: str) -> bool:
+        return self._typed_value("bool", path, "0", lambda value: value == "1")
+
+    def get_int(self, path: str, default: int) -> int:
+        return self._typed_value("int", path, default, int)
+
+    def get_float(self, path: str, default: float) -> float:
+        return self._typed_value("float", path, default, float)
+
+    def _typed_value(self, kind: str, path: str, default, convert):
+        """Converted once per reload; lookups in between are a dict hit."""
+        typed = self._typed  # A concurrent reload swaps in a new cache; never fill it with an old value
+        cache_key = (kind, path, default)
+        try:
+            return typed[cache_key]
+        except KeyError:
+            pass
+        value = self.get_value(path, str(default))
+        try:
+            result = convert(value)
+        except ValueError:
+            logger.info("[Config] Invalid %s '%s' for %s, using %s", kind, value, path, default)
+            result = convert(str(default).lower())
+        typed[cache_key] = result
+        return result
+
+    @staticmethod
+    def _split(path: str) -> tuple[str, str]:
         if "." not in path:
             raise ValueError(f"Invalid path '{path}': must contain a '.' separating section and key")
-
         section, key = path.split(".", 1)
-        return self.get(section, key, default)
-    
-    def enabled(self, path: str) -> bool:
-        return True if self.get_value(path, "0") == "1" else False
+        return section, key
 
 
 class ConfigSection:
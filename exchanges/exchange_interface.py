@@ -5,3 +5,13 @@ class IExchange(ABC):
     @abstractmethod
     def open_position(self, pos: Position):
         pass
+
+    @abstractmethod
+    def find_open_position(self, key: tuple) -> Position | None:
+        """The open position with the given position_key (see structs.position.position_key), if any."""
+        pass
+
+    def update_levels(self, pos: Position, sl: float, tp: float):
+        """Moves the SL/TP of an open position."""
+        pos.sl = sl
+        pos.tp = tp
@@ -0,0 +1,124 @@
+import numpy as np
+from bisect import bisect_left, bisect_right, insort
+from structs.position import Position
+
+_INF = float("inf")
+
+
+class TriggerBook:
+    """
+    SL/TP levels of the open positions on one symbol, kept in four sorted lists
+    of (level, position id). A price move is resolved with a bisect per list,
+    so only the positions whose levels were actually crossed are visited.
+
+    Levels must be changed through move(), never by assigning pos.sl/pos.tp.
+    """
+
+    _KINDS = ("long_sl", "long_tp", "short_sl", "short_tp")
+
+    def __init__(self):
+        self._positions: dict[int, Position] = {}       # key: pos.id
+        self._indexed: dict[int, tuple[float, float]] = {}  # key: pos.id, value: (sl, tp) as indexed
+        self._levels: dict[str, list] = {kind: [] for kind in self._KINDS}
+        self._arrays = None  # PnL columns, rebuilt after the membership changes
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, pos: Position) -> bool:
+        return self._positions.get(pos.id) is pos
+
+    def positions(self) -> list[Position]:
+        return list(self._positions.values())
+
+    def add(self, pos: Position) -> None:
+        self._positions[pos.id] = pos
+        self._insert(pos, pos.sl, pos.tp)
+        self._arrays = None
+
+    def remove(self, pos: Position) -> None:
+        if pos not in self:
+            return
+        del self._positions[pos.id]
+        self._delete(pos)
+        self._arrays = None
+
+    def move(self, pos: Position, sl: float, tp: float) -> None:
+        """Moves the levels of pos in place: two sorted deletions and insertions."""
+        if pos in self:
+            self._delete(pos)
+            self._insert(pos, sl, tp)
+        pos.sl = sl
+        pos.tp = tp
+
+    def crossed(self, low: float, high: float) -> tuple[list[Position], list[Position]]:
+        """
+        (SL hits, TP hits) for a market that traded through [low, high]; a single
+        price is low == high. A position whose both levels were crossed is only
+        reported as an SL hit.
+        """
+        levels = self._levels
+        sl_ids = [pos_id for _, pos_id in levels["long_sl"][bisect_left(levels["long_sl"], (low,)):]]
+        sl_ids += [pos_id for _, pos_id in levels["short_sl"][:bisect_right(levels["short_sl"], (high, _INF))]]
+        tp_ids = [pos_id for _, pos_id in levels["long_tp"][:bisect_right(levels["long_tp"], (high, _INF))]]
+        tp_ids += [pos_id for _, pos_id in levels["short_tp"][bisect_left(levels["short_tp"], (low,)):]]
+
+        stopped = set(sl_ids)
+        return (
+            [self._positions[pos_id] for pos_id in sl_ids],
+            [self._positions[pos_id] for pos_id in tp_ids if pos_id not in stopped]
+        )
+
+    def mark(self, price: float) -> None:
+        """Sets current price, PnL and its running max/min on every position in one vectorized pass."""
+        if not self._positions:
+            return
+        if self._arrays is None:
+            self._arrays = self._build_arrays()
+        positions, direction, entry, risk, max_pnl, min_pnl, pnl = self._arrays
+
+        # In place into the buffers built with the arrays; a zero risk is stored as inf, so its PnL is 0
+        np.subtract(price, entry, out=pnl)
+        np.multiply(pnl, direction, out=pnl)
+        np.divide(pnl, risk, out=pnl)
+        np.maximum(max_pnl, pnl, out=max_pnl)
+        np.minimum(min_pnl, pnl, out=min_pnl)
+
+        for pos, pos_pnl, pos_max, pos_min in zip(positions, pnl.tolist(), max_pnl.tolist(), min_pnl.tolist()):
+            pos._current_price = price
+            pos.pnl = pos_pnl
+            pos.max_pnl = pos_max
+            pos.min_pnl = pos_min
+
+    def _build_arrays(self):
+        positions = list(self._positions.values())
+        direction = np.array([pos.direction for pos in positions], dtype=np.float64)
+        entry = np.array([pos.entry for pos in positions], dtype=np.float64)
+        risk = np.array([pos.risk or _INF for pos in positions], dtype=np.float64)
+        max_pnl = np.array([pos.max_pnl for pos in positions], dtype=np.float64)
+        min_pnl = np.array([pos.min_pnl for pos in positions], dtype=np.float64)
+        return positions, direction, entry, risk, max_pnl, min_pnl, np.empty(len(positions))
+
+    def _kinds(self, pos: Position) -> tuple[str, str] | None:
+        if pos.type == "Long":
+            return "long_sl", "long_tp"
+        if pos.type == "Short":
+            return "short_sl", "short_tp"
+        return None
+
+    def _insert(self, pos: Position, sl: float, tp: float) -> None:
+        kinds = self._kinds(pos)
+        if kinds is None:
+            return
+        insort(self._levels[kinds[0]], (sl, pos.id))
+        insort(self._levels[kinds[1]], (tp, pos.id))
+        self._indexed[pos.id] = (sl, tp)
+
+    def _delete(self, pos: Position) -> None:
+        kinds = self._kinds(pos)
+        levels = self._indexed.pop(pos.id, None)
+        if kinds is None or levels is None:
+            return
+        for kind, level in zip(kinds, levels):
+            entries = self._levels[kind]
+            del entries[bisect_left(entries, (level, pos.id))]
@@ -1,71 +1,216 @@
 import logging
+from collections import deque
+from typing import Callable
 from exchanges.exchange_interface import IExchange
-from structs.position import Position
+from exchanges.trigger_index import TriggerBook
+from structs.metrics import metrics
+from structs.position import Position, position_key
 from structs.utils import get_utc_now_timestamp
 from notifiers.notifier_interface import INotifier
+from notifiers.telegram_notifier import split_message
 from persistence.persistence_interface import IPersistence
+from persistence.position_journal import PositionJournal
+from strategies.strategy_interface import IStrategy
 
 class VirtualExchange(IExchange):
-    def __init__(self, notifier: INotifier, positions_history_logger: IPersistence, current_positions_logger: IPersistence=None):
+    def __init__(self, notifier: INotifier, positions_history_logger: IPersistence, current_positions_logger: IPersistence=None, clock: Callable[[], int] = None, keep_closed: int | None = 100, journal: PositionJournal = None, digest_window: float = 0):
         self.notifier: INotifier = notifier
         self.positions_history_logger: IPersistence = positions_history_logger
         self.current_positions_logger: IPersistence = current_positions_logger
-        self.open_positions: list[Position] = []
-        self.closed_positions: list[Position] = []
+        self._open_positions: dict[int, Position] = {}  # key: pos.id, in opening order
+        self._open_by_key: dict[tuple, list[Position]] = {}  # key: position_key
+        self._books: dict[tuple, TriggerBook] = {}  # key: (chart class, symbol)
+        # Only the last keep_closed positions stay in memory (None keeps all, as backtests need);
+        # the full history goes to positions_history_logger and is read back with history()
+        self.closed_positions: deque[Position] = deque(maxlen=keep_closed)
         self.n_active_positions = 0
+        self.n_closed_positions = 0
+        self.n_wins = 0
         self.tp_hits = 0
         self.sl_hits = 0
         self.breakeven_hits = 0
         self.profits_sum = 0
+        self.clock = clock  # Unix seconds; None means wall-clock time (backtests inject a simulated clock)
+        self.journal = journal  # Attach after restore(), so restored positions are not journaled again
+        # Seconds to collect position events into one notification (0 sends each one right away)
+        self.digest_window = digest_window
+        self._pending_events: list[str] = []
+        self._digest_started: int | None = None
+
+    def _now(self) -> int:
+        return self.clock() if self.clock is not None else get_utc_now_timestamp()
 
     def open_position(self, pos: Position):
         if pos is not None:
             self.n_active_positions += 1
-            pos.open_timestamp = get_utc_now_timestamp()
+            pos.open_timestamp = self._now()
             pos.status = "opened"
-            self.open_positions.append(pos)
+            self._index(pos)
+            metrics.inc("positions_opened_total")
+            self._journal(lambda journal: journal.record_open(pos.to_record()))
             self._notify_open(pos)
 
+    @property
+    def open_positions(self) -> list[Position]:
+        return list(self._open_positions.values())
+
+    def find_open_position(self, key: tuple) -> Position | None:
+        positions = self._open_by_key.get(key)
+        return positions[0] if positions else None
+
+    def update_levels(self, pos: Position, sl: float, tp: float):
+        book = self._books.get((type(pos.chart), pos.chart.symbol))
+        if book is not None:
+            book.move(pos, sl, tp)
+        else:
+            super().update_levels(pos, sl, tp)
+        if pos.id in self._open_positions:
+            self._journal(lambda journal: journal.record_modify(pos.id, sl, tp))
+
+    def stats(self) -> dict:
+        return {
+            "n_closed_positions": self.n_closed_positions,
+            "n_wins": self.n_wins,
+            "tp_hits": self.tp_hits,
+            "sl_hits": self.sl_hits,
+            "breakeven_hits": self.breakeven_hits,
+            "profits_sum": self.profits_sum,
+        }
+
+    def restore(self, state: dict, chart_for: Callable[[str, str], object], strategies: list[IStrategy]) -> int:
+        """
+        Reopens the positions of a PositionJournal.load() state, without notifying
+        or journaling them, and restores the stats. chart_for(symbol, timeframe value)
+        returns the chart of a position; strategies are matched by STRATEGY_NAME.
+        Returns the number of positions restored.
+        """
+        strategies_by_name = {strategy.STRATEGY_NAME: strategy for strategy in strategies}
+        for name, value in state.get("stats", {}).items():
+            setattr(self, name, value)
+        Position._id_counter = max(Position._id_counter, state.get("id_counter", 0))
+
+        restored = 0
+        for record in state.get("positions", {}).values():
+            strategy = strategies_by_name.get(record["strategy"])
+            if strategy is None:
+                logging.info("[VirtualExchange] Cannot restore position %s: unknown strategy %s", record['id'], record['strategy'])
+                continue
+            self._index(Position.from_record(record, chart_for(record["symbol"], record["timeframe"]), strategy))
+            self.n_active_positions += 1
+            restored += 1
+        return restored
+
+    def _journal(self, record: Callable[[PositionJournal], None]):
+        if self.journal is None:
+            return
+        try:
+            record(self.journal)
+            if self.journal.needs_compaction():
+                self.compact_journal()
+        except Exception as e:
+            logging.info("[VirtualExchange] Failed to journal positions: %s", e)
+
+    def compact_journal(self):
+        """
+        Snapshots the open positions as they are now. The journal only records
+        opens and level changes, so the current price and PnL extremes survive
+        a restart only through a snapshot; call this before a clean shutdown.
+        """
+        if self.journal is not None:
+            self.journal.compact([pos.to_record() for pos in self._open_positions.values()], self.stats(), Position._id_counter)
+
     def tick(self):
-        still_open = []
+        with metrics.time("exchange_tick_seconds"):
+            self._tick()
 
-        for pos in self.open_positions:
-            try:
-                current_price = pos.chart.get_current_price()
-                pos.current_price = current_price
-                if (pos.type == "Long" and current_price <= pos.sl) or (pos.type == "Short" and current_price >= pos.sl):
-                    # STOP LOSS HIT
-                    self._close_position(pos, current_price, "SL Hit")
-                elif (pos.type == "Long" and current_price >= pos.tp) or (pos.type == "Short" and current_price <= pos.tp):
-                    # TAKE PROFIT HIT
-                    # Should decide based on strategy
-                    # Should update profit
-                    self._close_position(pos, current_price, "TP Hit")
-                else:
-                    still_open.append(pos)
+    def _tick(self):
+        prices = self._price_snapshot()
+
+        for (chart_cls, symbol), book in list(self._books.items()):
+            current_price = prices.get((chart_cls, symbol))
+            if current_price is None:
+                continue
 
+            try:
+                book.mark(current_price)
+                sl_hits, tp_hits = book.crossed(current_price, current_price)
+                self._close_hits(sl_hits, tp_hits, current_price, current_price)
             except Exception as e:
-                logging.info(f"[VirtualExchange] Error checking {pos.chart.symbol}:{pos.chart.timeframe.value}: {e}")
-                still_open.append(pos)
+                logging.info("[VirtualExchange] Error checking %s: %s", symbol, e)
+
+        self._log_current_positions()
+        self._flush_digest_if_due()
+
+    def tick_ranges(self, ranges: dict):
+        """
+        Resolves exits against the (low, high, close) each symbol traded through
+        since the previous call, keyed like the price snapshot by (chart class, symbol).
+        Used by backtests: a level touched by the range fills at that level, and
+        the stop loss wins when both were touched because the order is unknown.
+        """
+        for key, (low, high, close) in ranges.items():
+            book = self._books.get(key)
+            if book is None:
+                continue
 
-        self.open_positions = still_open
+            book.mark(close)
+            sl_hits, tp_hits = book.crossed(low, high)
+            self._close_hits(sl_hits, tp_hits)
 
+        self._log_current_positions()
+        self._flush_digest_if_due()
+
+    def _close_hits(self, sl_hits: list[Position], tp_hits: list[Position], sl_price: float = None, tp_price: float = None):
+        """Closes crossed positions in opening order, at the given prices or else at their levels."""
+        hits = [(pos, pos.sl if sl_price is None else sl_price, "SL Hit") for pos in sl_hits]
+        hits += [(pos, pos.tp if tp_price is None else tp_price, "TP Hit") for pos in tp_hits]
+        for pos, exit_price, exit_reason in sorted(hits, key=lambda hit: hit[0].id):
+            self._close_position(pos, exit_price, exit_reason)
+
+    def _log_current_positions(self):
         if self.current_positions_logger:
             try:
-                self.current_positions_logger.write([op.to_active_position_row() for op in self.open_positions])
+                with metrics.time("persistence_write_seconds", table="current_positions"):
+                    self.current_positions_logger.write([op.to_active_position_row() for op in self.open_positions])
+            except Exception as e:
+                logging.info("[VirtualExchange] Failed to log current positions table: %s", e)
+
+    def _price_snapshot(self) -> dict:
+        """One batched price request per chart class, covering every symbol with an open position."""
+        charts_by_class = {}
+        for (chart_cls, _), book in self._books.items():
+            charts_by_class.setdefault(chart_cls, []).append(book.positions()[0].chart)
+
+        prices = {}
+        for chart_cls, charts in charts_by_class.items():
+            try:
+                for symbol, price in chart_cls.get_current_prices(charts).items():
+                    prices[(chart_cls, symbol)] = price
             except Exception as e:
-                logging.info(f"[VirtualExchange] Failed to log current positions table: {e}")
+                # One rejected symbol fails the whole batch; ask each symbol on its own so the others still trade
+                symbols = ", ".join(sorted({chart.symbol for chart in charts}))
+                logging.info("[VirtualExchange] Batched price request for %s failed, asking each symbol: %s", symbols, e)
+                for chart in charts:
+                    try:
+                        prices[(chart_cls, chart.symbol)] = chart.get_current_price()
+                    except Exception as e:
+                        logging.info("[VirtualExchange] Error fetching the price of %s: %s", chart.symbol, e)
+        return prices
 
     def _close_position(self, pos: Position, exit_price = None, exit_reason: str = ""):
         if pos is not None:
             self.n_active_positions -= 1
             pos.exit_price = exit_price if exit_price is not None else pos.chart.get_current_price()
             pos.exit_reason = exit_reason
-            pos.close_timestamp = get_utc_now_timestamp()
+            pos.close_timestamp = self._now()
             pos.status = "closed"
             self.closed_positions.append(pos)
+            was_open = pos.id in self._open_positions
+            self._unindex(pos)
 
+            self.n_closed_positions += 1
             if pos.profit > 0:
+                self.n_wins += 1
                 self.tp_hits += pos.profit
             elif pos.profit < 0:
                 self.sl_hits += 1
@@ -73,70 +218,109 @@ class VirtualExchange(IExchange):
                 self.breakeven_hits += 1
 
             self.profits_sum += pos.profit
+            metrics.inc("positions_closed_total", reason=exit_reason)
+            if was_open:
+                self._journal(lambda journal: journal.record_close(pos.id, self.stats()))
 
             if self.positions_history_logger:
                 try:
-                    self.positions_history_logger.write(pos.to_history_row())
+                    with metrics.time("persistence_write_seconds", table="positions_history"):
+                        self.positions_history_logger.write(pos.to_history_row())
                 except Exception as e:
-                    logging.info(f"[VirtualExchange] Failed to log position: {e}")
+                    logging.info("[VirtualExchange] Failed to log position: %s", e)
 
             self._notify_close(pos)
 
+    def history(self, limit: int | None = None) -> list[dict]:
+        """History rows of the last `limit` closed positions (all by default), read from the history store."""
+        if self.positions_history_logger is None:
+            return list(deque((pos.to_history_row() for pos in self.closed_positions), maxlen=limit))
+        return self.positions_history_logger.read(limit)
+
+    def _index(self, pos: Position):
+        self._open_positions[pos.id] = pos
+        self._open_by_key.setdefault(position_key(pos), []).append(pos)
+        self._books.setdefault((type(pos.chart), pos.chart.symbol), TriggerBook()).add(pos)
+
+    def _unindex(self, pos: Position):
+        self._open_positions.pop(pos.id, None)
+
+        book_key = (type(pos.chart), pos.chart.symbol)
+        book = self._books.get(book_key)
+        if book is not None:
+            book.remove(pos)
+            if not len(book):
+                del self._books[book_key]
+
+        key = position_key(pos)
+        positions = self._open_by_key.get(key)
+        if positions is not None:
+            positions[:] = [open_pos for open_pos in positions if open_pos is not pos]
+            if not positions:
+                del self._open_by_key[key]
+
     def _notify_open(self, pos: Position):
         if self.notifier is None:
             return
-        
-        nclosed = len(self.closed_positions)
-        nopen_ = self.n_active_positions
-        message = (
+
+        self._notify(
             f"⏳ *Position Opened* #Position{pos.id}\n"
             f"Type: *{pos.type}*\n"
             f"Symbol: *{pos.chart.symbol}*\n"
             f"Timeframe: *{pos.chart.timeframe.value}*\n"
             f"Entry: `{pos.entry:.4f}`\n"
             f"Stop Loss: `{pos.sl:.4f}`\n"
-            f"Take Profit: `{pos.tp:.4f}`\n\n\n"
-            f"📊 *Stats*\n"
-            f"Closed: `{nclosed}`\n"
-            f"Open: `{nopen_}`\n"
-            f"TP Hits: `{self.tp_hits}`\n"
-            f"EN Hits: `{self.breakeven_hits}`\n"
-            f"SL Hits: `{self.sl_hits}`\n"
-            f"Total Profit: `{self.profits_sum}`\n"
+            f"Take Profit: `{pos.tp:.4f}`"
         )
-        try:
-            if self.notifier:
-                self.notifier.send_message(message)
-        except Exception as e:
-            logging.info(f"[VirtualExchange] Failed to send following message to telegram: {e}")
-            logging.info(f"Message content: {message}")
 
     def _notify_close(self, pos: Position):
         if self.notifier is None:
             return
-        
-        nclosed = len(self.closed_positions)
-        nopen_ = self.n_active_positions
 
         emoji = "✅" if pos.profit > 0 else "⛔" if pos.profit < 0 else "😐"
-        message = (
+        self._notify(
             f"{emoji} *Position Closed* #Position{pos.id}\n"
             f"Type: *{pos.type}*\n"
             f"Symbol: *{pos.chart.symbol}*\n"
             f"Timeframe: *{pos.chart.timeframe.value}*\n"
             f"Profit: *{pos.profit}*\n"
             f"`{pos.entry:.4f}` -> `{pos.exit_price:.4f}`\n"
-            f"Duration: `{pos.duration}`\n\n\n"
+            f"Duration: `{pos.duration}`"
+        )
+
+    def _stats_message(self) -> str:
+        return (
             f"📊 *Stats*\n"
-            f"Closed: `{nclosed}`\n"
-            f"Open: `{nopen_}`\n"
+            f"Closed: `{self.n_closed_positions}`\n"
+            f"Open: `{self.n_active_positions}`\n"
             f"TP Hits: `{self.tp_hits}`\n"
             f"EN Hits: `{self.breakeven_hits}`\n"
             f"SL Hits: `{self.sl_hits}`\n"
             f"Total Profit: `{self.profits_sum}`\n"
         )
-        try:
-            self.notifier.send_message(message)
-        except Exception as e:
-            logging.info(f"[VirtualExchange] Failed to send following message to telegram: {e}")
-            logging.info(f"Message content: {message}")
+
+    def _notify(self, event: str):
+        self._pending_events.append(event)
+        if self._digest_started is None:
+            self._digest_started = self._now()
+        if self.digest_window <= 0:
+            self.flush_notifications()
+
+    def _flush_digest_if_due(self):
+        if self._digest_started is not None and self._now() - self._digest_started >= self.digest_window:
+            self.flush_notifications()
+
+    def flush_notifications(self):
+        """Sends the pending position events as one message (more if it exceeds the notifier's size limit)."""
+        events, self._pending_events = self._pending_events, []
+        self._digest_started = None
+        if not events or self.notifier is None:
+            return
+
+        for message in split_message(events, self._stats_message()):
+            try:
+                with metrics.time("notifier_send_seconds"):
+                    self.notifier.send_message(message)
+            except Exception as e:
+                logging.info("[VirtualExchange] Failed to send following message to telegram: %s", e)
+                logging.info("Message content: %s", message)
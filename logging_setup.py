@@ -0,0 +1,67 @@
+import atexit
+import logging
+import queue
+import time
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets a repeated message through at most once per `interval` seconds per
+    module, e.g. a symbol failing on every price tick. The next one that passes
+    says how many were suppressed in between.
+    """
+
+    def __init__(self, interval: float = 60.0, max_keys: int = 10000, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.interval = interval
+        self.max_keys = max_keys
+        self._clock = clock
+        self._last: OrderedDict[tuple, list] = OrderedDict()  # key: (module, level, message), value: [last passed at, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.module, record.levelno, record.getMessage())
+        now = self._clock()
+        seen = self._last.get(key)
+        if seen is not None and now - seen[0] < self.interval:
+            seen[1] += 1
+            return False
+
+        if seen is not None and seen[1]:
+            record.msg = f"{record.getMessage()} (suppressed {seen[1]} times in the last {now - seen[0]:.0f}s)"
+            record.args = None
+        self._last[key] = [now, 0]
+        self._last.move_to_end(key)  # Least recently passed first
+        if len(self._last) > self.max_keys:  # Messages that embed changing values never repeat; forget the oldest
+            self._last.popitem(last=False)
+        return True
+
+
+def setup_logging(filename: str, max_bytes: int = 50*1024*1024, backup_count: int = 2, level: int = logging.INFO, rate_limit_interval: float = 60.0) -> QueueListener:
+    """
+    Routes the root logger through a queue: logging calls only enqueue the
+    record, and a background listener formats, rate-limits and writes it to the
+    console and the rotating file. The listener is stopped (and drained) at exit.
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count)
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+        handler.addFilter(RateLimitFilter(rate_limit_interval))
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+
+    logger = logging.getLogger()
+    logger.setLevel(level)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
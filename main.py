@@ -1,20 +1,15 @@
+import atexit
 import time
+import signal
+import sys
 import logging
-from logging.handlers import RotatingFileHandler
 from apps.app1 import App1
 from config import config
+from logging_setup import setup_logging
 
 def main():
-    # Configure logging
-    log_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-    file_handler = RotatingFileHandler("/HDD/app.log", maxBytes=50*1024*1024, backupCount=2)
-    file_handler.setFormatter(log_formatter)
-    stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(log_formatter)
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
+    # Configure logging: callers only enqueue records, a background thread writes them
+    listener = setup_logging("/HDD/app.log", max_bytes=50*1024*1024, backup_count=2)
 
     # Load config
     config._config_file = "/HDD/config.ini"
@@ -24,13 +19,19 @@ def main():
         return
 
     app = App1()
+    # `docker stop` and systemd send SIGTERM: leave the loop the same way as on Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     try:
         while True:
-            config.reload()
-            app.tick()
-            time.sleep(1)
-    except KeyboardInterrupt:
+            config.reload_if_changed()
+            time.sleep(app.scheduler.run_pending())
+    except (KeyboardInterrupt, SystemExit):
         logging.info("Shutting down gracefully...")
+    finally:
+        app.close()
+        # Last, so the records logged while closing are written too
+        atexit.unregister(listener.stop)
+        listener.stop()
 
 if __name__ == "__main__":
     main()
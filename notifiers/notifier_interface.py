@@ -4,4 +4,8 @@ class INotifier(ABC):
 
     @abstractmethod
     def send_message(self, text: str):
-        raise NotImplementedError("Subclasses must implement this method")
\ No newline at end of file
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def close(self) -> None:
+        """Delivers what is still pending; called once at shutdown."""
+        pass
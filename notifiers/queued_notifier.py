@@ -0,0 +1,155 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, List
+from notifiers.notifier_interface import INotifier
+from structs.latency_histogram import LatencyHistogram
+from notifiers.telegram_notifier import MAX_MESSAGE_LENGTH
+from structs.token_bucket import TokenBucket
+
+class QueuedNotifier(INotifier):
+    """
+    Delivers messages through another notifier from a background thread, so
+    send_message() returns immediately.
+
+    Sending is paced by token buckets (e.g. Telegram's 1 message/s and
+    20 messages/min per chat). A failed send is retried with exponential
+    backoff, or after the notifier's retry_after when it reports one (HTTP 429),
+    and dropped after max_retries. When max_queue messages are waiting, a new
+    message is merged into the newest waiting one if the result fits in
+    max_message_length ("coalesce"), otherwise the oldest waiting message is
+    dropped ("drop_oldest" does that always).
+    """
+
+    def __init__(
+        self,
+        notifier: INotifier,
+        buckets: List[TokenBucket] = (),
+        max_queue: int = 100,
+        policy: str = "coalesce",
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        max_message_length: int = MAX_MESSAGE_LENGTH,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if policy not in ("coalesce", "drop_oldest"):
+            raise ValueError(f"Unknown queue policy '{policy}'")
+        self.notifier = notifier
+        self.buckets = list(buckets)
+        self.max_queue = max_queue
+        self.policy = policy
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_message_length = max_message_length
+        self._clock = clock
+
+        self._queue = deque()  # [text, enqueued_at, attempts]
+        self._cond = threading.Condition()
+        self._closing = False
+        self._in_flight = 0
+
+        self.latency = LatencyHistogram(buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0))
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.failed = 0
+
+        self._thread = threading.Thread(target=self._sender_loop, name="notifier", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def send_message(self, text: str) -> bool:
+        """Queues text for delivery; False if the notifier is closed."""
+        with self._cond:
+            if self._closing:
+                return False
+            if len(self._queue) >= self.max_queue:
+                newest = self._queue[-1] if self._queue else None
+                if (self.policy == "coalesce" and newest is not None and
+                        len(newest[0]) + 2 + len(text) <= self.max_message_length):
+                    newest[0] = f"{newest[0]}\n\n{text}"
+                    self.coalesced += 1
+                    return True
+                self._queue.popleft()
+                self.dropped += 1
+                logging.info("[QueuedNotifier] Queue full, dropped the oldest message")
+            self._queue.append([text, self._clock(), 0])
+            self._cond.notify()
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """Waits until every queued message was delivered or given up; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stops accepting messages and gives the queue up to `timeout` seconds to drain."""
+        self.flush(timeout)
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+        atexit.unregister(self.close)
+
+    def _wait(self, seconds: float) -> None:
+        with self._cond:
+            if not self._closing:
+                self._cond.wait(seconds)
+
+    def _sender_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+
+            delay = max((bucket.delay() for bucket in self.buckets), default=0.0)
+            if delay > 0:
+                self._wait(delay)
+                continue
+
+            with self._cond:
+                if not self._queue:
+                    continue
+                item = self._queue.popleft()
+                self._in_flight = 1
+            for bucket in self.buckets:
+                bucket.take()
+
+            try:
+                delivered = self.notifier.send_message(item[0])
+            except Exception as e:
+                logging.info("[QueuedNotifier] Error sending message: %s", e)
+                delivered = False
+
+            retry_in = None
+            with self._cond:
+                self._in_flight = 0
+                if delivered:
+                    self.sent += 1
+                    self.latency.observe(self._clock() - item[1])
+                elif item[2] < self.max_retries:
+                    item[2] += 1
+                    self._queue.appendleft(item)
+                    retry_after = getattr(self.notifier, "retry_after", None)
+                    retry_in = retry_after if retry_after else self.backoff * 2 ** (item[2] - 1)
+                else:
+                    self.failed += 1
+                    logging.info("[QueuedNotifier] Giving up on a message after %d attempts", item[2] + 1)
+                self._cond.notify_all()
+
+            if retry_in is not None:
+                self._wait(retry_in)
@@ -2,11 +2,40 @@ import logging
 import requests
 from notifiers.notifier_interface import INotifier
 
+MAX_MESSAGE_LENGTH = 4096  # Telegram rejects longer messages
+
+def split_message(events: list[str], footer: str = "", limit: int = MAX_MESSAGE_LENGTH) -> list[str]:
+    """
+    Joins events into as few messages of at most `limit` characters as possible,
+    never splitting an event unless it alone is too long; footer ends the last one.
+    """
+    blocks = list(events)
+    if footer:
+        blocks.append(footer)
+
+    messages, current = [], ""
+    for i, block in enumerate(blocks):
+        separator = "\n\n\n" if footer and i == len(blocks) - 1 else "\n\n"
+        if current and len(current) + len(separator) + len(block) <= limit:
+            current += separator + block
+            continue
+        if current:
+            messages.append(current)
+        while len(block) > limit:
+            messages.append(block[:limit])
+            block = block[limit:]
+        current = block
+    if current:
+        messages.append(current)
+    return messages
+
 class TelegramNotifier(INotifier):
-    def __init__(self, bot_token: str, chat_id: str):
+    def __init__(self, bot_token: str, chat_id: str, timeout: tuple = (3.05, 10.0)):
         self.bot_token = bot_token
         self.chat_id = chat_id
         self.api_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        self.timeout = timeout  # (connect, read) seconds
+        self.retry_after: float | None = None  # Seconds Telegram asked to wait after the last 429
 
     def send_message(self, text: str) -> bool:
         payload = {
@@ -15,10 +44,16 @@ class TelegramNotifier(INotifier):
             "parse_mode": "Markdown"
         }
 
+        self.retry_after = None
         try:
-            response = requests.post(self.api_url, data=payload)
+            response = requests.post(self.api_url, data=payload, timeout=self.timeout)
+            if response.status_code == 429:
+                try:
+                    self.retry_after = float(response.json()["parameters"]["retry_after"])
+                except Exception:
+                    self.retry_after = None
             response.raise_for_status()
             return True
         except Exception as e:
-            logging.info(f"[TelegramNotifier] Failed to send message to telegram:\n{text}\n")
+            logging.info("[TelegramNotifier] Failed to send message to telegram:\n%s\n", text)
             return False
@@ -1,22 +1,61 @@
+import atexit
 import csv
+import logging
 import os
+import queue
+import threading
+import time
+from collections import deque
 from typing import Any, List
 from persistence.persistence_interface import IPersistence
 
+_FLUSH = object()
+_STOP = object()
+
 class CSVPersistence(IPersistence):
-    def __init__(self, filename: str, append_mode: bool = True):
+    """
+    CSV table writer. By default every write() opens, writes and closes the file.
+
+    With buffered=True (append mode only) write() just queues the rows. A
+    background thread keeps the file open, writes them, and flushes once
+    flush_rows rows are pending or flush_interval seconds have passed. flush()
+    waits until everything queued so far is on disk. close() is registered
+    with atexit, so a clean exit does not lose rows.
+    """
+
+    def __init__(self, filename: str, append_mode: bool = True, buffered: bool = False, flush_rows: int = 100, flush_interval: float = 1.0):
         self.filename = filename
         self.append_mode = append_mode
         os.makedirs(os.path.dirname(self.filename), exist_ok=True)
 
+        self.buffered = buffered
+        if buffered:
+            if not append_mode:
+                raise ValueError("Buffered CSVPersistence only supports append mode")
+            self.flush_rows = flush_rows
+            self.flush_interval = flush_interval
+            self._queue: queue.Queue = queue.Queue()
+            self._thread = threading.Thread(target=self._writer_loop, name=f"csv-{os.path.basename(filename)}", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    @staticmethod
+    def _as_row(item: Any) -> dict:
+        return item.__dict__ if hasattr(item, "__dict__") else item
+
     def write(self, obj: Any | List[Any]) -> None:
         items = obj if isinstance(obj, list) else [obj]
         if not items:
             return
 
-        first = items[0]
-        data = first.__dict__ if hasattr(first, "__dict__") else first
-        fieldnames = list(data.keys())
+        if self.buffered:
+            if not self._thread.is_alive():
+                raise RuntimeError(f"{self.filename} is closed")
+            for item in items:
+                self._queue.put(dict(self._as_row(item)))  # Snapshot now, the caller may mutate it
+            return
+
+        fieldnames = list(self._as_row(items[0]).keys())
 
         write_header = not os.path.isfile(self.filename) or os.path.getsize(self.filename) == 0
         mode = 'a' if self.append_mode else 'w'
@@ -26,5 +65,64 @@ class CSVPersistence(IPersistence):
             if write_header or not self.append_mode:
                 writer.writeheader()
             for item in items:
-                row = item.__dict__ if hasattr(item, "__dict__") else item
-                writer.writerow(row)
+                writer.writerow(self._as_row(item))
+
+    def read(self, limit: int | None = None) -> List[dict]:
+        self.flush()
+        if not os.path.isfile(self.filename):
+            return []
+        with open(self.filename, newline='') as file:
+            return list(deque(csv.DictReader(file), maxlen=limit))
+
+    def flush(self) -> None:
+        if self.buffered and self._thread.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self) -> None:
+        if self.buffered and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+            atexit.unregister(self.close)
+
+    def _writer_loop(self) -> None:
+        file = writer = None
+        pending = 0
+        last_flush = time.monotonic()
+        try:
+            while True:
+                timeout = max(0.0, last_flush + self.flush_interval - time.monotonic()) if pending else None
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None  # flush_interval elapsed
+
+                if isinstance(item, dict):
+                    try:
+                        if writer is None:
+                            file = open(self.filename, mode='a', newline='')
+                            writer = csv.DictWriter(file, fieldnames=list(item.keys()))
+                            if file.tell() == 0:
+                                writer.writeheader()
+                        writer.writerow(item)
+                        if not pending:
+                            last_flush = time.monotonic()  # flush_interval counts from the oldest unflushed row
+                        pending += 1
+                    except Exception as e:
+                        logging.info("[CSVPersistence] Failed to write row to %s: %s", self.filename, e)
+
+                if pending and (not isinstance(item, dict) or pending >= self.flush_rows):
+                    try:
+                        file.flush()
+                    except Exception as e:
+                        logging.info("[CSVPersistence] Failed to flush %s: %s", self.filename, e)
+                    pending = 0
+                    last_flush = time.monotonic()
+
+                if item is not None:
+                    self._queue.task_done()
+                if item is _STOP:
+                    return
+        finally:
+            if file is not None:
+                file.close()
@@ -0,0 +1,78 @@
+import csv
+import io
+import os
+import tempfile
+import time
+from collections import deque
+from typing import Any, Callable, Iterable, List
+from persistence.persistence_interface import IPersistence
+from persistence.snapshot_throttle import SnapshotThrottle
+
+class CSVSnapshotPersistence(IPersistence):
+    """
+    A CSV table that always holds the latest snapshot, e.g. the open positions.
+
+    write() is cheap to call every tick: the table is only rewritten when a
+    row other than its volatile_fields changed, or, when only volatile fields
+    (prices, PnL) moved, at most once per refresh_interval seconds. The file is
+    replaced atomically (temp file + rename), so readers never see it truncated.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        volatile_fields: Iterable[str] = ("pnl", "current_price"),
+        refresh_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.filename = filename
+        self.throttle = SnapshotThrottle(volatile_fields, refresh_interval, clock)
+        self._fieldnames: List[str] = []
+        self._last_content: str | None = None
+        self.writes = 0
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+
+    def write(self, obj: Any | List[Any]) -> None:
+        items = obj if isinstance(obj, list) else [obj]
+        rows = [item.__dict__ if hasattr(item, "__dict__") else item for item in items]
+        if rows:
+            self._fieldnames = list(rows[0].keys())
+
+        if not self.throttle.due(rows):
+            return
+
+        content = self._render(rows)
+        if content == self._last_content:
+            return
+
+        self._replace(content)
+        self._last_content = content
+        self.throttle.written()
+        self.writes += 1
+
+    def read(self, limit: int | None = None) -> List[dict]:
+        if not os.path.isfile(self.filename):
+            return []
+        with open(self.filename, newline='') as file:
+            return list(deque(csv.DictReader(file), maxlen=limit))
+
+    def _render(self, rows: List[dict]) -> str:
+        buffer = io.StringIO(newline='')
+        if self._fieldnames:
+            writer = csv.DictWriter(buffer, fieldnames=self._fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        return buffer.getvalue()
+
+    def _replace(self, content: str) -> None:
+        directory = os.path.dirname(self.filename) or "."
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(self.filename))
+        try:
+            with os.fdopen(fd, "w", newline='') as file:
+                file.write(content)
+            os.chmod(temp_path, 0o644)  # mkstemp creates it private
+            os.replace(temp_path, self.filename)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
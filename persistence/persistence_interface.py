@@ -5,3 +5,14 @@ class IPersistence(ABC):
     @abstractmethod
     def write(self, obj: Any | List[Any]):
         pass
+
+    def read(self, limit: int | None = None) -> List[dict]:
+        """The last `limit` stored rows (all of them by default), oldest first."""
+        raise NotImplementedError(f"{type(self).__name__} cannot read back its rows")
+
+    def flush(self) -> None:
+        """Blocks until everything written so far is stored."""
+        pass
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import tempfile
+
+class PositionJournal:
+    """
+    Crash-safe record of the open positions and exchange stats.
+
+    Every open/modify/close is appended to journal.jsonl as one JSON line and
+    flushed before the call returns. Every compact_every events the whole state
+    is written to snapshot.json (temp file + rename) and the journal restarts
+    empty. load() replays the snapshot plus the journal tail; events carry a
+    sequence number, so a crash between the two steps of a compaction
+    replays nothing twice, and a line torn by a crash is dropped.
+    """
+
+    def __init__(self, directory: str, compact_every: int = 1000, fsync: bool = False):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.fsync = fsync  # Also survive power loss, at the cost of a disk sync per event
+        self.snapshot_path = os.path.join(directory, "snapshot.json")
+        self.journal_path = os.path.join(directory, "journal.jsonl")
+        os.makedirs(directory, exist_ok=True)
+
+        self._seq = 0
+        self._events_since_compaction = 0
+        self._file = None
+
+    def load(self) -> dict:
+        """
+        The journaled state: {"positions": {id: record}, "stats": {...}, "id_counter": int}.
+        Must be called once before recording new events.
+        """
+        state = {"seq": 0, "positions": {}, "stats": {}, "id_counter": 0}
+        if os.path.isfile(self.snapshot_path):
+            with open(self.snapshot_path) as file:
+                state = json.load(file)
+            state["positions"] = {int(pos_id): record for pos_id, record in state["positions"].items()}
+
+        replayed = 0
+        if os.path.isfile(self.journal_path):
+            with open(self.journal_path, "rb+") as file:
+                valid_end = 0
+                for line in file:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        event = None
+                    if event is None or not line.endswith(b"\n"):
+                        # Torn by a crash mid-write: cut it off so new events start on a clean line
+                        logging.info("[PositionJournal] Dropping a torn event at the end of %s", self.journal_path)
+                        file.truncate(valid_end)
+                        break
+                    valid_end += len(line)
+                    if event["seq"] > state["seq"]:
+                        self._apply(state, event)
+                        replayed += 1
+
+        self._seq = state["seq"]
+        self._events_since_compaction = replayed
+        return state
+
+    @staticmethod
+    def _apply(state: dict, event: dict) -> None:
+        positions = state["positions"]
+        kind = event["event"]
+        if kind == "open":
+            record = event["position"]
+            positions[record["id"]] = record
+            state["id_counter"] = max(state["id_counter"], record["id"])
+        elif kind == "modify" and event["id"] in positions:
+            positions[event["id"]].update(sl=event["sl"], tp=event["tp"])
+        elif kind == "close":
+            positions.pop(event["id"], None)
+        if "stats" in event:
+            state["stats"] = event["stats"]
+        state["seq"] = event["seq"]
+
+    def record_open(self, record: dict) -> None:
+        self._append({"event": "open", "position": record})
+
+    def record_modify(self, pos_id: int, sl: float, tp: float) -> None:
+        self._append({"event": "modify", "id": pos_id, "sl": sl, "tp": tp})
+
+    def record_close(self, pos_id: int, stats: dict) -> None:
+        self._append({"event": "close", "id": pos_id, "stats": stats})
+
+    def needs_compaction(self) -> bool:
+        return self._events_since_compaction >= self.compact_every
+
+    def compact(self, positions: list[dict], stats: dict, id_counter: int) -> None:
+        """Writes the full state as the new snapshot and empties the journal."""
+        state = {
+            "seq": self._seq,
+            "positions": {str(record["id"]): record for record in positions},
+            "stats": stats,
+            "id_counter": id_counter,
+        }
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".snapshot-")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(state, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.snapshot_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.close()
+        open(self.journal_path, "w").close()
+        self._events_since_compaction = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _append(self, event: dict) -> None:
+        self._seq += 1
+        event["seq"] = self._seq
+        if self._file is None:
+            self._file = open(self.journal_path, "a")
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._events_since_compaction += 1
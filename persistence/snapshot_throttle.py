@@ -0,0 +1,35 @@
+import time
+from typing import Callable, Iterable, List
+
+
+class SnapshotThrottle:
+    """
+    Decides when a snapshot table (e.g. the open positions) is worth rewriting:
+    at once when a row other than its volatile_fields changed, or, when only
+    volatile fields (prices, PnL) moved, at most once per refresh_interval seconds.
+
+        if throttle.due(rows):
+            store(rows)
+            throttle.written()
+    """
+
+    def __init__(self, volatile_fields: Iterable[str] = (), refresh_interval: float = 0.0, clock: Callable[[], float] = time.monotonic):
+        self.volatile_fields = frozenset(volatile_fields)
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._last_stable: list | None = None
+        self._last_write = float("-inf")
+        self._pending: tuple | None = None  # (stable, now) of the rows last checked
+
+    def due(self, rows: List[dict]) -> bool:
+        stable = [
+            tuple((key, value) for key, value in row.items() if key not in self.volatile_fields)
+            for row in rows
+        ]
+        now = self._clock()
+        self._pending = (stable, now)
+        return stable != self._last_stable or now - self._last_write >= self.refresh_interval
+
+    def written(self) -> None:
+        """Records the rows last passed to due() as stored."""
+        self._last_stable, self._last_write = self._pending
@@ -0,0 +1,145 @@
+import numbers
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from typing import Any, Callable, Iterable, List
+from persistence.persistence_interface import IPersistence
+from persistence.snapshot_throttle import SnapshotThrottle
+
+def _to_sql(value: Any) -> Any:
+    # sqlite3 binds numpy scalars as blobs (or not at all); hand it the Python equivalent
+    return value.item() if isinstance(value, np.generic) else value
+
+def _sql_type(value: Any) -> str:
+    value = _to_sql(value)
+    if value is None:
+        return ""  # No declared type: the column stores whatever is bound later
+    if isinstance(value, numbers.Integral):  # bool included
+        return " INTEGER"
+    if isinstance(value, numbers.Real):
+        return " REAL"
+    return " TEXT"
+
+class SQLitePersistence(IPersistence):
+    """
+    One SQLite table, in WAL mode so readers (e.g. an analysis notebook) never
+    block the writer.
+
+    Without a key, write() appends its rows in a single transaction. With a
+    key, the table is a snapshot: write() upserts the given rows by key and
+    deletes the ones not given, also in a single transaction. Like
+    CSVSnapshotPersistence, a snapshot whose rows only changed in
+    volatile_fields is stored at most once per refresh_interval seconds.
+
+    The table is created from the first row written: integers (bools
+    included), other real numbers and everything else become INTEGER, REAL
+    and TEXT columns; numpy scalars count as their Python type, and a None
+    leaves its column untyped.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        table: str,
+        key: str = None,
+        indexes: Iterable[str] = (),
+        volatile_fields: Iterable[str] = (),
+        refresh_interval: float = 0.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.filename = filename
+        self.table = table
+        self.key = key
+        self.indexes = list(indexes)
+        self.throttle = SnapshotThrottle(volatile_fields, refresh_interval, clock) if key is not None else None
+        self.writes = 0
+        self._columns: List[str] = []
+        self._lock = threading.Lock()
+
+        if os.path.dirname(filename):
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+        self._conn = sqlite3.connect(filename, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last commits can be lost on power failure
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._load_columns()
+
+    def _load_columns(self) -> None:
+        self._columns = [row["name"] for row in self._conn.execute(f'PRAGMA table_info("{self.table}")')]
+
+    def _create_table(self, row: dict) -> None:
+        columns = [f'"{name}"{_sql_type(value)}' + (" PRIMARY KEY" if name == self.key else "") for name, value in row.items()]
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" ({", ".join(columns)})')
+        for column in self.indexes:
+            self._conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{self.table}_{column}" ON "{self.table}" ("{column}")')
+        self._load_columns()
+
+    def write(self, obj: Any | List[Any]) -> None:
+        items = obj if isinstance(obj, list) else [obj]
+        rows = [item.__dict__ if hasattr(item, "__dict__") else item for item in items]
+        if not rows and self.key is None:
+            return
+        if self.throttle is not None and not self.throttle.due(rows):
+            return
+
+        with self._lock:
+            if rows and not self._columns:
+                self._create_table(rows[0])
+            if not self._columns:
+                return
+
+            columns = ", ".join(f'"{name}"' for name in self._columns)
+            placeholders = ", ".join(f":{name}" for name in self._columns)
+            values = [{name: _to_sql(row.get(name)) for name in self._columns} for row in rows]
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.key is None:
+                    self._conn.executemany(f'INSERT INTO "{self.table}" ({columns}) VALUES ({placeholders})', values)
+                else:
+                    updates = ", ".join(f'"{name}" = excluded."{name}"' for name in self._columns if name != self.key)
+                    self._conn.executemany(
+                        f'INSERT INTO "{self.table}" ({columns}) VALUES ({placeholders}) '
+                        f'ON CONFLICT("{self.key}") DO UPDATE SET {updates}',
+                        values
+                    )
+                    self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS _keep (key PRIMARY KEY)")
+                    self._conn.execute("DELETE FROM _keep")
+                    self._conn.executemany("INSERT OR IGNORE INTO _keep VALUES (?)", [(row[self.key],) for row in values])
+                    self._conn.execute(f'DELETE FROM "{self.table}" WHERE "{self.key}" NOT IN (SELECT key FROM _keep)')
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            if self.throttle is not None:
+                self.throttle.written()
+            self.writes += 1
+
+    def read(self, limit: int | None = None) -> List[dict]:
+        if limit is not None and limit <= 0:
+            return []
+        rows = self.select(order_by="rowid DESC", limit=limit)
+        rows.reverse()
+        return rows
+
+    def select(self, where: str = "", params: Iterable[Any] = (), order_by: str = "rowid", limit: int | None = None) -> List[dict]:
+        """Rows matching an SQL condition, e.g. select("strategy = ? AND close_time >= ?", ("HTF_MCD", "2025-01-01"))."""
+        with self._lock:
+            if not self._columns:
+                return []
+            sql = f'SELECT * FROM "{self.table}"'
+            if where:
+                sql += f" WHERE {where}"
+            sql += f" ORDER BY {order_by}"
+            params = list(params)
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(limit)
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,7 +1,9 @@
+import numpy as np
 from enum import Enum
 from typing import Optional
+from charts.candle_store import CandleArrays
 from charts.chart_interface import IChart, TrendDirection
-from structs.signal import Signal
+from structs.signal import Signal, SignalArrays
 from strategies.strategy_interface import IStrategy
 
 class FullBodyCandle(Enum):
@@ -12,6 +14,12 @@ class FullBodyCandle(Enum):
 class StrategyFullBodyInMacdZones(IStrategy):
     STRATEGY_NAME = "FBdy+MCD"
 
+    PARAMS = {
+        "min_body_ratio": 0.8,
+        "max_shadow_ratio": 0.2,
+        "reward_ratio": 3.0,  # TP distance in multiples of the SL distance
+    }
+
     def _candle_full_body_type(self, open_, high, low, close):
         body = abs(close - open_)
         range_ = high - low
@@ -24,9 +32,9 @@ class StrategyFullBodyInMacdZones(IStrategy):
         body_ratio = body / range_
         shadow_ratio = (upper_shadow + lower_shadow) / range_
 
-        if close > open_ and body_ratio >= 0.8 and shadow_ratio <= 0.2:
+        if close > open_ and body_ratio >= self.min_body_ratio and shadow_ratio <= self.max_shadow_ratio:
             return FullBodyCandle.FULL_BODY_GREEN
-        elif close < open_ and body_ratio >= 0.8 and shadow_ratio <= 0.2:
+        elif close < open_ and body_ratio >= self.min_body_ratio and shadow_ratio <= self.max_shadow_ratio:
             return FullBodyCandle.FULL_BODY_RED
         else:
             return FullBodyCandle.NONE
@@ -41,12 +49,47 @@ class StrategyFullBodyInMacdZones(IStrategy):
         macd_trend = chart.get_macd_trend()
         if candle_type == FullBodyCandle.FULL_BODY_GREEN and macd_trend == TrendDirection.UPTREND:
             sl = open_
-            tp = close + (close - sl)*3
+            tp = close + (close - sl)*self.reward_ratio
             return Signal(entry=close, sl=sl, tp=tp, type="Long")
 
         elif candle_type == FullBodyCandle.FULL_BODY_RED and macd_trend == TrendDirection.DOWNTREND:
             sl = open_
-            tp = close - 3*(sl - close)
+            tp = close - self.reward_ratio*(sl - close)
             return Signal(entry=close, sl=sl, tp=tp, type="Short")
 
         return None
+
+    def _candle_full_body_types(self, open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized _candle_full_body_type: (green, red) boolean masks."""
+        return full_body_masks(open_, high, low, close, self.min_body_ratio, self.max_shadow_ratio)
+
+    def generate_signals_vectorized(self, candles: CandleArrays, macd_trend: np.ndarray = None, **series: np.ndarray) -> SignalArrays:
+        """
+        macd_trend holds, for each candle, the sign of MACD minus its signal line
+        as generate_signal would see it (+1 uptrend, -1 downtrend, 0 neutral).
+        """
+        if macd_trend is None:
+            raise ValueError(f"{self.STRATEGY_NAME} needs a macd_trend array")
+
+        open_, close = candles.open, candles.close
+        green, red = self._candle_full_body_types(open_, candles.high, candles.low, close)
+        long = green & (macd_trend > 0)
+        short = red & (macd_trend < 0)
+
+        tp = np.where(long, close + (close - open_)*self.reward_ratio, close - self.reward_ratio*(open_ - close))
+        return SignalArrays.from_masks(long, short, close, open_, tp)
+
+def full_body_masks(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, min_body_ratio: float, max_shadow_ratio: float) -> tuple[np.ndarray, np.ndarray]:
+    """(green, red) masks of candles whose body fills at least min_body_ratio of their range."""
+    range_ = high - low
+    has_range = range_ != 0
+    safe_range = np.where(has_range, range_, 1.0)  # Avoid division by zero
+
+    upper_shadow = high - np.maximum(open_, close)
+    lower_shadow = np.minimum(open_, close) - low
+    body_ratio = np.abs(close - open_) / safe_range
+    shadow_ratio = (upper_shadow + lower_shadow) / safe_range
+
+    full_body = has_range & (body_ratio >= min_body_ratio) & (shadow_ratio <= max_shadow_ratio)
+    return full_body & (close > open_), full_body & (close < open_)
+
@@ -1,7 +1,9 @@
+import numpy as np
 from enum import Enum
 from typing import Optional
+from charts.candle_store import CandleArrays
 from charts.chart_interface import IChart
-from structs.signal import Signal
+from structs.signal import Signal, SignalArrays
 from strategies.strategy_interface import IStrategy
 
 class HammerCandle(Enum):
@@ -12,9 +14,15 @@ class HammerCandle(Enum):
 class StrategyHammerCandles(IStrategy):
     STRATEGY_NAME = "Simple Hammer"
 
+    PARAMS = {
+        "min_shadow_to_body_ratio": 2.0,
+        "max_opposite_shadow_ratio": 0.2,
+        "reward_ratio": 1.0,  # TP distance in multiples of the SL distance
+    }
+
     def _candle_hammer_type(self, open_, high, low, close):
-        MIN_SHADOW_TO_BODY_RATIO = 2.0
-        MAX_OPPOSITE_SHADOW_RATIO = 0.2
+        MIN_SHADOW_TO_BODY_RATIO = self.min_shadow_to_body_ratio
+        MAX_OPPOSITE_SHADOW_RATIO = self.max_opposite_shadow_ratio
 
         body_size = abs(close - open_)
         if body_size == 0:
@@ -48,13 +56,38 @@ class StrategyHammerCandles(IStrategy):
         if hammer_type == HammerCandle.BULLISH_HAMMER:
             bottom_shadow = min(open_, close) - low
             sl = low + (bottom_shadow / 2)
-            tp = close + (close - sl)
+            tp = close + (close - sl)*self.reward_ratio
             return Signal(entry=close, sl=sl, tp=tp, type="Long")
 
         elif hammer_type == HammerCandle.BEARISH_HAMMER:
             top_shadow = high - max(open_, close)
             sl = high - (top_shadow / 2)
-            tp = close - (sl - close)
+            tp = close - self.reward_ratio*(sl - close)
             return Signal(entry=close, sl=sl, tp=tp, type="Short")
 
         return None
+
+    def _candle_hammer_types(self, open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized _candle_hammer_type: (bullish, bearish) boolean masks."""
+        body_size = np.abs(close - open_)
+        upper_shadow = high - np.maximum(open_, close)
+        lower_shadow = np.minimum(open_, close) - low
+
+        bullish = (close > open_) & \
+            (lower_shadow >= self.min_shadow_to_body_ratio * body_size) & \
+            (upper_shadow <= self.max_opposite_shadow_ratio * lower_shadow)
+        bearish = (close < open_) & \
+            (upper_shadow >= self.min_shadow_to_body_ratio * body_size) & \
+            (lower_shadow <= self.max_opposite_shadow_ratio * upper_shadow)
+        return bullish, bearish
+
+    def generate_signals_vectorized(self, candles: CandleArrays, **series: np.ndarray) -> SignalArrays:
+        open_, high, low, close = candles.open, candles.high, candles.low, candles.close
+        bullish, bearish = self._candle_hammer_types(open_, high, low, close)
+
+        long_sl = low + (np.minimum(open_, close) - low) / 2
+        short_sl = high - (high - np.maximum(open_, close)) / 2
+        sl = np.where(bullish, long_sl, short_sl)
+        tp = np.where(bullish, close + (close - long_sl)*self.reward_ratio, close - self.reward_ratio*(short_sl - close))
+        return SignalArrays.from_masks(bullish, bearish, close, sl, tp)
+
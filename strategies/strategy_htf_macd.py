@@ -1,7 +1,11 @@
+import numpy as np
 from enum import Enum
 from typing import Optional
+from charts.candle_store import CandleArrays
 from charts.chart_interface import IChart, TrendDirection, Timeframe
-from structs.signal import Signal
+from charts.chart_registry import chart_registry
+from structs.signal import Signal, SignalArrays
+from strategies.strategy_fbody_macd import full_body_masks
 from strategies.strategy_interface import IStrategy
 
 class FullBodyCandle(Enum):
@@ -12,13 +16,26 @@ class FullBodyCandle(Enum):
 class StrategyHTF_MCD(IStrategy):
     STRATEGY_NAME = "HTF_MCD"
 
-    _HIGHER_TF_MAP = {
-        Timeframe.MINUTE_15: [Timeframe.HOURS_4],
-        Timeframe.MINUTE_30: [Timeframe.HOURS_4],
+    PARAMS = {
+        "min_body_ratio": 0.7,
+        "max_shadow_ratio": 0.3,
+        "reward_ratio": 3.0,  # TP distance in multiples of the SL distance
+        "higher_tf_map": {
+            Timeframe.MINUTE_15: [Timeframe.HOURS_4],
+            Timeframe.MINUTE_30: [Timeframe.HOURS_4],
+        },
     }
 
+    def __init__(self, **params):
+        super().__init__(**params)
+        # PARAMS is shared by every instance; mutating one strategy's map must not leak into the others
+        self.higher_tf_map = self.params["higher_tf_map"] = {tf: list(tfs) for tf, tfs in self.higher_tf_map.items()}
+
     def _get_higher_timeframes(self, tf: Timeframe) -> list[Timeframe]:
-        return self._HIGHER_TF_MAP.get(tf, [])
+        return self.higher_tf_map.get(tf, [])
+
+    def required_timeframes(self, timeframe: Timeframe) -> list[Timeframe]:
+        return self._get_higher_timeframes(timeframe)
 
     def _get_higher_timeframes_macd_trend(self, chart: IChart) -> TrendDirection:
         higher_tfs = self._get_higher_timeframes(chart.timeframe)
@@ -26,8 +43,8 @@ class StrategyHTF_MCD(IStrategy):
         chart_cls = type(chart)
 
         for tf in higher_tfs:
-            new_chart = chart_cls(chart.symbol, tf)
-            trend = new_chart.get_macd_trend()
+            htf_chart = chart_registry.get(chart_cls, chart.symbol, tf)
+            trend = htf_chart.get_macd_trend()
             higher_tfs_trends.add(trend)
             
         if higher_tfs_trends == {TrendDirection.UPTREND}:
@@ -48,15 +65,15 @@ class StrategyHTF_MCD(IStrategy):
         body_ratio = body / range_
         shadow_ratio = (upper_shadow + lower_shadow) / range_
 
-        if close > open_ and body_ratio >= 0.7 and shadow_ratio <= 0.3:
+        if close > open_ and body_ratio >= self.min_body_ratio and shadow_ratio <= self.max_shadow_ratio:
             return FullBodyCandle.FULL_BODY_GREEN
-        elif close < open_ and body_ratio >= 0.7 and shadow_ratio <= 0.3:
+        elif close < open_ and body_ratio >= self.min_body_ratio and shadow_ratio <= self.max_shadow_ratio:
             return FullBodyCandle.FULL_BODY_RED
         else:
             return FullBodyCandle.NONE
 
     def generate_signal(self, chart: IChart) -> Optional[Signal]:
-        if chart.timeframe not in self._HIGHER_TF_MAP:
+        if chart.timeframe not in self.higher_tf_map:
             return None
 
         candles = chart.get_recent_candles(2)
@@ -74,7 +91,7 @@ class StrategyHTF_MCD(IStrategy):
             self._get_higher_timeframes_macd_trend(chart) == TrendDirection.UPTREND
         ):
             sl = open_
-            tp = close + (close - sl)*3
+            tp = close + (close - sl)*self.reward_ratio
             return Signal(entry=close, sl=sl, tp=tp, type="Long")
 
         elif (candle_type == FullBodyCandle.FULL_BODY_RED and 
@@ -82,7 +99,25 @@ class StrategyHTF_MCD(IStrategy):
               self._get_higher_timeframes_macd_trend(chart) == TrendDirection.DOWNTREND
         ):
             sl = open_
-            tp = close - 3*(sl - close)
+            tp = close - self.reward_ratio*(sl - close)
             return Signal(entry=close, sl=sl, tp=tp, type="Short")
 
         return None
+
+    def generate_signals_vectorized(self, candles: CandleArrays, macd_trend: np.ndarray = None, htf_trend: np.ndarray = None, **series: np.ndarray) -> SignalArrays:
+        """
+        macd_trend and htf_trend hold, for each candle, the sign of MACD minus its
+        signal line on this chart and the combined higher-timeframe trend
+        (+1 uptrend, -1 downtrend, 0 neutral or mixed).
+        """
+        if macd_trend is None or htf_trend is None:
+            raise ValueError(f"{self.STRATEGY_NAME} needs macd_trend and htf_trend arrays")
+
+        open_, close = candles.open, candles.close
+        green, red = full_body_masks(open_, candles.high, candles.low, close, self.min_body_ratio, self.max_shadow_ratio)
+        long = green & (macd_trend > 0) & (htf_trend > 0)
+        short = red & (macd_trend < 0) & (htf_trend < 0)
+
+        tp = np.where(long, close + (close - open_)*self.reward_ratio, close - self.reward_ratio*(open_ - close))
+        return SignalArrays.from_masks(long, short, close, open_, tp)
+
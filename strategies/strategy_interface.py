@@ -1,10 +1,34 @@
-from charts.chart_interface import IChart
+import numpy as np
+from charts.chart_interface import IChart, Timeframe
+from charts.candle_store import CandleArrays
 from abc import ABC, abstractmethod
 from typing import Optional
-from structs.signal import Signal
+from structs.signal import Signal, SignalArrays
 
 class IStrategy(ABC):
     STRATEGY_NAME: str
+    PARAMS: dict = {}  # Tunable parameters and their defaults, set as attributes
+
+    def __init__(self, **params):
+        unknown = set(params) - set(self.PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown {self.STRATEGY_NAME} parameters: {sorted(unknown)}")
+        self.params = {**self.PARAMS, **params}
+        for name, value in self.params.items():
+            setattr(self, name, value)
+
+    def required_timeframes(self, timeframe: Timeframe) -> list[Timeframe]:
+        """Extra timeframes this strategy reads when analysing a chart of `timeframe`."""
+        return []
+
+    def generate_signals_vectorized(self, candles: CandleArrays, **series: np.ndarray) -> Optional[SignalArrays]:
+        """
+        Evaluates every row of candles as if it were the just-closed candle, in one
+        NumPy pass. Strategies that also read indicators take them as extra arrays
+        aligned with candles (see each implementation). Returns None when the
+        strategy has no vectorized form.
+        """
+        return None
 
     @abstractmethod
     def generate_signal(self, chart: IChart) -> Optional[Signal]:
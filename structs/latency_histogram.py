@@ -0,0 +1,54 @@
+import bisect
+import threading
+from typing import Dict, Tuple
+
+# Upper bounds in seconds, Prometheus-style (cumulative counts are derived on read)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class LatencyHistogram:
+    """Observed from any thread (e.g. the agent's worker pool); a lock keeps the buckets, count and sum consistent."""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[i] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def cumulative(self) -> Dict[str, int]:
+        """Cumulative count per upper bound, e.g. {"0.1": 12, ..., "+Inf": 20}."""
+        return self.snapshot()[0]
+
+    def snapshot(self) -> Tuple[Dict[str, int], float, int]:
+        """(cumulative(), sum, count) read together, so the +Inf bucket always equals count."""
+        with self._lock:
+            counts, total_sum, count = list(self._counts), self.sum, self.count
+        result, total = {}, 0
+        for bound, n in zip([*map(str, self.buckets), "+Inf"], counts):
+            total += n
+            result[bound] = total
+        return result, total_sum, count
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (inf if it is the overflow bucket)."""
+        with self._lock:
+            counts, count = list(self._counts), self.count
+        if count == 0:
+            return 0.0
+        target, total = q * count, 0
+        for bound, n in zip(self.buckets, counts):
+            total += n
+            if total >= target:
+                return bound
+        return float("inf")
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
@@ -1,10 +1,13 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import ClassVar
 from datetime import datetime, timedelta, timezone
 from charts.chart_interface import IChart
 from strategies.strategy_interface import IStrategy
 from structs.signal import Signal
 
-@dataclass
+_DIRECTIONS = {"Long": 1, "Short": -1}
+
+@dataclass(slots=True)
 class Position:
     chart: IChart
     strategy: IStrategy
@@ -20,27 +23,36 @@ class Position:
     exit_price: float = 0
     exit_reason: str = ""
     _current_price: float = 0
-    pnl = 0
-    max_pnl = 0
-    min_pnl = 0
-    
+    pnl: float = field(default=0, compare=False)
+    max_pnl: float = field(default=0, compare=False)
+    min_pnl: float = field(default=0, compare=False)
+    id: int = field(init=False, default=0, compare=False)
+    # Fixed at creation: +1 Long, -1 Short, 0 otherwise, and the PnL/profit denominator
+    direction: int = field(init=False, default=0, repr=False, compare=False)
+    risk: float = field(init=False, default=0, repr=False, compare=False)
+
+    # class-level counter
+    _id_counter: ClassVar[int] = 0
+
+    def __post_init__(self):
+        type(self)._id_counter += 1
+        self.id = type(self)._id_counter
+        self.direction = _DIRECTIONS.get(self.type, 0)
+        self.risk = self.direction * (self.entry - self.initial_sl)
+
     def get_current_price(self) -> float:
         return self._current_price
 
     def set_current_price(self, new_price: float) -> None:
         self._current_price = new_price
-        self.pnl = self._calc_PNL()
-        self.max_pnl = max(self.max_pnl, self.pnl)
-        self.min_pnl = min(self.min_pnl, self.pnl)
+        pnl = self.pnl = self._calc_PNL()
+        if pnl > self.max_pnl:
+            self.max_pnl = pnl
+        if pnl < self.min_pnl:
+            self.min_pnl = pnl
 
     current_price = property(get_current_price, set_current_price)
 
-    # class-level counter
-    _id_counter: int = 0
-    def __post_init__(self):
-        type(self)._id_counter += 1
-        self.id = type(self)._id_counter
-
     @classmethod
     def generate_position(cls, chart, strategy: IStrategy, signal: Signal) -> "Position":
         return cls(
@@ -54,6 +66,42 @@ class Position:
             type=signal.type,
         )
 
+    _RECORD_FIELDS = ("id", "type", "entry", "initial_sl", "initial_tp", "sl", "tp", "status", "open_timestamp", "pnl", "max_pnl", "min_pnl")
+
+    def to_record(self) -> dict:
+        """JSON-serializable state of an open position; the chart and strategy are stored by name."""
+        record = {name: getattr(self, name) for name in self._RECORD_FIELDS}
+        record.update(
+            symbol=self.chart.symbol,
+            timeframe=self.chart.timeframe.value,
+            strategy=self.strategy.STRATEGY_NAME,
+            current_price=self._current_price,
+        )
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict, chart: IChart, strategy: IStrategy) -> "Position":
+        """Rebuilds a to_record() position, keeping its id."""
+        pos = cls(
+            chart=chart,
+            strategy=strategy,
+            entry=record["entry"],
+            initial_sl=record["initial_sl"],
+            initial_tp=record["initial_tp"],
+            sl=record["sl"],
+            tp=record["tp"],
+            type=record["type"],
+            status=record["status"],
+            open_timestamp=record["open_timestamp"],
+            _current_price=record["current_price"],
+            pnl=record["pnl"],
+            max_pnl=record["max_pnl"],
+            min_pnl=record["min_pnl"],
+        )
+        pos.id = record["id"]
+        cls._id_counter = max(cls._id_counter, pos.id)
+        return pos
+
     @property
     def duration(self) -> str:
         if self.open_timestamp == 0 or self.close_timestamp == 0:
@@ -69,22 +117,15 @@ class Position:
 
     @property
     def profit(self) -> float:
-        direction = {"Long": 1, "Short": -1}.get(self.type)
-        if direction is None:
-            return 0
-        risk = direction * (self.entry - self.initial_sl)
-        return 0 if risk == 0 else direction * (self.exit_price - self.entry) / risk
+        risk = self.risk
+        return 0 if risk == 0 else self.direction * (self.exit_price - self.entry) / risk
     
     def _calc_PNL(self):
-        direction = {"Long": 1, "Short": -1}.get(self.type)
-        if direction is None:
-            return 0
-
-        risk = direction * (self.entry - self.initial_sl)
+        risk = self.risk
         if risk == 0:
             return 0
 
-        return direction * (self.current_price - self.entry) / risk
+        return self.direction * (self._current_price - self.entry) / risk
 
     def to_active_position_row(self):
         active_position_row = {
@@ -121,3 +162,7 @@ class Position:
             "duration": self.duration
         }
         return history_row
+
+def position_key(pos: Position) -> tuple:
+    """(symbol, timeframe, type, strategy name): at most one open position per key."""
+    return (pos.chart.symbol, pos.chart.timeframe, pos.type, pos.strategy.STRATEGY_NAME)
@@ -1,8 +1,52 @@
+import numpy as np
 from dataclasses import dataclass
+from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class Signal:
     entry: float
     sl: float
     tp: float
-    type: str
\ No newline at end of file
+    type: str
+
+LONG = 1
+SHORT = -1
+
+@dataclass
+class SignalArrays:
+    """
+    One row per candle: direction is LONG, SHORT or 0 (no signal), and
+    entry/sl/tp are NaN on rows without a signal.
+    """
+    direction: np.ndarray
+    entry: np.ndarray
+    sl: np.ndarray
+    tp: np.ndarray
+
+    @classmethod
+    def from_masks(cls, long: np.ndarray, short: np.ndarray, entry: np.ndarray, sl: np.ndarray, tp: np.ndarray) -> "SignalArrays":
+        direction = np.where(long, LONG, np.where(short, SHORT, 0)).astype(np.int8)
+        active = direction != 0
+        nan = np.full(len(direction), np.nan)
+        return cls(
+            direction=direction,
+            entry=np.where(active, entry, nan),
+            sl=np.where(active, sl, nan),
+            tp=np.where(active, tp, nan),
+        )
+
+    def __len__(self) -> int:
+        return len(self.direction)
+
+    def indices(self) -> np.ndarray:
+        """Row indices that carry a signal."""
+        return np.flatnonzero(self.direction)
+
+    def signal_at(self, i: int) -> Optional[Signal]:
+        direction = self.direction[i]
+        if direction == 0:
+            return None
+        return Signal(
+            entry=float(self.entry[i]), sl=float(self.sl[i]), tp=float(self.tp[i]),
+            type="Long" if direction == LONG else "Short"
+        )
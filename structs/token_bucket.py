@@ -0,0 +1,31 @@
+import time
+from typing import Callable
+
+class TokenBucket:
+    """Allows `rate` events per second on average, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` are available (0 if they are now)."""
+        self._refill()
+        missing = tokens - self._tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def take(self, tokens: float = 1.0) -> bool:
+        """Consumes `tokens` if they are available."""
+        self._refill()
+        if self._tokens < tokens:
+            return False
+        self._tokens -= tokens
+        return True
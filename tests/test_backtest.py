@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from apps.backtest import Backtester
+from apps.sweep import ParameterSweep, SharedCandles, SweepJob, load_results, run_job
+from charts.candle_store import CandleArrays
+from charts.chart_interface import Timeframe
+from charts.chart_registry import chart_registry
+from charts.historical_chart import HistoricalChart
+from strategies.strategy_htf_macd import StrategyHTF_MCD
+from strategies.strategy_hammer_candles import StrategyHammerCandles
+
+BASE = 1700000000000 - 1700000000000 % 900000
+
+def kline(i, o, h, l, c):
+    t = BASE + i * 900000
+    return [t, str(o), str(h), str(l), str(c), "1.0", t + 899999, "1.0", 1, "0.5", "0.5", "0"]
+
+class TestBacktester(unittest.TestCase):
+    @staticmethod
+    def _klines(_=None):
+        rows = [kline(i, 100, 101, 99, 100.5) for i in range(5)]
+        rows.append(kline(5, 100, 101, 80, 100.5))     # bullish hammer: entry 100.5, sl 90, tp 111
+        rows.append(kline(6, 100.5, 112, 100, 111.5))  # takes profit
+        rows += [kline(i, 111, 112, 110, 111) for i in range(7, 10)]
+        return rows
+
+    def test_replays_hammer_to_take_profit(self):
+        chart = HistoricalChart("BTCUSDT", Timeframe.MINUTE_15, self._klines())
+        backtester = Backtester([chart], [StrategyHammerCandles()])
+
+        exchange = backtester.run()
+
+        self.assertEqual(backtester.steps, 10)
+        self.assertEqual(len(exchange.closed_positions), 1)
+        pos = exchange.closed_positions[0]
+        self.assertEqual((pos.type, pos.entry, pos.sl, pos.exit_price, pos.exit_reason), ("Long", 100.5, 90.0, 111.0, "TP Hit"))
+        self.assertEqual(pos.open_timestamp, (BASE + 6 * 900000) // 1000)
+        self.assertEqual(pos.close_timestamp, (BASE + 7 * 900000) // 1000)
+        self.assertEqual(exchange.profits_sum, 1.0)
+        self.assertEqual(len(chart_registry), 0)
+
+    def test_missing_context_timeframe_raises(self):
+        chart = HistoricalChart("BTCUSDT", Timeframe.MINUTE_15, self._klines())
+        with self.assertRaises(ValueError):
+            Backtester([chart], [StrategyHTF_MCD()])
+
+    def test_run_leaves_registry_as_found(self):
+        existing = chart_registry.register(HistoricalChart("ETHUSDT", Timeframe.HOURS_4))
+        self.addCleanup(chart_registry.unregister, existing)
+        chart = HistoricalChart("BTCUSDT", Timeframe.MINUTE_15, self._klines())
+        context = HistoricalChart("BTCUSDT", Timeframe.HOURS_4, self._klines())
+
+        Backtester([chart], [StrategyHTF_MCD()], [context]).run()
+
+        self.assertEqual(chart_registry.charts(), [existing])
+
+    def test_run_respects_time_window(self):
+        chart = HistoricalChart("BTCUSDT", Timeframe.MINUTE_15, self._klines())
+        exchange = Backtester([chart], [StrategyHammerCandles()]).run(end_ms=BASE + 5 * 900000)
+        self.assertEqual(exchange.n_active_positions, 0)
+
+class TestParameterSweep(unittest.TestCase):
+    def setUp(self):
+        self.datasets = {("BTCUSDT", Timeframe.MINUTE_15): CandleArrays.from_raw(TestBacktester._klines(None))}
+
+    def test_grid_expands_every_combination(self):
+        jobs = SweepJob.grid(["BTCUSDT", "ETHUSDT"], [Timeframe.MINUTE_15], StrategyHammerCandles,
+                             {"min_shadow_to_body_ratio": [1.5, 2.0, 3.0], "reward_ratio": [1.0, 2.0]})
+        self.assertEqual(len(jobs), 12)
+        self.assertEqual(jobs[1].params, {"min_shadow_to_body_ratio": 1.5, "reward_ratio": 2.0})
+
+    def test_shared_candles_round_trip(self):
+        with SharedCandles(self.datasets) as shared:
+            datasets, blocks = SharedCandles.attach(shared.manifest)
+            candles = datasets[("BTCUSDT", Timeframe.MINUTE_15)]
+            original = self.datasets[("BTCUSDT", Timeframe.MINUTE_15)]
+            np.testing.assert_array_equal(candles.low, original.low)
+            np.testing.assert_array_equal(candles.timestamp, original.timestamp)
+            self.assertFalse(candles.close.flags.writeable)
+            del datasets, candles
+            for block in blocks:
+                block.close()
+
+    def test_run_job_rejects_missing_context_charts(self):
+        with self.assertRaisesRegex(ValueError, r"\(BTCUSDT, 4h\)"):
+            run_job(SweepJob("BTCUSDT", Timeframe.MINUTE_15, StrategyHTF_MCD), self.datasets)
+
+    def test_sweep_checks_every_data_set_before_starting(self):
+        jobs = [SweepJob("BTCUSDT", Timeframe.MINUTE_15, StrategyHammerCandles), SweepJob("BTCUSDT", Timeframe.MINUTE_15, StrategyHTF_MCD)]
+        with self.assertRaisesRegex(ValueError, r"\(BTCUSDT, 4h\)"):
+            ParameterSweep(self.datasets, workers=1).run(jobs)
+
+    def test_failed_job_is_recorded_and_the_others_kept(self):
+        jobs = [SweepJob("BTCUSDT", Timeframe.MINUTE_15, StrategyHammerCandles), SweepJob("BTCUSDT", Timeframe.MINUTE_15, StrategyHammerCandles, {"typo": 1})]
+        results = ParameterSweep(self.datasets, workers=2).run(jobs)
+
+        self.assertEqual(results["trades"].tolist(), [1, 0])
+        self.assertEqual(results["error"][0], "")
+        self.assertTrue(results["error"][1].startswith("ValueError: Unknown Simple Hammer parameters"))
+
+    def test_sweep_writes_columnar_results(self):
+        jobs = SweepJob.grid(["BTCUSDT"], [Timeframe.MINUTE_15], StrategyHammerCandles, {"reward_ratio": [1.0, 0.5, 5.0]})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.npz")
+            ParameterSweep(self.datasets, workers=2).run(jobs, path)
+            results = load_results(path)
+
+        self.assertEqual(results["param_reward_ratio"].tolist(), [1.0, 0.5, 5.0])
+        self.assertEqual(results["trades"].tolist(), [1, 1, 0])
+        self.assertEqual(results["profit_sum"].tolist(), [1.0, 0.5, 0.0])
+        self.assertEqual(results["open_positions"].tolist(), [0, 0, 1])
+        self.assertEqual(results["strategy"].tolist(), ["Simple Hammer"] * 3)
+        self.assertEqual(results["error"].tolist(), [""] * 3)
+
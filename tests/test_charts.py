@@ -1,10 +1,22 @@
+import random
+import requests
 import unittest
 import pandas as pd
+import pandas_ta as ta
 import numpy as np
 from unittest.mock import patch, MagicMock
 from charts.chart_interface import IChart, Timeframe, Candle, TrendDirection, TrendMetrics
-from charts.binance_chart import BinanceAPI, BinanceChart
-from datetime import datetime, timezone
+from charts.binance_chart import BinanceAPI, BinanceChart, KlineRingBuffer
+from charts.candle_store import CandleArrays, CandleStore
+from charts.indicator_cache import IndicatorCache
+from charts.chart_registry import ChartRegistry
+from charts.historical_chart import HistoricalChart, SimulatedClock
+from charts.streaming_indicators import StreamingMacd
+from datetime import datetime, timedelta, timezone
+
+def kline(open_time, o=1, h=1, l=1, c=1, v=1):
+    # Full 12-field Binance kline row
+    return [open_time, o, h, l, c, v, open_time + 59999, 1, 1, 1, 1, "0"]
 
 class MockChart(IChart):
     def __init__(self, symbol: str, timeframe: Timeframe, raw_data: list):
@@ -50,8 +62,143 @@ class TestIChart(unittest.TestCase):
         df = self.chart.get_recent_dataframes(5)
         self.assertTrue(pd.api.types.is_datetime64_any_dtype(df.index))
 
+class TestCandleStore(unittest.TestCase):
+    def _rows(self, start, count):
+        return [kline(1630000000000 + i * 60000, str(100.0 + i), str(101.0 + i), str(99.0 + i), str(100.5 + i)) for i in range(start, start + count)]
+
+    def test_from_raw_parses_columns_once(self):
+        arrays = CandleArrays.from_raw(self._rows(0, 3))
+        self.assertEqual(len(arrays), 3)
+        self.assertEqual(arrays.timestamp.dtype, np.int64)
+        self.assertEqual(arrays.close.dtype, np.float64)
+        self.assertEqual(arrays.close.tolist(), [100.5, 101.5, 102.5])
+        self.assertEqual(len(CandleArrays.from_raw([])), 0)
+
+    def test_rows_are_lazy_candles(self):
+        arrays = CandleArrays.from_raw(self._rows(0, 3))
+        candle = arrays[-1]
+        self.assertIsInstance(candle, Candle)
+        self.assertIsInstance(candle.timestamp, int)
+        self.assertIsInstance(candle.open, float)
+        self.assertEqual(candle.close, 102.5)
+        self.assertEqual([c.timestamp for c in arrays], arrays.timestamp.tolist())
+
+    def test_tail_is_a_view(self):
+        arrays = CandleArrays.from_raw(self._rows(0, 10))
+        tail = arrays.tail(4)
+        self.assertEqual(len(tail), 4)
+        self.assertTrue(np.shares_memory(tail.close, arrays.close))
+        self.assertEqual(len(arrays.tail(0)), 0)
+        self.assertEqual(len(arrays.tail(50)), 10)
+
+    def test_store_keeps_last_capacity_candles(self):
+        store = CandleStore()
+        store.grow(5)
+        for i in range(0, 20, 2):
+            store.append(CandleArrays.from_raw(self._rows(i, 2)))
+        self.assertEqual(len(store), 5)
+        self.assertEqual(store.tail(5).close.tolist(), [115.5, 116.5, 117.5, 118.5, 119.5])
+        self.assertEqual(store.tail(2).close.tolist(), [118.5, 119.5])
+
+    def test_store_replaces_forming_candle_without_touching_views(self):
+        store = CandleStore()
+        store.grow(5)
+        store.append(CandleArrays.from_raw(self._rows(0, 3)))
+        before = store.tail(3)
+
+        updated = self._rows(2, 2)
+        updated[0][4] = "555.0"
+        store.truncate_from(updated[0][0])
+        store.append(CandleArrays.from_raw(updated))
+
+        self.assertEqual(before.close.tolist(), [100.5, 101.5, 102.5])
+        self.assertEqual(store.tail(5).close.tolist(), [100.5, 101.5, 555.0, 103.5])
+
+class TestIndicatorCache(unittest.TestCase):
+    def test_hits_misses_and_lru_eviction(self):
+        cache = IndicatorCache(maxsize=2)
+        compute = MagicMock(side_effect=lambda: object())
+
+        first = cache.get_or_compute("a", compute)
+        self.assertIs(cache.get_or_compute("a", compute), first)
+        cache.get_or_compute("b", compute)
+        cache.get_or_compute("a", compute)  # "a" becomes the most recently used
+        cache.get_or_compute("c", compute)  # evicts "b"
+        cache.get_or_compute("b", compute)
+
+        self.assertEqual(compute.call_count, 4)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 4)
+
+    def test_chart_computes_trend_components_once_per_candle(self):
+        data = [kline(1630000000000 + i * 60000, str(100.0 + i), str(101.0 + i), str(99.0 + i), str(100.5 + i)) for i in range(130)]
+        chart = MockChart("BTCUSDT", Timeframe.MINUTE_1, data)
+
+        with patch("charts.chart_interface.ta.adx", wraps=ta.adx) as adx:
+            chart.get_trend_direction(14)
+            chart.get_atr(14)
+            chart.get_adx(14)
+            self.assertEqual(adx.call_count, 1)
+            self.assertEqual(chart.indicator_cache.stats()["hits"], 2)
+
+            chart._raw_data = data[1:]  # a new candle closed
+            chart.get_atr(14)
+            self.assertEqual(adx.call_count, 2)
+
+class TestChartRegistry(unittest.TestCase):
+    def test_get_returns_canonical_instance(self):
+        registry = ChartRegistry()
+        chart_cls = MagicMock(side_effect=lambda symbol, tf: MockChart(symbol, tf, []))
+
+        chart = registry.get(chart_cls, "BTCUSDT", Timeframe.HOURS_4)
+        self.assertIs(registry.get(chart_cls, "BTCUSDT", Timeframe.HOURS_4), chart)
+        self.assertIsNot(registry.get(chart_cls, "ETHUSDT", Timeframe.HOURS_4), chart)
+        self.assertEqual(chart_cls.call_count, 2)
+        self.assertEqual(len(registry), 2)
+
+    def test_register_keeps_first_instance(self):
+        registry = ChartRegistry()
+        first = MockChart("BTCUSDT", Timeframe.MINUTE_15, [])
+        self.assertIs(registry.register(first), first)
+        self.assertIs(registry.register(MockChart("BTCUSDT", Timeframe.MINUTE_15, [])), first)
+        self.assertIs(registry.get(MockChart, "BTCUSDT", Timeframe.MINUTE_15), first)
+        self.assertEqual(registry.charts(), [first])
+
+class TestHistoricalChart(unittest.TestCase):
+    def setUp(self):
+        self.base = 1630000000000
+        rows = [kline(self.base + i * 60000, str(100.0 + i), str(110.0 + i), str(90.0 + i), str(105.0 + i)) for i in range(10)]
+        self.clock = SimulatedClock(self.base + 3 * 60000 + 1000)
+        self.chart = HistoricalChart("BTCUSDT", Timeframe.MINUTE_1, rows, self.clock)
+
+    def test_forming_candle_has_no_look_ahead(self):
+        candles = self.chart.get_recent_arrays(3)
+        self.assertEqual(candles.timestamp.tolist(), [self.base + i * 60000 for i in (1, 2, 3)])
+        self.assertEqual(candles.close.tolist(), [106.0, 107.0, 103.0])
+        self.assertEqual((candles.high[-1], candles.low[-1]), (103.0, 103.0))
+        self.assertEqual(self.chart.candles.close[3], 108.0)  # stored data is untouched
+        self.assertEqual(self.chart.get_current_price(), 103.0)
+        self.assertEqual(len(self.chart.get_recent_raw_ohlcv(10)), 4)
+
+    def test_have_new_data_follows_the_clock(self):
+        self.assertTrue(self.chart.have_new_data())
+        self.chart.get_recent_candles(2)
+        self.assertFalse(self.chart.have_new_data())
+
+        self.clock.set(self.base + 4 * 60000)
+        self.assertTrue(self.chart.have_new_data())
+        self.assertEqual(self.chart.get_next_candle_time(), datetime.fromtimestamp((self.base + 5 * 60000) / 1000, tz=timezone.utc))
+
+    def test_price_range(self):
+        self.assertEqual(self.chart.price_range(self.base + 60000, self.base + 3 * 60000), (91.0, 112.0, 107.0))
+        self.assertIsNone(self.chart.price_range(self.base + 60000, self.base + 60000))
+
 class TestBinanceAPI(unittest.TestCase):
-    @patch("charts.binance_chart.requests.get")
+    def setUp(self):
+        BinanceAPI.latency.clear()
+
+    @patch("charts.binance_chart.requests.Session.get")
     def test_get_candles(self, mock_get):
         mock_get.return_value.json.return_value = [["dummy"]]
         mock_get.return_value.raise_for_status = lambda: None
@@ -59,7 +206,7 @@ class TestBinanceAPI(unittest.TestCase):
         candles = api.get_candles("BTCUSDT", "1h")
         self.assertEqual(candles, [["dummy"]])
 
-    @patch("charts.binance_chart.requests.get")
+    @patch("charts.binance_chart.requests.Session.get")
     def test_get_current_price(self, mock_get):
         mock_get.return_value.json.return_value = {"price": "123.45"}
         mock_get.return_value.raise_for_status = lambda: None
@@ -67,9 +214,34 @@ class TestBinanceAPI(unittest.TestCase):
         price = api.get_current_price("BTCUSDT")
         self.assertEqual(price, 123.45)
 
+    @patch("charts.binance_chart.requests.Session.get")
+    def test_requests_share_session_and_use_timeouts(self, mock_get):
+        mock_get.return_value.json.return_value = {"price": "1"}
+        BinanceAPI().get_current_price("BTCUSDT")
+        BinanceAPI().get_current_price("ETHUSDT")
+
+        self.assertIs(BinanceAPI()._get_session(), BinanceAPI._session)
+        self.assertEqual(mock_get.call_args.kwargs["timeout"], (3.05, 10.0))
+        self.assertEqual(BinanceAPI.latency["ticker/price"].count, 2)
+
+    @patch("charts.binance_chart.requests.Session.get", side_effect=requests.Timeout("read timed out"))
+    def test_failed_request_is_still_timed(self, _):
+        with self.assertRaises(requests.Timeout):
+            BinanceAPI().get_candles("BTCUSDT", "1h")
+        self.assertEqual(BinanceAPI.latency["klines"].count, 1)
+
+    @patch("charts.binance_chart.requests.Session.get")
+    def test_get_current_prices_is_one_request(self, mock_get):
+        mock_get.return_value.json.return_value = [{"symbol": "BTCUSDT", "price": "100.5"}, {"symbol": "ETHUSDT", "price": "20"}]
+        prices = BinanceAPI().get_current_prices(["BTCUSDT", "ETHUSDT"])
+
+        self.assertEqual(prices, {"BTCUSDT": 100.5, "ETHUSDT": 20.0})
+        mock_get.assert_called_once()
+        self.assertEqual(mock_get.call_args.kwargs["params"], {"symbols": '["BTCUSDT","ETHUSDT"]'})
+
 class TestBinanceChartCaching(unittest.TestCase):
     def setUp(self):
-        BinanceChart._shared_ohlcv_cache.clear()
+        BinanceChart._shared_klines.clear()
         self.symbol = "BTCUSDT"
         self.timeframe = Timeframe.MINUTE_1
         self.chart = BinanceChart(self.symbol, self.timeframe)
@@ -128,7 +300,7 @@ class TestBinanceChartCaching(unittest.TestCase):
 
     @patch("charts.binance_chart.BinanceAPI.get_candles")
     def test_first_call_hits_api_and_populates_cache(self, mock_get_candles):
-        mock_data = [[datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc).timestamp() * 1000, 1, 2, 3, 4, 5]]
+        mock_data = [kline(datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc).timestamp() * 1000, 1, 2, 3, 4, 5)]
         mock_get_candles.return_value = mock_data
 
         chart = BinanceChart("BTCUSDT", Timeframe.MINUTE_5)
@@ -137,16 +309,19 @@ class TestBinanceChartCaching(unittest.TestCase):
         mock_get_candles.assert_called_once()
         self.assertEqual(result, mock_data)
         self.assertEqual(chart.get_current_candle_time(), datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc))
-        self.assertIn(("BTCUSDT", Timeframe.MINUTE_5, 10), BinanceChart._shared_ohlcv_cache)        
+        self.assertIn(("BTCUSDT", Timeframe.MINUTE_5), BinanceChart._shared_klines)
 
     @patch("charts.binance_chart.BinanceAPI.get_candles")
     def test_second_call_uses_cache_if_no_new_data(self, mock_get_candles):
         last_ts = datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc)
-        cached_data = [[last_ts.timestamp() * 1000, 1, 2, 3, 4, 5]]
+        cached_data = [kline(last_ts.timestamp() * 1000, 1, 2, 3, 4, 5)]
 
         chart = BinanceChart("BTCUSDT", Timeframe.MINUTE_5)
         chart.last_seen_candle_dt = last_ts
-        BinanceChart._shared_ohlcv_cache[("BTCUSDT", Timeframe.MINUTE_5, 10)] = (last_ts, cached_data)
+        buffer = KlineRingBuffer()
+        buffer.grow(10)
+        buffer.merge(cached_data)
+        BinanceChart._shared_klines[("BTCUSDT", Timeframe.MINUTE_5)] = buffer
 
         with patch("charts.binance_chart.datetime") as mock_datetime:
             mock_datetime.now.return_value = datetime(2025, 11, 2, 22, 4, 59, tzinfo=timezone.utc)
@@ -160,12 +335,15 @@ class TestBinanceChartCaching(unittest.TestCase):
     def test_cache_expired_when_new_candle_due(self, mock_get_candles):
         old_ts = datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc)
         new_ts = datetime(2025, 11, 2, 22, 5, 0, tzinfo=timezone.utc)
-        cached_data = [[old_ts.timestamp() * 1000, 1, 2, 3, 4, 5]]
-        new_data = [[new_ts.timestamp() * 1000, 9, 8, 7, 6, 5]]
+        cached_data = [kline(old_ts.timestamp() * 1000, 1, 2, 3, 4, 5)]
+        new_data = [kline(old_ts.timestamp() * 1000, 1, 2, 3, 7, 5), kline(new_ts.timestamp() * 1000, 9, 8, 7, 6, 5)]
 
         chart = BinanceChart("BTCUSDT", Timeframe.MINUTE_5)
         chart.last_seen_candle_dt = old_ts
-        BinanceChart._shared_ohlcv_cache[("BTCUSDT", Timeframe.MINUTE_5, 10)] = (old_ts, cached_data)
+        buffer = KlineRingBuffer()
+        buffer.grow(10)
+        buffer.merge(cached_data)
+        BinanceChart._shared_klines[("BTCUSDT", Timeframe.MINUTE_5)] = buffer
         mock_get_candles.return_value = new_data
 
         with patch("charts.binance_chart.datetime") as mock_datetime:
@@ -174,28 +352,67 @@ class TestBinanceChartCaching(unittest.TestCase):
 
             self.assertEqual(chart.get_current_candle_time(), old_ts)
             result = chart.get_recent_raw_ohlcv(10)
+            # Only the previously forming candle and the new one are requested
+            mock_get_candles.assert_called_once_with(symbol="BTCUSDT", interval="5m", limit=2)
             self.assertEqual(result, new_data)
-            mock_get_candles.assert_called_once()
             self.assertEqual(chart.get_current_candle_time(), new_ts)
 
     @patch("charts.binance_chart.BinanceAPI.get_candles")
-    def test_different_n_creates_separate_cache(self, mock_get_candles):    
-        data_10 = [[datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc).timestamp() * 1000, 1]]
-        data_20 = [[datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc).timestamp() * 1000, 2]]
+    def test_incremental_fetch_appends_to_buffer(self, mock_get_candles):
+        base = datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc)
+        initial = [kline((base + timedelta(minutes=5 * i)).timestamp() * 1000, i) for i in range(5)]
+        update = [kline((base + timedelta(minutes=5 * i)).timestamp() * 1000, i * 10) for i in range(4, 7)]
+
+        chart = BinanceChart("BTCUSDT", Timeframe.MINUTE_5)
+        mock_get_candles.return_value = initial
+        chart.get_recent_raw_ohlcv(5)
+
+        mock_get_candles.return_value = update
+        with patch("charts.binance_chart.datetime") as mock_datetime:
+            mock_datetime.now.return_value = base + timedelta(minutes=31)
+            mock_datetime.fromtimestamp.side_effect = lambda ts, tz: datetime.fromtimestamp(ts, tz)
+            result = chart.get_recent_raw_ohlcv(5)
+
+        mock_get_candles.assert_called_with(symbol="BTCUSDT", interval="5m", limit=3)
+        self.assertEqual(result, initial[2:4] + update)
+        self.assertEqual(chart.get_current_candle_time(), base + timedelta(minutes=30))
+
+    @patch("charts.binance_chart.BinanceAPI.get_candles")
+    def test_smaller_n_is_served_from_buffer(self, mock_get_candles):
+        data_20 = [kline(datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc).timestamp() * 1000 + i * 300000, i) for i in range(20)]
+        mock_get_candles.return_value = data_20
+
+        chart = BinanceChart("BTCUSDT", Timeframe.MINUTE_5)
+        chart.have_new_data = MagicMock(return_value=False)
+        result_20 = chart.get_recent_raw_ohlcv(20)
+        result_10 = chart.get_recent_raw_ohlcv(10)
+        result_2 = chart.get_recent_raw_ohlcv(2)
+
+        self.assertEqual(result_20, data_20)
+        self.assertEqual(result_10, data_20[-10:])
+        self.assertEqual(result_2, data_20[-2:])
+        mock_get_candles.assert_called_once()
+
+    @patch("charts.binance_chart.BinanceAPI.get_candles")
+    def test_larger_n_backfills_buffer(self, mock_get_candles):    
+        data_10 = [kline(datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc).timestamp() * 1000, 1)]
+        data_20 = [kline(datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc).timestamp() * 1000, 2)]
         mock_get_candles.side_effect = [data_10, data_20]
 
         chart = BinanceChart("BTCUSDT", Timeframe.MINUTE_5)
+        chart.have_new_data = MagicMock(return_value=False)
         result_10 = chart.get_recent_raw_ohlcv(10)
         result_20 = chart.get_recent_raw_ohlcv(20)
 
         self.assertEqual(result_10, data_10)
         self.assertEqual(result_20, data_20)
         self.assertEqual(mock_get_candles.call_count, 2)
+        self.assertEqual(mock_get_candles.call_args.kwargs["limit"], 20)
 
     @patch("charts.binance_chart.BinanceAPI.get_candles")
     def test_different_symbol_or_timeframe_isolated_cache(self, mock_get_candles):
-        data_btc = [[datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc).timestamp() * 1000, 1]]
-        data_eth = [[datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc).timestamp() * 1000, 2]]
+        data_btc = [kline(datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc).timestamp() * 1000, 1)]
+        data_eth = [kline(datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc).timestamp() * 1000, 2)]
         mock_get_candles.side_effect = [data_btc, data_eth]
 
         chart_btc = BinanceChart("BTCUSDT", Timeframe.MINUTE_5)
@@ -212,7 +429,7 @@ class TestBinanceChartCaching(unittest.TestCase):
     def test_shared_cache_across_instances(self, mock_get_candles):
         # Setup mock API response
         candle_ts = datetime(2025, 11, 2, 22, 0, 0, tzinfo=timezone.utc)
-        mock_data = [[candle_ts.timestamp() * 1000, 1, 2, 3, 4, 5]]
+        mock_data = [kline(candle_ts.timestamp() * 1000, 1, 2, 3, 4, 5)]
         mock_get_candles.return_value = mock_data
 
         # First chart instance
@@ -230,6 +447,17 @@ class TestBinanceChartCaching(unittest.TestCase):
         self.assertEqual(result2, mock_data)
         mock_get_candles.assert_called_once()  # API called only once
 
+    @patch("charts.binance_chart.BinanceAPI.get_candles")
+    def test_shared_buffer_is_created_once(self, mock_get_candles):
+        mock_get_candles.return_value = [kline(datetime(2025, 11, 2, 22, 0, tzinfo=timezone.utc).timestamp() * 1000, 1, 2, 3, 4, 5)]
+        chart = BinanceChart("BTCUSDT", Timeframe.MINUTE_5)
+        chart.have_new_data = MagicMock(return_value=False)
+
+        with patch("charts.binance_chart.KlineRingBuffer", wraps=KlineRingBuffer) as buffer_cls:
+            for _ in range(3):
+                chart.get_recent_raw_ohlcv(10)
+        buffer_cls.assert_called_once()
+
 class TestBinanceChart(unittest.TestCase):
     def _generate_mock_klines(self, symbol: str, interval: str, limit: int) -> list:
         base_time = 1678886400000  
@@ -249,6 +477,7 @@ class TestBinanceChart(unittest.TestCase):
         return data
 
     def setUp(self):
+        BinanceChart._shared_klines.clear()
         self.chart = BinanceChart(symbol="ETHUSDT", timeframe=Timeframe.MINUTE_15)
         self.chart._binance_api = MagicMock()
         self.chart._binance_api.get_current_price.return_value = 999.99
@@ -259,6 +488,15 @@ class TestBinanceChart(unittest.TestCase):
         self.assertEqual(price, 999.99)
         self.chart._binance_api.get_current_price.assert_called_once_with("ETHUSDT")
 
+    def test_get_current_prices_batches_symbols(self):
+        other = BinanceChart(symbol="BTCUSDT", timeframe=Timeframe.MINUTE_30)
+        self.chart._binance_api.get_current_prices.return_value = {"BTCUSDT": 1.0, "ETHUSDT": 2.0}
+
+        prices = BinanceChart.get_current_prices([self.chart, other, self.chart])
+
+        self.assertEqual(prices, {"BTCUSDT": 1.0, "ETHUSDT": 2.0})
+        self.chart._binance_api.get_current_prices.assert_called_once_with(["BTCUSDT", "ETHUSDT"])
+
     def test_get_raw_ohlcv_interval_mapping(self):
         raw = self.chart.get_recent_raw_ohlcv(10)
         self.assertEqual(len(raw), 10)
@@ -266,6 +504,19 @@ class TestBinanceChart(unittest.TestCase):
             symbol="ETHUSDT", interval="15m", limit=10
         )
 
+    def test_get_recent_arrays_served_from_parsed_store(self):
+        self.chart.get_recent_raw_ohlcv(10)
+        self.chart.have_new_data = MagicMock(return_value=False)
+
+        with patch("charts.binance_chart.CandleArrays.from_raw") as from_raw:
+            arrays = self.chart.get_recent_arrays(4)
+            candles = self.chart.get_recent_candles(2)
+            from_raw.assert_not_called()
+
+        self.assertEqual(arrays.close.tolist(), [40006.5, 40007.5, 40008.5, 40009.5])
+        self.assertEqual(candles[0].close, 40008.5)
+        self.chart._binance_api.get_candles.assert_called_once()
+
     def test_invalid_timeframe_raises(self):
         with self.assertRaises(ValueError):
             BinanceChart("ETHUSDT", Timeframe.MINUTE_10)
@@ -461,3 +712,106 @@ class TestBinanceChart(unittest.TestCase):
         self.assertEqual(self.chart.get_trend_metrics(period = 14), TrendMetrics(atr=np.float64(502.5806052540767), adx=np.float64(19.160229786816753), plus_di=np.float64(13.472554484435445), minus_di=np.float64(24.670655263090325)))
         self.assertEqual(self.chart.get_atr(period = 14), np.float64(502.5806052540767))
         self.assertEqual(self.chart.get_adx(period = 14), np.float64(19.160229786816753))
+
+
+class ReplayChart(IChart):
+    """Replays a kline history: get_recent_raw_ohlcv(n) returns the n klines ending at `cursor`, like the API."""
+    def __init__(self, raw_data: list, streaming: bool):
+        super().__init__("BTCUSDT", Timeframe.MINUTE_15)
+        self._raw_data = raw_data
+        self.cursor = len(raw_data)
+        if streaming:
+            self.enable_streaming_indicators()
+
+    def get_current_candle_time(self):
+        return datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+    def get_current_price(self) -> float:
+        return float(self._raw_data[self.cursor - 1][4])
+
+    def get_recent_raw_ohlcv(self, n: int) -> list:
+        return self._raw_data[max(0, self.cursor - n):self.cursor]
+
+    def have_new_data(self, now = None):
+        return True
+
+class TestStreamingIndicators(unittest.TestCase):
+    def _generate_klines(self, n: int, seed: int = 7) -> list:
+        rng = random.Random(seed)
+        base_time = 1762236000000
+        price = 100000.0
+        data = []
+        for i in range(n):
+            t = base_time + i * 900000
+            o = price
+            c = max(o + rng.gauss(0, 300), 1.0)
+            h = max(o, c) + abs(rng.gauss(0, 150))
+            l = min(o, c) - abs(rng.gauss(0, 150))
+            price = c
+            data.append([t, f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", "1.0", t + 899999, "1.0", 1, "0.5", "0.5", "0"])
+        return data
+
+    def _assert_close(self, actual, expected):
+        self.assertAlmostEqual(float(actual), float(expected), delta=1e-9 * max(1.0, abs(float(expected))))
+
+    def test_streaming_matches_pandas_ta_after_warm_up(self):
+        data = self._generate_klines(400)
+        pandas_chart = ReplayChart(data, streaming=False)
+        streaming_chart = ReplayChart(data, streaming=True)
+
+        # The pandas path only sees the fixed window (slow + signal + 101 candles for MACD,
+        # period + 101 for RSI/ATR/ADX) and seeds its SMA/RMA at the window's first candle;
+        # the engine carries its state from the first candle it consumed. While the window
+        # still holds the whole history both are exact. Past it, the seed's weight has decayed
+        # by (1 - alpha)^~100 (about e^-8 for EMA(26), e^-7 for RMA(14)), which bounds the gap
+        # to a fraction of a point on ~100k prices and on the 0-100 RSI/DI/ADX scales.
+        tolerance = {
+            "macd": 0.5, "signal": 0.5, "histogram": 0.5, "rsi": 0.1,
+            "atr": 0.1, "adx": 1.0, "plus_di": 0.1, "minus_di": 0.1,
+        }
+        for cursor in range(60, 401):
+            pandas_chart.cursor = streaming_chart.cursor = cursor
+            exact = cursor <= 14 + 101
+
+            def check(key, actual, expected):
+                if exact:
+                    self._assert_close(actual, expected)
+                else:
+                    self.assertAlmostEqual(float(actual), float(expected), delta=tolerance[key], msg=f"{key} at {cursor}")
+
+            expected_macd = pandas_chart.get_macd()
+            actual_macd = streaming_chart.get_macd()
+            for key in ("macd", "signal", "histogram"):
+                check(key, actual_macd[key], expected_macd[key])
+
+            check("rsi", streaming_chart.get_rsi(14), pandas_chart.get_rsi(14))
+
+            expected_trend = pandas_chart.get_trend_metrics(14)
+            actual_trend = streaming_chart.get_trend_metrics(14)
+            for key in ("atr", "adx", "plus_di", "minus_di"):
+                check(key, getattr(actual_trend, key), getattr(expected_trend, key))
+            if exact:
+                self.assertEqual(streaming_chart.get_trend_direction(14), pandas_chart.get_trend_direction(14))
+
+    def test_engine_consumes_each_closed_candle_once(self):
+        data = self._generate_klines(150)
+        chart = ReplayChart(data, streaming=True)
+        chart.cursor = 140
+        chart.get_macd()
+
+        with patch.object(StreamingMacd, "consume", autospec=True, side_effect=StreamingMacd.consume) as consume:
+            chart.cursor = 143
+            chart.get_macd()
+            # Candles 139..141 closed since the last call, plus the forming one on a throwaway copy
+            self.assertEqual(consume.call_count, 4)
+
+    def test_engine_rebuilds_when_history_changes(self):
+        chart = ReplayChart(self._generate_klines(200, seed=1), streaming=True)
+        chart.get_macd()
+
+        other_data = self._generate_klines(200, seed=2)
+        chart._raw_data = other_data
+        expected = ReplayChart(other_data, streaming=False).get_macd()
+        actual = chart.get_macd()
+        for key in ("macd", "signal", "histogram"):
+            self._assert_close(actual[key], expected[key])
@@ -1,3 +1,4 @@
+import os
 import unittest
 import tempfile
 from pathlib import Path
@@ -37,6 +38,12 @@ class TestConfig(unittest.TestCase):
     def tearDown(self):
         Path(self.temp_file.name).unlink(missing_ok=True)
 
+    def rewrite(self, content: bytes):
+        path = Path(self.temp_file.name)
+        previous = path.stat().st_mtime_ns
+        path.write_bytes(content)
+        os.utime(path, ns=(previous + 10**9, previous + 10**9))  # Coarse filesystem clocks
+
     def test_lowercase_via_attr(self):
         self.assertEqual(config.general.name, "helloworld")
         self.assertEqual(config.general.version, "1.2.3")  # already lowercase digits
@@ -92,3 +99,34 @@ class TestConfig(unittest.TestCase):
 
         with self.assertRaises(ValueError):
             config.get_value("", "FALLBACK")
+
+    def test_typed_lookups(self):
+        self.assertEqual(config.get_int("database.port", 0), 5432)
+        self.assertEqual(config.get_float("database.port", 0.0), 5432.0)
+        self.assertEqual(config.get_int("database.missing", 7), 7)
+        self.assertEqual(config.get_int("general.name", 3), 3)  # Not a number
+        self.assertEqual(config.get_text("mixed.key2", "fallback"), "MiXeDCase")
+        self.assertEqual(config.get_text("nosuch.key", "Fallback"), "Fallback")
+
+    def test_reload_if_changed_only_rereads_a_changed_file(self):
+        self.assertFalse(config.reload_if_changed())
+        self.assertTrue(config.enabled("agent.long"))
+
+        changes = []
+        config.subscribe(changes.append)
+        self.addCleanup(config.unsubscribe, changes.append)
+
+        self.rewrite(b"[agent]\nlong = 0\n")
+        self.assertTrue(config.reload_if_changed())
+        self.assertFalse(config.enabled("agent.long"))
+        self.assertEqual(changes, [config])
+        self.assertFalse(config.reload_if_changed())
+
+    def test_subscribers_are_not_called_when_nothing_changed(self):
+        changes = []
+        config.subscribe(changes.append)
+        self.addCleanup(config.unsubscribe, changes.append)
+
+        self.rewrite(Path(self.temp_file.name).read_bytes() + b"\n")
+        self.assertTrue(config.reload_if_changed())
+        self.assertEqual(changes, [])
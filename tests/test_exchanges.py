@@ -1,10 +1,15 @@
 from datetime import datetime, timezone
 from typing import Optional
+import os
 import unittest
+from tempfile import TemporaryDirectory
 from unittest.mock import Mock, call, patch
+from exchanges.trigger_index import TriggerBook
 from exchanges.virtual_exchange import VirtualExchange
+from persistence.position_journal import PositionJournal
 from strategies.strategy_interface import IStrategy
-from structs.position import Position
+from structs.metrics import metrics
+from structs.position import Position, position_key
 from structs.signal import Signal
 from charts.chart_interface import IChart, Timeframe
 
@@ -32,6 +37,11 @@ class DummyChart(IChart):
     def have_new_data(self, now = None):
         return True
 
+class BatchedChart(DummyChart):
+    @classmethod
+    def get_current_prices(cls, charts):
+        raise Exception("Invalid symbol")
+
 class TestVirtualExchange(unittest.TestCase):
     def setUp(self):
         self.notifier = Mock()
@@ -159,3 +169,232 @@ class TestVirtualExchange(unittest.TestCase):
         self.exchange._close_position(None)
         self.notifier.send_message.assert_not_called()
         self.history_logger.write.assert_not_called()
+
+    def test_open_position_index_follows_opens_and_closes(self):
+        strategy = DummyStrategy()
+        long_pos = Position.generate_position(DummyChart(), strategy, Signal(entry=100, sl=90, tp=110, type="Long"))
+        short_pos = Position.generate_position(DummyChart(), strategy, Signal(entry=100, sl=110, tp=90, type="Short"))
+        self.exchange.open_position(long_pos)
+        self.exchange.open_position(short_pos)
+
+        self.assertIs(self.exchange.find_open_position(("BTCUSDT", Timeframe.MINUTE_5, "Long", "foolish")), long_pos)
+        self.assertIs(self.exchange.find_open_position(position_key(short_pos)), short_pos)
+        self.assertIsNone(self.exchange.find_open_position(("ETHUSDT", Timeframe.MINUTE_5, "Long", "foolish")))
+
+        self.exchange._close_position(long_pos, 110, "TP Hit")
+        self.assertIsNone(self.exchange.find_open_position(position_key(long_pos)))
+        self.assertIs(self.exchange.find_open_position(position_key(short_pos)), short_pos)
+
+    def test_tick_fetches_each_symbol_price_once(self):
+        chart = DummyChart(price=105.0)
+        chart.get_current_price = Mock(return_value=105.0)
+        strategy = DummyStrategy()
+        for _ in range(3):
+            self.exchange.open_position(Position.generate_position(chart, strategy, Signal(entry=100, sl=90, tp=110, type="Long")))
+        self.exchange.open_position(Position.generate_position(DummyChart(symbol="ETHUSDT", price=111.0), strategy, Signal(entry=100, sl=90, tp=110, type="Long")))
+
+        self.exchange.tick()
+
+        chart.get_current_price.assert_called_once()
+        self.assertEqual(self.exchange.n_active_positions, 3)
+        self.assertTrue(all(pos.current_price == 105.0 for pos in self.exchange.open_positions))
+
+    def test_failed_batch_falls_back_to_one_request_per_symbol(self):
+        strategy = DummyStrategy()
+        delisted = BatchedChart(symbol="OLDUSDT")
+        delisted.get_current_price = Mock(side_effect=Exception("Invalid symbol"))
+        stuck = Position.generate_position(delisted, strategy, Signal(entry=100, sl=90, tp=110, type="Long"))
+        hit = Position.generate_position(BatchedChart(price=111.0), strategy, Signal(entry=100, sl=90, tp=110, type="Long"))
+        self.exchange.open_position(stuck)
+        self.exchange.open_position(hit)
+
+        with self.assertLogs(level="INFO") as logs:
+            self.exchange.tick()
+
+        self.assertEqual((hit.status, hit.exit_reason), ("closed", "TP Hit"))
+        self.assertEqual(stuck.status, "opened")
+        self.assertTrue(any("price of OLDUSDT" in line for line in logs.output))
+
+    def test_tick_ranges_fills_at_levels_with_stop_loss_first(self):
+        self.exchange.clock = lambda: 1800000000
+        strategy = DummyStrategy()
+        long_pos = Position.generate_position(DummyChart(symbol="BTCUSDT"), strategy, Signal(entry=100, sl=90, tp=110, type="Long"))
+        short_pos = Position.generate_position(DummyChart(symbol="ETHUSDT"), strategy, Signal(entry=100, sl=110, tp=90, type="Short"))
+        self.exchange.open_position(long_pos)
+        self.exchange.open_position(short_pos)
+
+        self.exchange.tick_ranges({
+            (DummyChart, "BTCUSDT"): (89.0, 111.0, 105.0),  # both touched: SL wins
+            (DummyChart, "ETHUSDT"): (95.0, 105.0, 97.0),
+        })
+        self.assertEqual((long_pos.exit_reason, long_pos.exit_price), ("SL Hit", 90))
+        self.assertEqual(long_pos.close_timestamp, 1800000000)
+        self.assertEqual(self.exchange.open_positions, [short_pos])
+        self.assertEqual(short_pos.current_price, 97.0)
+
+        self.exchange.tick_ranges({(DummyChart, "ETHUSDT"): (89.0, 99.0, 89.5)})
+        self.assertEqual((short_pos.exit_reason, short_pos.exit_price), ("TP Hit", 90))
+        self.assertEqual(self.exchange.n_active_positions, 0)
+
+    def test_update_levels_moves_triggers(self):
+        pos = Position.generate_position(DummyChart(price=95.0), DummyStrategy(), Signal(entry=100, sl=90, tp=110, type="Long"))
+        self.exchange.open_position(pos)
+        self.exchange.update_levels(pos, 96, 120)
+        self.assertEqual((pos.sl, pos.tp), (96, 120))
+
+        self.exchange.tick()
+        self.assertEqual((pos.exit_reason, pos.exit_price), ("SL Hit", 95.0))
+
+    def test_digest_window_sends_one_message_with_stats_once(self):
+        now = [1800000000]
+        exchange = VirtualExchange(self.notifier, None, clock=lambda: now[0], digest_window=5)
+        strategy = DummyStrategy()
+        for symbol in ("BTCUSDT", "ETHUSDT", "SOLUSDT"):
+            exchange.open_position(Position.generate_position(DummyChart(symbol=symbol, price=100.0), strategy, Signal(entry=100, sl=90, tp=110, type="Long")))
+
+        exchange.tick()
+        self.notifier.send_message.assert_not_called()
+
+        now[0] += 5
+        exchange.tick()
+        self.notifier.send_message.assert_called_once()
+        message = self.notifier.send_message.call_args.args[0]
+        self.assertEqual(message.count("*Position Opened*"), 3)
+        self.assertEqual(message.count("📊 *Stats*"), 1)
+        self.assertIn("Open: `3`", message)
+
+        exchange.tick()
+        self.notifier.send_message.assert_called_once()
+
+    def test_single_event_message_is_unchanged_without_digest(self):
+        pos = Position.generate_position(DummyChart(), DummyStrategy(), Signal(entry=100, sl=90, tp=110, type="Long"))
+        self.exchange.open_position(pos)
+
+        message = self.notifier.send_message.call_args.args[0]
+        self.assertTrue(message.startswith(f"⏳ *Position Opened* #Position{pos.id}\n"))
+        self.assertIn("Take Profit: `110.0000`\n\n\n📊 *Stats*\n", message)
+
+    def test_positions_and_tick_are_counted_in_metrics(self):
+        opened = metrics.counter("positions_opened_total")
+        stopped = metrics.counter("positions_closed_total", reason="SL Hit")
+        ticks = metrics.histogram("exchange_tick_seconds").count
+
+        pos = Position.generate_position(DummyChart(price=85.0), DummyStrategy(), Signal(entry=100, sl=90, tp=110, type="Long"))
+        self.exchange.open_position(pos)
+        self.exchange.tick()
+
+        self.assertEqual(metrics.counter("positions_opened_total"), opened + 1)
+        self.assertEqual(metrics.counter("positions_closed_total", reason="SL Hit"), stopped + 1)
+        self.assertEqual(metrics.histogram("exchange_tick_seconds").count, ticks + 1)
+
+    def test_closed_positions_are_bounded_and_history_is_read_back(self):
+        exchange = VirtualExchange(None, self.history_logger, keep_closed=2)
+        self.history_logger.read.return_value = ["row"]
+        profits = []
+        for exit_price in (110, 90, 100, 120):
+            pos = Position.generate_position(DummyChart(), DummyStrategy(), Signal(entry=100, sl=90, tp=110, type="Long"))
+            exchange.open_position(pos)
+            exchange._close_position(pos, exit_price, "for test")
+            profits.append(pos.profit)
+
+        self.assertEqual(len(exchange.closed_positions), 2)
+        self.assertEqual(exchange.closed_positions[-1].exit_price, 120)
+        self.assertEqual(exchange.n_closed_positions, 4)
+        self.assertEqual((exchange.n_wins, exchange.sl_hits, exchange.breakeven_hits), (2, 1, 1))
+        self.assertEqual(exchange.profits_sum, sum(profits))
+        self.assertEqual(self.history_logger.write.call_count, 4)
+
+        self.assertEqual(exchange.history(10), ["row"])
+        self.history_logger.read.assert_called_once_with(10)
+        self.assertEqual(len(VirtualExchange(None, None).history()), 0)
+
+    def test_journal_restores_positions_and_stats_after_restart(self):
+        with TemporaryDirectory() as tmp:
+            directory = os.path.join(tmp, "journal")
+            journal = PositionJournal(directory, compact_every=3)
+            journal.load()
+            exchange = VirtualExchange(None, None, journal=journal)
+            charts = {"BTCUSDT": DummyChart(symbol="BTCUSDT"), "ETHUSDT": DummyChart(symbol="ETHUSDT")}
+            strategy = DummyStrategy()
+            kept = Position.generate_position(charts["BTCUSDT"], strategy, Signal(entry=100, sl=90, tp=110, type="Long"))
+            closed = Position.generate_position(charts["ETHUSDT"], strategy, Signal(entry=100, sl=110, tp=90, type="Short"))
+            exchange.open_position(kept)
+            exchange.open_position(closed)
+            exchange.update_levels(kept, 95, 120)  # compacts here
+            kept.current_price = 104
+            exchange._close_position(closed, 90, "TP Hit")
+            journal.close()
+
+            Position._id_counter = 0  # a fresh process
+            restarted = VirtualExchange(None, None)
+            restored = restarted.restore(PositionJournal(directory).load(), lambda symbol, _: charts[symbol], [strategy])
+
+        self.assertEqual(restored, 1)
+        pos = restarted.find_open_position(position_key(kept))
+        self.assertEqual((pos.id, pos.sl, pos.tp, pos.entry, pos.open_timestamp), (kept.id, 95, 120, 100, kept.open_timestamp))
+        self.assertEqual(restarted.stats(), exchange.stats())
+        self.assertEqual(restarted.n_active_positions, 1)
+        self.assertGreater(Position.generate_position(charts["BTCUSDT"], strategy, Signal(100, 90, 110, "Long")).id, closed.id)
+
+        restarted.update_levels(pos, 99, 120)
+        restarted._price_snapshot = lambda: {(DummyChart, "BTCUSDT"): 98.0}
+        restarted.tick()
+        self.assertEqual(pos.exit_reason, "SL Hit")
+
+    def test_compacted_journal_keeps_pnl_extremes_across_restart(self):
+        with TemporaryDirectory() as tmp:
+            journal = PositionJournal(tmp)
+            journal.load()
+            exchange = VirtualExchange(None, None, journal=journal)
+            chart = DummyChart()
+            strategy = DummyStrategy()
+            pos = Position.generate_position(chart, strategy, Signal(entry=100, sl=90, tp=130, type="Long"))
+            exchange.open_position(pos)
+            for price in (125.0, 95.0):
+                exchange._price_snapshot = lambda price=price: {(DummyChart, "BTCUSDT"): price}
+                exchange.tick()
+            exchange.compact_journal()  # what App1.close() does on shutdown
+            journal.close()
+
+            restarted = VirtualExchange(None, None)
+            restarted.restore(PositionJournal(tmp).load(), lambda symbol, _: chart, [strategy])
+
+        restored = restarted.find_open_position(position_key(pos))
+        self.assertEqual((restored.max_pnl, restored.min_pnl, restored.current_price), (2.5, -0.5, 95.0))
+
+class TestTriggerBook(unittest.TestCase):
+    def setUp(self):
+        self.book = TriggerBook()
+        strategy = DummyStrategy()
+        self.longs = [Position.generate_position(DummyChart(), strategy, Signal(entry=100, sl=100 - d, tp=100 + d, type="Long")) for d in (5, 10, 20)]
+        self.shorts = [Position.generate_position(DummyChart(), strategy, Signal(entry=100, sl=100 + d, tp=100 - d, type="Short")) for d in (5, 10, 20)]
+        for pos in self.longs + self.shorts:
+            self.book.add(pos)
+
+    def test_crossed_returns_only_crossed_levels(self):
+        self.assertEqual(self.book.crossed(100, 100), ([], []))
+
+        sl_hits, tp_hits = self.book.crossed(92, 92)
+        self.assertEqual(sl_hits, [self.longs[0]])
+        self.assertEqual(tp_hits, [self.shorts[0]])
+
+        sl_hits, tp_hits = self.book.crossed(85, 111)  # range touching both sides
+        self.assertEqual(set(map(id, sl_hits)), set(map(id, self.longs[:2] + self.shorts[:2])))
+        self.assertEqual(tp_hits, [])
+
+    def test_move_and_remove_update_the_levels(self):
+        self.book.move(self.longs[2], 99, 150)
+        self.assertEqual(self.book.crossed(99, 99)[0], [self.longs[2]])
+
+        self.book.remove(self.longs[2])
+        self.book.remove(self.longs[2])  # already gone
+        self.assertEqual(self.book.crossed(99, 99)[0], [])
+        self.assertEqual(len(self.book), 5)
+
+    def test_mark_updates_pnl_of_every_position(self):
+        self.book.mark(105)
+        self.book.mark(95)
+        self.assertEqual([pos.pnl for pos in self.longs], [-1.0, -0.5, -0.25])
+        self.assertEqual([pos.max_pnl for pos in self.longs], [1.0, 0.5, 0.25])
+        self.assertEqual([pos.min_pnl for pos in self.shorts], [-1.0, -0.5, -0.25])
+        self.assertTrue(all(pos.current_price == 95 for pos in self.longs + self.shorts))
@@ -1,6 +1,10 @@
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
-from notifiers.telegram_notifier import TelegramNotifier
+from notifiers.notifier_interface import INotifier
+from notifiers.queued_notifier import QueuedNotifier
+from notifiers.telegram_notifier import TelegramNotifier, split_message
+from structs.token_bucket import TokenBucket
 
 class TestTelegramNotifier(unittest.TestCase):
     def setUp(self):
@@ -46,4 +50,146 @@ class TestTelegramNotifier(unittest.TestCase):
         result = self.notifier.send_message("<b>Bold text</b>")
         args, kwargs = mock_post.call_args
         self.assertEqual(kwargs["data"]["parse_mode"], "Markdown")  # Still Markdown by default
-        self.assertTrue(result)
\ No newline at end of file
+        self.assertTrue(result)
+
+    @patch("notifiers.telegram_notifier.requests.post")
+    def test_send_message_uses_timeout_and_reads_retry_after(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 429
+        mock_response.json.return_value = {"ok": False, "parameters": {"retry_after": 7}}
+        mock_response.raise_for_status.side_effect = Exception("Too Many Requests")
+        mock_post.return_value = mock_response
+
+        result = self.notifier.send_message("Slow down")
+        self.assertFalse(result)
+        self.assertEqual(self.notifier.retry_after, 7.0)
+        self.assertEqual(mock_post.call_args.kwargs["timeout"], self.notifier.timeout)
+
+
+
+class TestSplitMessage(unittest.TestCase):
+    def test_events_are_packed_and_footer_ends_last_message(self):
+        events = ["a" * 40, "b" * 40, "c" * 40]
+        messages = split_message(events, "stats", limit=90)
+
+        self.assertEqual(messages, ["a" * 40 + "\n\n" + "b" * 40, "c" * 40 + "\n\n\nstats"])
+        self.assertTrue(all(len(message) <= 90 for message in messages))
+
+    def test_oversized_event_is_cut(self):
+        self.assertEqual(split_message(["x" * 25], limit=10), ["x" * 10, "x" * 10, "x" * 5])
+        self.assertEqual(split_message([]), [])
+
+
+class FakeNotifier(INotifier):
+    def __init__(self, failures: int = 0, retry_after: float = None):
+        self.messages = []
+        self.failures = failures
+        self.retry_after = retry_after
+        self.release = threading.Event()
+        self.release.set()
+
+    def send_message(self, text: str) -> bool:
+        self.release.wait()
+        if self.failures > 0:
+            self.failures -= 1
+            return False
+        self.messages.append(text)
+        return True
+
+
+class TestQueuedNotifier(unittest.TestCase):
+    def make(self, notifier, **kwargs):
+        queued = QueuedNotifier(notifier, **kwargs)
+        self.addCleanup(queued.close, 1.0)
+        return queued
+
+    def test_send_message_does_not_wait_for_delivery(self):
+        notifier = FakeNotifier()
+        notifier.release.clear()
+        queued = self.make(notifier)
+
+        for i in range(20):
+            self.assertTrue(queued.send_message(f"msg {i}"))
+        self.assertEqual(notifier.messages, [])
+
+        notifier.release.set()
+        self.assertTrue(queued.flush(timeout=2))
+        self.assertEqual(notifier.messages, [f"msg {i}" for i in range(20)])
+        self.assertEqual(queued.sent, 20)
+        self.assertEqual(queued.latency.count, 20)
+        self.assertEqual(queued.queue_depth, 0)
+
+    def test_token_bucket_paces_sending(self):
+        now = [0.0]
+        notifier = FakeNotifier()
+        bucket = TokenBucket(rate=10, capacity=2, clock=lambda: now[0])
+        queued = self.make(notifier, buckets=[bucket], clock=lambda: now[0])
+
+        for i in range(5):
+            queued.send_message(f"msg {i}")
+        self.assertFalse(queued.flush(timeout=0.3))
+        self.assertEqual(notifier.messages, ["msg 0", "msg 1"])
+        self.assertEqual(queued.queue_depth, 3)
+
+        now[0] = 10.0  # The refill is capped at the bucket's capacity
+        self.assertFalse(queued.flush(timeout=0.3))
+        self.assertEqual(len(notifier.messages), 4)
+
+        now[0] = 10.5
+        self.assertTrue(queued.flush(timeout=2))
+        self.assertEqual(len(notifier.messages), 5)
+
+    def test_failed_send_is_retried_then_dropped(self):
+        notifier = FakeNotifier(failures=2, retry_after=0.01)
+        queued = self.make(notifier, max_retries=3)
+        queued.send_message("eventually")
+        self.assertTrue(queued.flush(timeout=2))
+        self.assertEqual(notifier.messages, ["eventually"])
+        self.assertEqual(queued.failed, 0)
+
+        notifier.failures = 10
+        queued.send_message("never")
+        self.assertTrue(queued.flush(timeout=2))
+        self.assertEqual(notifier.messages, ["eventually"])
+        self.assertEqual(queued.failed, 1)
+
+    def test_full_queue_coalesces_into_newest_message(self):
+        notifier = FakeNotifier()
+        notifier.release.clear()
+        queued = self.make(notifier, max_queue=2)
+        queued.send_message("first")  # Taken by the sender, blocked in send_message
+        queued.flush(timeout=0.1)
+
+        for text in ("a", "b", "c", "d"):
+            queued.send_message(text)
+        self.assertEqual(queued.queue_depth, 2)
+        self.assertEqual(queued.coalesced, 2)
+
+        notifier.release.set()
+        self.assertTrue(queued.flush(timeout=2))
+        self.assertEqual(notifier.messages, ["first", "a", "b\n\nc\n\nd"])
+
+    def test_full_queue_drops_oldest(self):
+        notifier = FakeNotifier()
+        notifier.release.clear()
+        queued = self.make(notifier, max_queue=2, policy="drop_oldest")
+        queued.send_message("first")
+        queued.flush(timeout=0.1)
+
+        for text in ("a", "b", "c"):
+            queued.send_message(text)
+        self.assertEqual(queued.dropped, 1)
+
+        notifier.release.set()
+        self.assertTrue(queued.flush(timeout=2))
+        self.assertEqual(notifier.messages, ["first", "b", "c"])
+
+    def test_close_drains_queue_and_rejects_new_messages(self):
+        notifier = FakeNotifier()
+        queued = self.make(notifier)
+        for i in range(3):
+            queued.send_message(f"msg {i}")
+        queued.close()
+
+        self.assertEqual(len(notifier.messages), 3)
+        self.assertFalse(queued.send_message("too late"))
@@ -1,7 +1,15 @@
 import unittest
+import numpy as np
 import os
+import sqlite3
+from unittest.mock import patch
+import threading
+import time
 from tempfile import TemporaryDirectory
 from persistence.csv_persistence import CSVPersistence  # adjust import path
+from persistence.csv_snapshot_persistence import CSVSnapshotPersistence
+from persistence.position_journal import PositionJournal
+from persistence.sqlite_persistence import SQLitePersistence
 
 class DummyStruct:
     def __init__(self, **kwargs):
@@ -149,4 +157,253 @@ class TestCSVPersistence(unittest.TestCase):
         writer = CSVPersistence(self.file_path)
         writer.write([])
 
-        self.assertFalse(os.path.exists(self.file_path))
\ No newline at end of file
+        self.assertFalse(os.path.exists(self.file_path))
+
+    def test_read_returns_last_rows(self):
+        history_writer = CSVPersistence(self.file_path, append_mode=True)
+        self.assertEqual(history_writer.read(), [])
+        for i in range(5):
+            history_writer.write(DummyStruct(symbol=f"SYM{i}", entry=float(i)))
+
+        self.assertEqual(len(history_writer.read()), 5)
+        self.assertEqual(history_writer.read(2), [{"symbol": "SYM3", "entry": "3.0"}, {"symbol": "SYM4", "entry": "4.0"}])
+
+    def _read_file(self):
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_buffered_write_does_not_block_and_close_loses_nothing(self):
+        writer = CSVPersistence(self.file_path, buffered=True, flush_rows=1000, flush_interval=60)
+        self.assertNotEqual(writer._thread, threading.current_thread())
+        for i in range(250):
+            writer.write({"symbol": f"SYM{i}", "entry": i})
+        writer.close()
+
+        lines = self._read_file().splitlines()
+        self.assertEqual(lines[0], "symbol,entry")
+        self.assertEqual(len(lines), 251)
+        self.assertEqual(lines[-1], "SYM249,249")
+        with self.assertRaises(RuntimeError):
+            writer.write({"symbol": "late", "entry": 0})
+
+    def test_buffered_flush_and_read_see_queued_rows(self):
+        writer = CSVPersistence(self.file_path, buffered=True, flush_rows=1000, flush_interval=60)
+        row = {"symbol": "BTCUSDT", "entry": 100.0}
+        writer.write(row)
+        row["entry"] = 1.0  # rows are captured when queued
+
+        writer.flush()
+        self.assertEqual(self._read_file(), "symbol,entry\nBTCUSDT,100.0\n")
+        writer.write(DummyStruct(symbol="ETHUSDT", entry=200.0))
+        self.assertEqual(writer.read(1), [{"symbol": "ETHUSDT", "entry": "200.0"}])
+        writer.close()
+
+    def test_buffered_appends_to_existing_file_without_second_header(self):
+        CSVPersistence(self.file_path).write({"symbol": "BTCUSDT", "entry": 1})
+        writer = CSVPersistence(self.file_path, buffered=True, flush_interval=0.01)
+        writer.write({"symbol": "ETHUSDT", "entry": 2})
+        writer.close()
+        self.assertEqual(self._read_file(), "symbol,entry\nBTCUSDT,1\nETHUSDT,2\n")
+
+    def test_buffered_flushes_after_interval(self):
+        writer = CSVPersistence(self.file_path, buffered=True, flush_rows=1000, flush_interval=0.05)
+        writer.write({"symbol": "BTCUSDT", "entry": 1})
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline and not (os.path.exists(self.file_path) and self._read_file()):
+            time.sleep(0.01)
+        self.assertEqual(self._read_file(), "symbol,entry\nBTCUSDT,1\n")
+        writer.close()
+
+    def test_buffered_requires_append_mode(self):
+        with self.assertRaises(ValueError):
+            CSVPersistence(self.file_path, append_mode=False, buffered=True)
+
+class TestCSVSnapshotPersistence(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "current.csv")
+        self.now = 0.0
+        self.snapshot = CSVSnapshotPersistence(self.file_path, refresh_interval=60, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _rows(self, price, sl=95.0):
+        return [{"id": 1, "current_sl": sl, "pnl": (price - 100) / 5, "current_price": price}]
+
+    def _read_file(self):
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_writes_only_on_change_or_refresh_interval(self):
+        self.snapshot.write(self._rows(101.0))
+        self.snapshot.write(self._rows(101.0))
+        self.assertEqual(self.snapshot.writes, 1)
+
+        self.now = 30
+        self.snapshot.write(self._rows(102.0))  # price only: waits for the refresh interval
+        self.assertEqual(self.snapshot.writes, 1)
+        self.assertEqual(self.snapshot.read()[0]["current_price"], "101.0")
+
+        self.snapshot.write(self._rows(102.0, sl=100.0))  # structural change: written at once
+        self.assertEqual(self.snapshot.writes, 2)
+
+        self.now = 95
+        self.snapshot.write(self._rows(103.0, sl=100.0))
+        self.assertEqual(self.snapshot.writes, 3)
+        self.assertEqual(self._read_file(), "id,current_sl,pnl,current_price\n1,100.0,0.6,103.0\n")
+
+    def test_empty_snapshot_clears_the_table(self):
+        self.snapshot.write(self._rows(101.0))
+        self.snapshot.write([])
+        self.assertEqual(self._read_file(), "id,current_sl,pnl,current_price\n")
+        self.assertEqual(self.snapshot.read(), [])
+
+    def test_replace_is_atomic(self):
+        self.snapshot.write(self._rows(101.0))
+        with patch("persistence.csv_snapshot_persistence.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.snapshot.write(self._rows(101.0, sl=99.0))
+
+        self.assertEqual(self.snapshot.read()[0]["current_sl"], "95.0")
+        self.assertEqual(os.listdir(self.temp_dir.name), ["current.csv"])
+
+class TestSQLitePersistence(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "positions.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_history_appends_and_queries_by_index(self):
+        history = SQLitePersistence(self.db_path, "positions_history", indexes=("strategy", "symbol", "close_time"))
+        self.assertEqual(history.read(), [])
+        history.write([
+            {"strategy": "HTF_MCD", "symbol": "BTCUSDT", "profit": 3.0, "close_time": "2025-01-02 10:00"},
+            {"strategy": "FBdy+MCD", "symbol": "ETHUSDT", "profit": -1.0, "close_time": "2025-01-03 10:00"},
+        ])
+        history.write(DummyStruct(strategy="HTF_MCD", symbol="ETHUSDT", profit=0.5, close_time="2025-02-01 10:00"))
+
+        self.assertEqual([row["profit"] for row in history.read()], [3.0, -1.0, 0.5])
+        self.assertEqual(history.read(1)[0]["symbol"], "ETHUSDT")
+        rows = history.select("strategy = ? AND close_time >= ?", ("HTF_MCD", "2025-01-15"))
+        self.assertEqual(rows, [{"strategy": "HTF_MCD", "symbol": "ETHUSDT", "profit": 0.5, "close_time": "2025-02-01 10:00"}])
+
+        plan = " ".join(str(tuple(row)) for row in history._conn.execute("EXPLAIN QUERY PLAN SELECT * FROM positions_history WHERE symbol = 'BTCUSDT'"))
+        self.assertIn("idx_positions_history_symbol", plan)
+        self.assertEqual(history._conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        history.close()
+
+        reopened = SQLitePersistence(self.db_path, "positions_history")
+        self.assertEqual(len(reopened.read()), 3)
+        reopened.close()
+
+    def test_keyed_table_is_an_upserted_snapshot(self):
+        current = SQLitePersistence(self.db_path, "current_positions", key="id")
+        current.write([{"id": 1, "pnl": 0.5}, {"id": 2, "pnl": -0.5}])
+        current.write([{"id": 2, "pnl": 1.5}, {"id": 3, "pnl": 0.0}])
+        self.assertEqual(current.read(), [{"id": 2, "pnl": 1.5}, {"id": 3, "pnl": 0.0}])
+
+        current.write([])
+        self.assertEqual(current.read(), [])
+        current.close()
+
+    def test_keyed_table_waits_for_refresh_interval_on_price_moves(self):
+        now = [0.0]
+        current = SQLitePersistence(self.db_path, "current_positions", key="id", volatile_fields=("pnl",), refresh_interval=60, clock=lambda: now[0])
+        current.write([{"id": 1, "sl": 95.0, "pnl": 0.5}])
+        current.write([{"id": 1, "sl": 95.0, "pnl": 0.7}])  # PnL only: waits for the refresh interval
+        self.assertEqual((current.writes, current.read()[0]["pnl"]), (1, 0.5))
+
+        current.write([{"id": 1, "sl": 100.0, "pnl": 0.7}])  # structural change: written at once
+        self.assertEqual(current.writes, 2)
+
+        now[0] = 60
+        current.write([{"id": 1, "sl": 100.0, "pnl": 0.9}])
+        self.assertEqual((current.writes, current.read()[0]["pnl"]), (3, 0.9))
+        current.close()
+
+    def test_numpy_scalars_and_none_get_numeric_columns(self):
+        history = SQLitePersistence(self.db_path, "positions_history")
+        history.write({"entry": np.float64(1.5), "exit": None, "n": np.int64(3), "won": np.bool_(True)})
+        history.write({"entry": 2.5, "exit": 3.0, "n": 4, "won": False})
+
+        self.assertEqual(history.read(), [
+            {"entry": 1.5, "exit": None, "n": 3, "won": 1},
+            {"entry": 2.5, "exit": 3.0, "n": 4, "won": 0},
+        ])
+        self.assertEqual(history.select("entry > ?", (2,)), [{"entry": 2.5, "exit": 3.0, "n": 4, "won": 0}])
+        history.close()
+
+    def test_failed_batch_is_rolled_back(self):
+        history = SQLitePersistence(self.db_path, "positions_history")
+        history.write({"symbol": "BTCUSDT", "profit": 1.0})
+        with self.assertRaises(sqlite3.Error):
+            history.write([{"symbol": "ETHUSDT", "profit": 2.0}, {"symbol": object(), "profit": 0.0}])
+        self.assertEqual(len(history.read()), 1)
+        history.close()
+
+class TestPositionJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.directory = os.path.join(self.temp_dir.name, "journal")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _record(self, pos_id):
+        return {"id": pos_id, "sl": 90.0, "tp": 110.0}
+
+    def test_replays_events(self):
+        journal = PositionJournal(self.directory)
+        journal.load()
+        journal.record_open(self._record(1))
+        journal.record_open(self._record(2))
+        journal.record_modify(1, 95.0, 120.0)
+        journal.record_close(2, {"n_closed_positions": 1})
+        journal.close()
+
+        state = PositionJournal(self.directory).load()
+        self.assertEqual(state["positions"], {1: {"id": 1, "sl": 95.0, "tp": 120.0}})
+        self.assertEqual(state["stats"], {"n_closed_positions": 1})
+        self.assertEqual(state["id_counter"], 2)
+
+    def test_compaction_and_replay_of_the_tail(self):
+        journal = PositionJournal(self.directory, compact_every=2)
+        journal.load()
+        journal.record_open(self._record(1))
+        journal.record_open(self._record(2))
+        self.assertTrue(journal.needs_compaction())
+        journal.compact([self._record(1), self._record(2)], {"n_wins": 0}, 2)
+        self.assertEqual(os.path.getsize(journal.journal_path), 0)
+        journal.record_close(1, {"n_wins": 1})
+        journal.close()
+
+        state = PositionJournal(self.directory).load()
+        self.assertEqual(list(state["positions"]), [2])
+        self.assertEqual(state["stats"], {"n_wins": 1})
+
+    def test_events_already_in_the_snapshot_are_not_replayed(self):
+        journal = PositionJournal(self.directory)
+        journal.load()
+        journal.record_open(self._record(1))
+        journal.compact([], {}, 1)  # e.g. position 1 closed outside the journal
+        with open(journal.journal_path, "a") as file:  # crash before the journal was emptied
+            file.write('{"event": "open", "position": {"id": 1, "sl": 90.0, "tp": 110.0}, "seq": 1}\n')
+
+        self.assertEqual(PositionJournal(self.directory).load()["positions"], {})
+
+    def test_torn_event_is_dropped_and_journal_stays_usable(self):
+        journal = PositionJournal(self.directory)
+        journal.load()
+        journal.record_open(self._record(1))
+        journal.close()
+        with open(journal.journal_path, "a") as file:
+            file.write('{"event": "open", "posi')
+
+        journal = PositionJournal(self.directory)
+        self.assertEqual(list(journal.load()["positions"]), [1])
+        journal.record_open(self._record(3))
+        journal.close()
+        self.assertEqual(list(PositionJournal(self.directory).load()["positions"]), [1, 3])
@@ -0,0 +1,98 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+from apps.scheduler import CandleScheduler
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+def mock_chart(symbol: str, next_candle_ts: float | None):
+    chart = MagicMock()
+    chart.symbol = symbol
+    chart.get_next_candle_time.return_value = (
+        None if next_candle_ts is None else datetime.fromtimestamp(next_candle_ts, tz=timezone.utc)
+    )
+    return chart
+
+class TestCandleScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        self.on_charts_due = MagicMock()
+        self.on_tick = MagicMock()
+
+    def _scheduler(self, charts):
+        return CandleScheduler(
+            charts, self.on_charts_due, self.on_tick,
+            settle_delay=2.0, tick_interval=1.0, poll_interval=5.0, clock=self.clock
+        )
+
+    def test_wakes_only_due_charts_after_settle_delay(self):
+        m15 = mock_chart("M15", 1900.0)
+        m30 = mock_chart("M30", 2800.0)
+        scheduler = self._scheduler([m30, m15])
+
+        self.clock.now = 1901.0
+        scheduler.run_pending()
+        self.on_charts_due.assert_not_called()
+
+        self.clock.now = 1902.0
+        m15.get_next_candle_time.return_value = datetime.fromtimestamp(2800.0, tz=timezone.utc)
+        scheduler.run_pending()
+        self.on_charts_due.assert_called_once_with([m15])
+
+        self.clock.now = 2802.0
+        scheduler.run_pending()
+        self.assertEqual(set(self.on_charts_due.call_args.args[0]), {m15, m30})
+
+    def test_returns_sleep_until_next_wakeup(self):
+        scheduler = self._scheduler([mock_chart("M15", 1900.0)])
+        self.assertEqual(scheduler.run_pending(), 1.0)  # next price tick
+        self.on_tick.assert_called_once()
+
+        scheduler.tick_interval = 3600.0
+        self.clock.now = 1001.0
+        scheduler.run_pending()
+        self.assertEqual(scheduler.run_pending(), 901.0)
+
+    def test_chart_that_did_not_advance_is_polled_later(self):
+        stale = mock_chart("STALE", 500.0)  # next candle time stays in the past
+        scheduler = self._scheduler([stale])
+
+        scheduler.run_pending()
+        scheduler.run_pending()
+        self.on_charts_due.assert_called_once_with([stale])
+
+        self.clock.now = 1005.0
+        scheduler.run_pending()
+        self.assertEqual(self.on_charts_due.call_count, 2)
+
+    def test_chart_without_candle_times_is_polled(self):
+        scheduler = self._scheduler([mock_chart("ANY", None)])
+        scheduler.run_pending()
+        self.on_charts_due.assert_not_called()
+
+        self.clock.now = 1005.0
+        scheduler.run_pending()
+        self.on_charts_due.assert_called_once()
+
+    def test_slow_analyze_does_not_tick_twice_in_a_row(self):
+        scheduler = self._scheduler([mock_chart("M15", 1000.0)])
+        ticks = []
+        self.on_tick.side_effect = lambda: ticks.append(self.clock.now)
+
+        def analyze(charts):
+            self.clock.now += 5.0  # runs past several tick intervals
+        self.on_charts_due.side_effect = analyze
+
+        self.clock.now = 1002.0
+        scheduler.run_pending()
+        scheduler.run_pending()
+        self.assertEqual(ticks, [1007.0])
+
+        self.clock.now = 1008.0
+        scheduler.run_pending()
+        self.assertEqual(ticks, [1007.0, 1008.0])
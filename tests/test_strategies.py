@@ -1,13 +1,18 @@
 from dataclasses import dataclass
 from typing import Optional
 import unittest
+import numpy as np
 from unittest.mock import MagicMock
 from charts.chart_interface import Candle, TrendDirection, Timeframe
 from strategies.strategy_hammer_candles import StrategyHammerCandles, HammerCandle
 from strategies.strategy_fbody_macd import StrategyFullBodyInMacdZones, FullBodyCandle
 from strategies.strategy_htf_macd import StrategyHTF_MCD
+from charts.candle_store import CandleArrays
+from charts.chart_registry import chart_registry
 from structs.signal import Signal
 
+TREND = {1: TrendDirection.UPTREND, -1: TrendDirection.DOWNTREND, 0: TrendDirection.NEUTRAL}
+
 @dataclass
 class Expected:
     type:   str
@@ -47,6 +52,17 @@ class TestStrategyHammerCandles(unittest.TestCase):
             result = self.strategy.generate_signal(test_chart)
             self._assert_signal(result, scenario["expected"])
 
+    def test_params_override_defaults(self):
+        strategy = StrategyHammerCandles(reward_ratio=2.0)
+        self.assertEqual(strategy.params["min_shadow_to_body_ratio"], 2.0)
+        test_chart = MagicMock()
+        test_chart.get_recent_candles.return_value = [Candle(0, 100, 111, 80, 110, 0, 0, 0, 0, 0, 0)] * 2
+        self._assert_signal(strategy.generate_signal(test_chart), Expected(type="Long", entry=110.0, tp=150.0, sl=90.0))
+
+        self.assertIsNone(StrategyHammerCandles(min_shadow_to_body_ratio=5.0).generate_signal(test_chart))
+        with self.assertRaises(ValueError):
+            StrategyHammerCandles(min_body_ratio=0.5)
+
     def test_candle_hammer_type_direct(self):
         self.assertEqual(
             self.strategy._candle_hammer_type(100, 111, 80, 110),
@@ -139,6 +155,7 @@ class TestStrategyFullBodyInMacdZones(unittest.TestCase):
 
 class TestStrategyHTF_MCD(unittest.TestCase):
     def setUp(self):
+        chart_registry.clear()
         self.strategy = StrategyHTF_MCD()
 
         self.chart = MagicMock()
@@ -157,6 +174,10 @@ class TestStrategyHTF_MCD(unittest.TestCase):
         self.chart_type = MagicMock(side_effect=mock_chart)
         self.strategy._get_higher_timeframes_macd_trend.__globals__["type"] = lambda obj: self.chart_type
 
+    def test_higher_tf_map_is_not_shared(self):
+        self.strategy.higher_tf_map[Timeframe.MINUTE_15].append(Timeframe.DAY_1)
+        self.assertEqual(StrategyHTF_MCD().higher_tf_map[Timeframe.MINUTE_15], [Timeframe.HOURS_4])
+
     def test_signal_long_full_body_green_uptrend(self):
         # Setup candle with full body green
         candle = MagicMock()
@@ -289,3 +310,72 @@ class TestStrategyHTF_MCD(unittest.TestCase):
         self.chart.timeframe = Timeframe.MINUTE_5
         signal = self.strategy.generate_signal(self.chart)
         self.assertIsNone(signal)
+
+    def test_higher_timeframe_chart_is_reused_across_signals(self):
+        candle = MagicMock()
+        candle.open = 100
+        candle.high = 120
+        candle.low = 99
+        candle.close = 119
+
+        self.chart.get_recent_candles.return_value = [candle, MagicMock()]
+        self.strategy.generate_signal(self.chart)
+        self.strategy.generate_signal(self.chart)
+
+        self.chart_type.assert_called_once_with("BTCUSDT", Timeframe.HOURS_4)
+
+    def test_required_timeframes(self):
+        self.assertEqual(self.strategy.required_timeframes(Timeframe.MINUTE_15), [Timeframe.HOURS_4])
+        self.assertEqual(self.strategy.required_timeframes(Timeframe.MINUTE_5), [])
+
+class TestVectorizedSignals(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        n = 2000
+        open_ = np.round(rng.uniform(90, 110, n), 1)
+        close = np.round(open_ + rng.normal(0, 3, n), 1)
+        high = np.maximum(open_, close) + np.round(rng.exponential(2, n), 1) * rng.integers(0, 2, n)
+        low = np.minimum(open_, close) - np.round(rng.exponential(2, n), 1) * rng.integers(0, 2, n)
+        close[:5] = open_[:5]           # zero bodies
+        high[5:10] = low[5:10] = close[5:10] = open_[5:10]  # zero ranges
+        self.candles = CandleArrays(
+            timestamp=np.arange(n, dtype=np.int64), open=open_, high=high, low=low, close=close,
+            volume=np.zeros(n), close_time=np.arange(n, dtype=np.int64), quote_volume=np.zeros(n),
+            trade_count=np.zeros(n, dtype=np.int64), taker_buy_base_volume=np.zeros(n), taker_buy_quote_volume=np.zeros(n)
+        )
+        self.macd_trend = rng.integers(-1, 2, n)
+        self.htf_trend = rng.integers(-1, 2, n)
+
+    def _scalar_chart(self, i: int):
+        chart = MagicMock()
+        chart.timeframe = Timeframe.MINUTE_15
+        chart.get_recent_candles.return_value = [self.candles[i], self.candles[i]]
+        chart.get_macd_trend.return_value = TREND[self.macd_trend[i]]
+        return chart
+
+    def _assert_matches_scalar(self, strategy, signals, patch_htf=False):
+        self.assertEqual(len(signals), len(self.candles))
+        self.assertGreater(len(signals.indices()), 0)
+        for i in range(len(self.candles)):
+            chart = self._scalar_chart(i)
+            if patch_htf:
+                strategy._get_higher_timeframes_macd_trend = MagicMock(return_value=TREND[self.htf_trend[i]])
+            self.assertEqual(signals.signal_at(i), strategy.generate_signal(chart), f"candle {i}")
+
+    def test_hammer_matches_scalar(self):
+        strategy = StrategyHammerCandles()
+        self._assert_matches_scalar(strategy, strategy.generate_signals_vectorized(self.candles))
+
+    def test_full_body_matches_scalar(self):
+        strategy = StrategyFullBodyInMacdZones()
+        signals = strategy.generate_signals_vectorized(self.candles, macd_trend=self.macd_trend)
+        self._assert_matches_scalar(strategy, signals)
+
+    def test_htf_matches_scalar(self):
+        strategy = StrategyHTF_MCD()
+        signals = strategy.generate_signals_vectorized(self.candles, macd_trend=self.macd_trend, htf_trend=self.htf_trend)
+        self._assert_matches_scalar(strategy, signals, patch_htf=True)
+
+    def test_trend_arrays_are_required(self):
+        with self.assertRaises(ValueError):
+            StrategyFullBodyInMacdZones().generate_signals_vectorized(self.candles)
@@ -1,6 +1,9 @@
+import threading
+import time
 import unittest
 from unittest.mock import MagicMock, patch
 from agents.trade_agent import TradeAgent
+from exchanges.virtual_exchange import VirtualExchange
 from structs.signal import Signal
 from charts.binance_chart import Timeframe
 
@@ -19,6 +22,7 @@ class TestTradeAgent(unittest.TestCase):
         self.strategy2 = MagicMock()
 
         self.exchange = MagicMock()
+        self.exchange.find_open_position.return_value = None
 
     @patch("agents.trade_agent.config")
     def test_analyze_disabled_by_config(self, mock_config):
@@ -117,6 +121,45 @@ class TestTradeAgent(unittest.TestCase):
         mock_generate_position.assert_called_once_with(self.chart2, self.strategy1, short_signal)
         self.exchange.open_position.assert_called_once_with(pos_short)
 
+    @patch("agents.trade_agent.Position.generate_position")
+    @patch("agents.trade_agent.config")
+    def test_concurrent_analyze_opens_positions_in_chart_order(self, mock_config, mock_generate_position):
+        mock_config.enabled.return_value = True
+        charts = []
+        for i in range(4):
+            chart = MagicMock()
+            chart.symbol = f"SYM{i}USDT"
+            chart.timeframe = Timeframe.MINUTE_15
+            chart.have_new_data.return_value = True
+            charts.append(chart)
+
+        threads = set()
+        def generate_signal(chart):
+            threads.add(threading.get_ident())
+            time.sleep(0.05 * (4 - int(chart.symbol[3])))  # later charts finish first
+            return Signal(entry=100.0, sl=95.0, tp=110.0, type="Long")
+        self.strategy1.generate_signal.side_effect = generate_signal
+        mock_generate_position.side_effect = lambda chart, strategy, signal: MagicMock(chart=chart)
+
+        agent = TradeAgent(charts, [self.strategy1], self.exchange, workers=4)
+        agent.analyze()
+
+        self.assertGreater(len(threads), 1)
+        self.assertEqual([c.args[0].chart for c in self.exchange.open_position.call_args_list], charts)
+        self.assertEqual(len(agent.last_chart_seconds), 4)
+        self.assertGreater(agent.last_analyze_seconds, 0)
+
+    @patch("agents.trade_agent.config")
+    def test_analyze_only_given_charts(self, mock_config):
+        mock_config.enabled.return_value = True
+        self.strategy1.generate_signal.return_value = None
+
+        agent = TradeAgent([self.chart1, self.chart2], [self.strategy1], self.exchange)
+        agent.analyze([self.chart2])
+
+        self.chart1.have_new_data.assert_not_called()
+        self.strategy1.generate_signal.assert_called_once_with(self.chart2)
+
 class TestTradeAgentDuplicateLogic(unittest.TestCase):
     @patch("agents.trade_agent.config")
     def setUp(self, mock_config):
@@ -137,13 +180,17 @@ class TestTradeAgentDuplicateLogic(unittest.TestCase):
         self.signal = Signal(entry=100, sl=90, tp=120, type="Long")
         self.strategy.generate_signal.return_value = self.signal
 
-        # Mock exchange
-        self.exchange = MagicMock()
-        self.exchange.open_positions = []
+        # Exchange with its real open-position index; open_position is spied on
+        self.exchange = VirtualExchange(None, None)
+        self.exchange.open_position = MagicMock(wraps=self.exchange.open_position)
 
         # Agent
         self.agent = TradeAgent(charts=[self.chart], strategies=[self.strategy], exchange=self.exchange)
 
+    def _given_open(self, pos):
+        self.exchange.open_position(pos)
+        self.exchange.open_position.reset_mock()
+
     @patch("agents.trade_agent.Position.generate_position")
     @patch("agents.trade_agent.config")
     def test_new_position_added_when_no_duplicate(self, mock_config, mock_generate_position):
@@ -156,11 +203,6 @@ class TestTradeAgentDuplicateLogic(unittest.TestCase):
         pos.strategy.STRATEGY_NAME = "TestStrategy"
         mock_generate_position.return_value = pos
 
-        # Make open_position append to open_positions
-        def open_position_side_effect(p):
-            self.exchange.open_positions.append(p)
-        self.exchange.open_position.side_effect = open_position_side_effect
-
         self.agent.analyze()
         self.agent.analyze()
 
@@ -183,7 +225,7 @@ class TestTradeAgentDuplicateLogic(unittest.TestCase):
         existing_pos.sl = 85
         existing_pos.tp = 115
 
-        self.exchange.open_positions = [existing_pos]
+        self._given_open(existing_pos)
 
         self.agent.analyze()
 
@@ -204,7 +246,7 @@ class TestTradeAgentDuplicateLogic(unittest.TestCase):
         existing_pos.type = "Long"
         existing_pos.strategy.STRATEGY_NAME = "OtherStrategy"
 
-        self.exchange.open_positions = [existing_pos]
+        self._given_open(existing_pos)
 
         self.agent.analyze()
 
@@ -220,7 +262,7 @@ class TestTradeAgentDuplicateLogic(unittest.TestCase):
         existing_pos.type = "Long"
         existing_pos.strategy.STRATEGY_NAME = "TestStrategy"
 
-        self.exchange.open_positions = [existing_pos]
+        self._given_open(existing_pos)
 
         self.agent.analyze()
 
@@ -236,7 +278,7 @@ class TestTradeAgentDuplicateLogic(unittest.TestCase):
         existing_pos.type = "Short"  # Different type
         existing_pos.strategy.STRATEGY_NAME = "TestStrategy"
 
-        self.exchange.open_positions = [existing_pos]
+        self._given_open(existing_pos)
 
         self.agent.analyze()
 
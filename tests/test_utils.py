@@ -1,6 +1,19 @@
+import atexit
+import logging
+import os
+import sys
+import threading
 import time
 import unittest
+from tempfile import TemporaryDirectory
+from urllib.error import HTTPError
+from urllib.request import urlopen
+from apps.metrics_server import MetricsServer
+from logging_setup import RateLimitFilter, setup_logging
+from structs.metrics import Metrics
 from structs.utils import get_utc_now_timestamp
+from structs.latency_histogram import LatencyHistogram
+from structs.token_bucket import TokenBucket
 
 class TestUtils(unittest.TestCase):
     def test_current_timestamp_returns_utc_now(self):
@@ -11,3 +24,140 @@ class TestUtils(unittest.TestCase):
         # Allow small drift due to execution time
         self.assertTrue(abs(ts - utc_now) <= 1)
 
+class TestLatencyHistogram(unittest.TestCase):
+    def test_observe_fills_cumulative_buckets(self):
+        histogram = LatencyHistogram(buckets=(0.1, 0.5, 1.0))
+        for seconds in (0.05, 0.2, 0.3, 0.7, 3.0):
+            histogram.observe(seconds)
+
+        self.assertEqual(histogram.cumulative(), {"0.1": 1, "0.5": 3, "1.0": 4, "+Inf": 5})
+        self.assertEqual(histogram.count, 5)
+        self.assertAlmostEqual(histogram.mean, 0.85)
+        self.assertEqual(histogram.quantile(0.5), 0.5)
+        self.assertEqual(histogram.quantile(0.99), float("inf"))
+
+    def test_empty_histogram(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.quantile(0.5), 0.0)
+        self.assertEqual(histogram.mean, 0.0)
+
+    def test_concurrent_observations_are_not_lost(self):
+        histogram = LatencyHistogram(buckets=(0.1,))
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # switch threads as often as possible
+        self.addCleanup(sys.setswitchinterval, switch_interval)
+
+        threads = [threading.Thread(target=lambda: [histogram.observe(0.05) for _ in range(20000)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        buckets, total, count = histogram.snapshot()
+        self.assertEqual((buckets["+Inf"], count), (80000, 80000))
+        self.assertAlmostEqual(total, 4000.0)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_bucket_allows_burst_then_refills_at_rate(self):
+        now = [100.0]
+        bucket = TokenBucket(rate=2, capacity=3, clock=lambda: now[0])
+
+        self.assertTrue(all(bucket.take() for _ in range(3)))
+        self.assertFalse(bucket.take())
+        self.assertAlmostEqual(bucket.delay(), 0.5)
+
+        now[0] += 0.5
+        self.assertEqual(bucket.delay(), 0.0)
+        self.assertTrue(bucket.take())
+
+        now[0] += 60
+        self.assertTrue(all(bucket.take() for _ in range(3)))  # Refill is capped at capacity
+        self.assertFalse(bucket.take())
+
+
+class TestLogging(unittest.TestCase):
+    def record(self, msg, *args):
+        return logging.LogRecord("root", logging.INFO, "virtual_exchange.py", 1, msg, args, None)
+
+    def test_rate_limit_filter_suppresses_repeats_per_message(self):
+        now = [0.0]
+        rate_limit = RateLimitFilter(interval=60, clock=lambda: now[0])
+
+        self.assertTrue(rate_limit.filter(self.record("Error checking %s: %s", "BTCUSDT", "timeout")))
+        self.assertTrue(rate_limit.filter(self.record("Error checking %s: %s", "ETHUSDT", "timeout")))
+        for _ in range(5):
+            now[0] += 1
+            self.assertFalse(rate_limit.filter(self.record("Error checking %s: %s", "BTCUSDT", "timeout")))
+
+        now[0] = 61
+        record = self.record("Error checking %s: %s", "BTCUSDT", "timeout")
+        self.assertTrue(rate_limit.filter(record))
+        self.assertEqual(record.getMessage(), "Error checking BTCUSDT: timeout (suppressed 5 times in the last 61s)")
+
+    def test_setup_logging_writes_from_background_listener(self):
+        root = logging.getLogger()
+        saved_handlers, saved_level = list(root.handlers), root.level
+        self.addCleanup(lambda: (root.handlers.clear(), root.handlers.extend(saved_handlers), root.setLevel(saved_level)))
+
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "app.log")
+            listener = setup_logging(path)
+            logging.info("[Test] %s candles", 3)
+            listener.stop()
+            atexit.unregister(listener.stop)
+
+            with open(path) as file:
+                self.assertIn("[INFO] [Test] 3 candles", file.read())
+            for handler in listener.handlers:
+                handler.close()
+
+
+class TestMetrics(unittest.TestCase):
+    def test_render_prometheus_text(self):
+        registry = Metrics()
+        with registry.time("indicator_seconds", indicator="macd"):
+            pass
+        registry.histogram("indicator_seconds", indicator="rsi").observe(0.003)
+        registry.inc("positions_closed_total", reason="TP Hit")
+        registry.inc("positions_closed_total", reason="TP Hit")
+        registry.register_callback("notifier_queue_depth", lambda: 4)
+        api_latency = {"klines": LatencyHistogram(buckets=(0.1,))}
+        api_latency["klines"].observe(0.05)
+        registry.register_histograms("binance_request_seconds", "endpoint", api_latency)
+
+        text = registry.render()
+        lines = text.splitlines()
+        self.assertEqual(lines.count("# TYPE indicator_seconds histogram"), 1)
+        self.assertIn('indicator_seconds_count{indicator="macd"} 1', lines)
+        self.assertIn('indicator_seconds_bucket{indicator="rsi",le="0.0025"} 0', lines)
+        self.assertIn('indicator_seconds_bucket{indicator="rsi",le="0.005"} 1', lines)
+        self.assertIn('indicator_seconds_bucket{indicator="rsi",le="+Inf"} 1', lines)
+        self.assertIn('binance_request_seconds_count{endpoint="klines"} 1', lines)
+        self.assertIn("# TYPE positions_closed_total counter", lines)
+        self.assertIn('positions_closed_total{reason="TP Hit"} 2', lines)
+        self.assertIn("notifier_queue_depth 4", lines)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_summary_line(self):
+        registry = Metrics()
+        registry.histogram("exchange_tick_seconds").observe(0.002)
+        registry.inc("positions_opened_total", 3)
+
+        self.assertEqual(
+            registry.summary(),
+            "exchange_tick_seconds n=1 mean=2.00ms p99<=2.5ms | positions_opened_total=3"
+        )
+        self.assertEqual(registry.counter("positions_opened_total"), 3)
+
+    def test_metrics_server_serves_metrics(self):
+        registry = Metrics()
+        registry.inc("positions_opened_total")
+        server = MetricsServer(registry, port=0).start()
+        self.addCleanup(server.stop)
+
+        with urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+            self.assertIn("text/plain", response.headers["Content-Type"])
+            self.assertIn("positions_opened_total 1", response.read().decode())
+        with self.assertRaises(HTTPError):
+            urlopen(f"http://127.0.0.1:{server.port}/other", timeout=5)